@@ -0,0 +1,94 @@
+"""
+Benchmarks `load_simple` with the code-based alignment (`align='codes'`)
+against the `isin`/`loc` alignment it replaced (`align='isin'`)
+
+Usage:
+    python bench_loading.py [n_rows ...]
+
+(100M rows needs tens of GB of memory for the object-dtype ids)
+"""
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from tophat.constants import FType, FGroup
+from tophat.data import FeatureSource, InteractionsSource, load_simple
+
+N_ROWS = [1000000, 10000000, 100000000]
+N_REPEAT = 3
+
+
+def make_srcs(n_xns: int, seed: int = 0):
+    """Synthetic string ids with features for most users and items"""
+    rand = np.random.RandomState(seed)
+    n_users = max(n_xns // 50, 1)
+    n_items = max(n_xns // 500, 1)
+    xn_df = pd.DataFrame({
+        'user_id': pd.Series(rand.randint(n_users, size=n_xns))
+            .map('u{}'.format),
+        'item_id': pd.Series(np.minimum(
+            rand.zipf(1.3, size=n_xns) - 1, n_items - 1)).map('i{}'.format),
+    })
+    # Features miss ~5% of the ids (those interactions get filtered out)
+    user_ids = pd.Series(np.flatnonzero(rand.rand(n_users) > 0.05))\
+        .map('u{}'.format)
+    item_ids = pd.Series(np.flatnonzero(rand.rand(n_items) > 0.05))\
+        .map('i{}'.format)
+    user_feats_df = pd.DataFrame({
+        'user_id': user_ids,
+        'region': rand.randint(50, size=len(user_ids)),
+    })
+    item_feats_df = pd.DataFrame({
+        'item_id': item_ids,
+        'genre': rand.randint(20, size=len(item_ids)),
+    })
+    item_num_df = pd.DataFrame({
+        'item_id': item_ids,
+        'x0': rand.rand(len(item_ids)),
+    })
+
+    def srcs():
+        return (
+            InteractionsSource(xn_df.copy(), user_col='user_id',
+                               item_col='item_id'),
+            {
+                FGroup.USER: [FeatureSource(
+                    user_feats_df.copy(), FType.CAT, index_col='user_id')],
+                FGroup.ITEM: [
+                    FeatureSource(item_feats_df.copy(), FType.CAT,
+                                  index_col='item_id'),
+                    FeatureSource(item_num_df.copy(), FType.NUM,
+                                  index_col='item_id'),
+                ],
+            },
+        )
+    return srcs
+
+
+def bench(n_rows: int):
+    srcs = make_srcs(n_rows)
+    for align in ['isin', 'codes']:
+        times = []
+        for _ in range(N_REPEAT):
+            xn_src, group_features = srcs()
+            # (sources are pre-loaded frames -- only time the alignment)
+            xn_src.load()
+            for src in group_features[FGroup.USER] + \
+                    group_features[FGroup.ITEM]:
+                src.load()
+            tic = time.perf_counter()
+            load_simple(xn_src, group_features,
+                        specific_feature=defaultdict(lambda: True),
+                        align=align)
+            times.append(time.perf_counter() - tic)
+        print(f'{align:<8}{n_rows:>12,}{min(times):>12.2f} s')
+
+
+if __name__ == '__main__':
+    n_rows_l = [int(n) for n in sys.argv[1:]] or N_ROWS
+    print(f'{"align":<8}{"rows":>12}{"time":>14}')
+    for n_rows in n_rows_l:
+        bench(n_rows)
@@ -0,0 +1,80 @@
+"""
+Benchmarks training steps of a `BilinearNet` with many categorical features
+per side, with per-feature embedding lookups against the fused layout
+(`EmbeddingMap(fused=True)`)
+
+Usage:
+    python bench_lookup.py [n_feats ...]
+"""
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tophat.embedding import EmbeddingMap
+from tophat.nets.bilinear import BilinearNet
+
+N_FEATS = [2, 10, 25]
+N_WARMUP_STEPS = 50
+N_STEPS = 500
+BATCH_SIZE = 1024
+EMB_DIM = 32
+N_NEG = 1
+
+
+def make_cats(n_feats: int, seed: int = 0):
+    """Ids plus `n_feats - 1` features per side of various cardinalities"""
+    rand = np.random.RandomState(seed)
+    cats_d = {'user_id': range(100000), 'item_id': range(20000)}
+    for side in ['user', 'item']:
+        for j in range(n_feats - 1):
+            cats_d[f'{side}_feat{j}'] = range(rand.randint(2, 1000))
+    user_cols = [col for col in cats_d if col.startswith('user')]
+    item_cols = [col for col in cats_d if col.startswith('item')]
+    return cats_d, user_cols, item_cols
+
+
+def train_op(cats_d, user_cols, item_cols, fused: bool):
+    """BPR step over (user, pos, neg) towers with in-graph random codes"""
+    emb_map = EmbeddingMap(cats_d, embedding_dim=EMB_DIM, fused=fused)
+    net = BilinearNet(emb_map, user_cols, item_cols, [])
+
+    def codes(col, shape):
+        return tf.random_uniform(shape, maxval=len(cats_d[col]),
+                                 dtype=tf.int32)
+
+    user_d = {col: codes(col, [BATCH_SIZE]) for col in user_cols}
+    pos_d = {col: codes(col, [BATCH_SIZE]) for col in item_cols}
+    # (tiled negatives are aggregated by the lookup)
+    neg_d = {col: codes(col, [N_NEG, BATCH_SIZE]) for col in item_cols}
+    score_pos = net.forward({**user_d, **pos_d})
+    score_neg = net.forward({**user_d, **neg_d})
+    loss = -tf.reduce_mean(tf.log_sigmoid(score_pos - score_neg))
+    return tf.train.AdamOptimizer(0.001).minimize(loss)
+
+
+def steps_per_sec(n_feats: int, fused: bool):
+    tf.reset_default_graph()
+    op = train_op(*make_cats(n_feats), fused=fused)
+    n_ops = len(tf.get_default_graph().get_operations())
+    with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        for _ in range(N_WARMUP_STEPS):
+            sess.run(op)
+        tic = time.perf_counter()
+        for _ in range(N_STEPS):
+            sess.run(op)
+        secs = time.perf_counter() - tic
+    return N_STEPS / secs, n_ops
+
+
+if __name__ == '__main__':
+    n_feats_l = [int(n) for n in sys.argv[1:]] or N_FEATS
+    print(f'{"layout":<12}{"feats/side":>12}{"graph ops":>12}'
+          f'{"steps/s":>12}')
+    for n_feats in n_feats_l:
+        for fused in [False, True]:
+            rate, n_ops = steps_per_sec(n_feats, fused)
+            print(f'{"fused" if fused else "per-feature":<12}'
+                  f'{n_feats:>12}{n_ops:>12,}{rate:>12.1f}')
@@ -0,0 +1,117 @@
+"""
+Benchmarks validation accuracy (`Validator.run_val`) against the memory of
+the embedding tables for each `EmbeddingMap` storage, trained with float32
+master weights, trained directly in reduced precision, or quantized after
+training (exported with `EmbeddingMap.export_tables` and served from int8)
+
+Usage:
+    python bench_quantization.py
+"""
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from tophat.constants import FGroup
+from tophat.core import TophatModel
+from tophat.data import InteractionsSource
+from tophat.datasets.movielens import fetch_movielens
+from tophat.evaluation import Validator
+from tophat.tasks.wrapper import FactorizationTaskWrapper
+from tophat.utils.quantization import read_tables, table_nbytes
+
+N_EPOCHS = 10
+EMB_DIM = 30
+SEED = 322
+
+
+def movielens_xns():
+    movielens = fetch_movielens(indicator_features=False,
+                                genre_features=False,
+                                min_rating=4.0,
+                                download_if_missing=True)
+    return [InteractionsSource(
+        path=pd.DataFrame(np.vstack(movielens[split].nonzero()).T,
+                          columns=['user_id', 'item_id']),
+        user_col='user_id',
+        item_col='item_id',
+    ) for split in ['train', 'test']]
+
+
+def train_and_validate(storage: str, master_weights: bool,
+                       n_epochs: int = N_EPOCHS,
+                       export_dir: str = None,
+                       export_storage: str = None,
+                       init_dir: str = None):
+    """Trains a task with the given storage, then validates it
+
+    Args:
+        storage: Storage of the embedding tables
+        master_weights: If `True`, train float32 master weights
+        n_epochs: Number of epochs to train
+        export_dir: Optional directory to export the tables to
+        export_storage: Storage of the exported tables
+        init_dir: Optional directory of exported tables (and biases) to
+            initialize with
+
+    Returns:
+        Tuple of validation metrics and bytes of the embedding tables
+        (as served, in `storage`)
+    """
+    tf.reset_default_graph()
+    xn_train, xn_test = movielens_xns()
+    embedding_map_kwargs = {'embedding_dim': EMB_DIM,
+                            'storage': storage,
+                            'master_weights': master_weights,
+                            'seed': SEED}
+    init_tables, init_biases = read_tables(init_dir) \
+        if init_dir is not None else (None, {})
+    if init_tables is not None:
+        embedding_map_kwargs['init_emb_d'] = init_tables
+    task = FactorizationTaskWrapper(
+        loss_fn='bpr',
+        sample_method='uniform_verified',
+        interactions=xn_train,
+        group_features={FGroup.USER: [], FGroup.ITEM: []},
+        embedding_map_kwargs=embedding_map_kwargs,
+        batch_size=128,
+        seed=SEED,
+    )
+    validator = Validator(xn_test, parent_task_wrapper=task,
+                          limit_items=-1, n_users_eval=200,
+                          include_cold=False, cold_only=False)
+    model = TophatModel(tasks=[task])
+    model.sess.run([task.embedding_map.biases_d[k].assign(v)
+                    for k, v in init_biases.items()])
+    model.fit(n_epochs=n_epochs, verbose=0)
+    metrics = validator.run_val(model.sess)
+    if export_dir is not None:
+        task.embedding_map.export_tables(model.sess, export_dir,
+                                         storage=export_storage)
+    model.sess.close()
+
+    n_bytes = sum(table_nbytes(len(cats), EMB_DIM, storage)
+                  for cats in task.embedding_map.cats_d.values())
+    return metrics, n_bytes
+
+
+def report(name: str, metrics, n_bytes: int):
+    metrics_str = '  '.join(f'{k}={v:.4f}' for k, v in sorted(
+        metrics.items()))
+    print(f'{name:<36}{n_bytes / 2 ** 20:>8.2f} MiB  {metrics_str}')
+
+
+if __name__ == '__main__':
+    for storage in ['float32', 'float16', 'int8']:
+        report(f'{storage} (master weights)',
+               *train_and_validate(storage, master_weights=True))
+    report('float16', *train_and_validate('float16', master_weights=False))
+
+    # Post-training quantization of float32 tables (served from int8)
+    with TemporaryDirectory() as export_dir:
+        train_and_validate('float32', master_weights=True,
+                           export_dir=export_dir, export_storage='int8')
+        report('int8 (post-training)',
+               *train_and_validate('int8', master_weights=False,
+                                   n_epochs=0, init_dir=export_dir))
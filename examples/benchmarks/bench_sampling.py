@@ -0,0 +1,122 @@
+"""
+Benchmarks of batched negative sampling against the per-row loops they
+replaced
+
+Usage:
+    python bench_sampling.py
+"""
+import timeit
+
+import numpy as np
+import scipy.sparse as sp
+
+from tophat.sampling import uniform, popularity
+from tophat.sampling.utils import neg_samp_bsearch
+from tophat.utils.sparse_utils import get_row_nz
+
+N_USERS = 100000
+N_ITEMS = 50000
+N_XNS = 5000000
+N_NEG = 1
+BATCH_SIZES = [1024, 4096, 16384, 65536]
+N_REPEAT = 5
+
+
+def make_xn_csr(n_users: int, n_items: int, n_xns: int, seed: int = 0):
+    """Synthetic interactions with a long-tailed item popularity"""
+    rand = np.random.RandomState(seed)
+    users = rand.randint(n_users, size=n_xns)
+    items = np.minimum(rand.zipf(1.3, size=n_xns) - 1, n_items - 1)
+    return sp.csr_matrix(
+        (np.ones(n_xns, dtype=bool), (users, items)),
+        shape=(n_users, n_items), dtype=bool)
+
+
+def sample_uniform_verified_loop(n_items, xn_csr, user_inds_batch, n_neg=1):
+    """The per-row loop that `uniform.sample_uniform_verified` replaced"""
+    batch_size = len(user_inds_batch)
+    neg_item_inds_batch = np.empty([batch_size, n_neg], dtype=np.uint32)
+    for i, user_ind in enumerate(user_inds_batch):
+        user_pos_item_inds = get_row_nz(xn_csr, user_ind)
+        neg_item_inds_batch[i] = neg_samp_bsearch(
+            user_pos_item_inds, n_items, n_neg)
+    return neg_item_inds_batch
+
+
+def sample_uniform_ordinal_loop(n_items, xn_csr, user_inds_batch,
+                                pos_item_inds_batch, n_neg=1):
+    """The per-row loop that `uniform.sample_uniform_ordinal` replaced"""
+    batch_size = len(user_inds_batch)
+    neg_item_inds_batch = np.empty([batch_size, n_neg], dtype=np.uint32)
+    for i, (user_ind, pos_item_ind) in enumerate(
+            zip(user_inds_batch, pos_item_inds_batch)):
+        pos_item_val = float(xn_csr[user_ind, pos_item_ind])
+        user_pos_item_inds = get_row_nz(xn_csr[user_ind] >= pos_item_val, 0)
+        neg_item_inds_batch[i] = neg_samp_bsearch(
+            user_pos_item_inds, n_items, n_neg)
+    return neg_item_inds_batch
+
+
+def report(name, batch_size, secs):
+    print(f'{name:<32}{batch_size:>8}{secs * 1e3:>12.2f} ms'
+          f'{batch_size / secs:>16,.0f} pairs/s')
+
+
+def bench_uniform_verified(xn_csr):
+    rand = np.random.RandomState(1)
+    for batch_size in BATCH_SIZES:
+        user_inds = rand.randint(xn_csr.shape[0], size=batch_size)
+        for name, fn in [
+            ('uniform_verified (loop)', sample_uniform_verified_loop),
+            ('uniform_verified (batched)', uniform.sample_uniform_verified),
+        ]:
+            secs = min(timeit.repeat(
+                lambda: fn(N_ITEMS, xn_csr, user_inds, N_NEG),
+                number=1, repeat=N_REPEAT))
+            report(name, batch_size, secs)
+
+
+def bench_uniform_ordinal(xn_csr):
+    rand = np.random.RandomState(2)
+    tiers_csr = xn_csr.astype(np.float32)
+    tiers_csr.data = rand.randint(1, 4, size=tiers_csr.nnz).astype(np.float32)
+    xn_coo = tiers_csr.tocoo()
+    for batch_size in BATCH_SIZES:
+        inds = rand.randint(xn_coo.nnz, size=batch_size)
+        user_inds, pos_item_inds = xn_coo.row[inds], xn_coo.col[inds]
+        for name, fn, n_repeat in [
+            # The loop slices scipy matrices per row -- don't wait forever
+            ('uniform_ordinal (loop)', sample_uniform_ordinal_loop, 1),
+            ('uniform_ordinal (batched)', uniform.sample_uniform_ordinal,
+             N_REPEAT),
+        ]:
+            secs = min(timeit.repeat(
+                lambda: fn(N_ITEMS, tiers_csr, user_inds, pos_item_inds,
+                           N_NEG),
+                number=1, repeat=n_repeat))
+            report(name, batch_size, secs)
+
+
+def bench_popularity(xn_csr):
+    rand = np.random.RandomState(3)
+    table = popularity.AliasTable(popularity.popularity_weights(
+        xn_csr.tocoo().col, N_ITEMS))
+    for batch_size in BATCH_SIZES:
+        user_inds = rand.randint(xn_csr.shape[0], size=batch_size)
+        for name, fn in [
+            ('popularity', lambda: popularity.sample_popularity(
+                table, batch_size, N_NEG)),
+            ('popularity_verified',
+             lambda: popularity.sample_popularity_verified(
+                 table, xn_csr, user_inds, N_NEG)),
+        ]:
+            secs = min(timeit.repeat(fn, number=1, repeat=N_REPEAT))
+            report(name, batch_size, secs)
+
+
+if __name__ == '__main__':
+    xn_csr = make_xn_csr(N_USERS, N_ITEMS, N_XNS)
+    print(f'{"method":<32}{"batch":>8}{"time":>15}{"throughput":>24}')
+    bench_uniform_verified(xn_csr)
+    bench_uniform_ordinal(xn_csr)
+    bench_popularity(xn_csr)
@@ -0,0 +1,135 @@
+"""
+Benchmarks training throughput (steps/sec of the `TophatModel.fit` step)
+for different task configurations, and the memory held by optimizer slots
+
+Usage:
+    python bench_training.py
+"""
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from tophat.constants import FGroup
+from tophat.core import TophatModel
+from tophat.data import InteractionsSource
+from tophat.datasets.movielens import fetch_movielens
+from tophat.tasks.wrapper import FactorizationTaskWrapper
+
+N_WARMUP_STEPS = 50
+N_STEPS = 500
+BATCH_SIZE = 1024
+EMB_DIM = 30
+
+
+def movielens_xns() -> InteractionsSource:
+    movielens = fetch_movielens(indicator_features=False,
+                                genre_features=False,
+                                min_rating=4.0,
+                                download_if_missing=True)
+    return InteractionsSource(
+        path=pd.DataFrame(np.vstack(movielens['train'].nonzero()).T,
+                          columns=['user_id', 'item_id']),
+        user_col='user_id',
+        item_col='item_id',
+    )
+
+
+def synthetic_xns(n_xns: int = 10000000,
+                  n_users: int = 1000000,
+                  n_items: int = 200000,
+                  seed: int = 0) -> InteractionsSource:
+    rand = np.random.RandomState(seed)
+    return InteractionsSource(
+        path=pd.DataFrame({
+            'user_id': rand.randint(n_users, size=n_xns),
+            'item_id': np.minimum(rand.zipf(1.3, size=n_xns) - 1,
+                                  n_items - 1),
+        }),
+        user_col='user_id',
+        item_col='item_id',
+    )
+
+
+def slot_bytes(optimizer: tf.train.Optimizer) -> int:
+    """Bytes held by the slots (and non-slot variables) of an optimizer"""
+    return sum(v.get_shape().num_elements() * v.dtype.base_dtype.size
+               for v in optimizer.variables())
+
+
+def steps_per_sec(xns: InteractionsSource,
+                  **task_kwargs) -> Tuple[float, int]:
+    """Times the same operations as the inner loop of `TophatModel.fit`
+    (also returns the bytes of the optimizer slots)"""
+    tf.reset_default_graph()
+    xns.data = None  # reload, the loader mutates the frame
+    task = FactorizationTaskWrapper(
+        loss_fn='bpr',
+        interactions=xns,
+        group_features={FGroup.USER: [], FGroup.ITEM: []},
+        embedding_map_kwargs={'embedding_dim': EMB_DIM},
+        batch_size=BATCH_SIZE,
+        optimizer=task_kwargs.pop('optimizer', 'adam'),
+        **task_kwargs,
+    )
+    model = TophatModel(tasks=[task])
+    ops = [task.loss, task.train_op]
+    for _ in range(N_WARMUP_STEPS):
+        model.sess.run(ops)
+    tic = time.time()
+    for _ in range(N_STEPS):
+        model.sess.run(ops)
+    secs = time.time() - tic
+    model.sess.close()
+    return N_STEPS / secs, slot_bytes(task.optimizer)
+
+
+def bench(name: str, xns_fn, configs):
+    xns = xns_fn()
+    for config_name, task_kwargs in configs.items():
+        rate, n_bytes = steps_per_sec(xns, **task_kwargs)
+        print(f'{name:<16}{config_name:<36}{rate:>10.1f} steps/s'
+              f'{rate * BATCH_SIZE:>14,.0f} pairs/s'
+              f'{n_bytes / 2 ** 20:>10.1f} MiB slots')
+
+
+BACKEND_CONFIGS = {
+    'uniform (generator)': {'sample_method': 'uniform',
+                            'sample_backend': 'generator'},
+    'uniform (tf)': {'sample_method': 'uniform',
+                     'sample_backend': 'tf'},
+    'uniform_verified (generator)': {'sample_method': 'uniform_verified',
+                                     'sample_backend': 'generator'},
+    'uniform_verified (tf)': {'sample_method': 'uniform_verified',
+                              'sample_backend': 'tf'},
+}
+
+ADAPTIVE_CONFIGS = {
+    'uniform': {'sample_method': 'uniform'},
+    'adaptive_warp (session)': {'sample_method': 'adaptive_warp',
+                                'sample_scorer': 'session'},
+    'adaptive_warp (snapshot)': {'sample_method': 'adaptive_warp',
+                                 'sample_scorer': 'snapshot'},
+    'adaptive_warp (snapshot, prog.)': {'sample_method': 'adaptive_warp',
+                                        'sample_scorer': 'snapshot',
+                                        'sample_progressive': True},
+}
+
+OPTIMIZER_CONFIGS = {
+    'adam': {'sample_method': 'uniform', 'optimizer': 'adam'},
+    'lazy_adam': {'sample_method': 'uniform', 'optimizer': 'lazy_adam'},
+    'adagrad': {'sample_method': 'uniform', 'optimizer': 'adagrad',
+                'learning_rate': 0.05},
+    'rowwise_adagrad': {'sample_method': 'uniform',
+                        'optimizer': 'rowwise_adagrad',
+                        'learning_rate': 0.05},
+}
+
+
+if __name__ == '__main__':
+    bench('movielens-100k', movielens_xns, BACKEND_CONFIGS)
+    bench('synthetic-10M', synthetic_xns, BACKEND_CONFIGS)
+    bench('movielens-100k', movielens_xns, ADAPTIVE_CONFIGS)
+    bench('synthetic-10M', synthetic_xns, OPTIMIZER_CONFIGS)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from tempfile import TemporaryDirectory
+
+from tophat.constants import FType, FGroup
+from tophat.data import FeatureSource, InteractionsSource, TrainDataLoader
+
+
+xn_df = pd.DataFrame([
+    ['u1', 'i1', 'a1'],
+    ['u1', 'i2', 'a2'],
+    ['u2', 'i2', 'a1'],
+    ['u3', 'i3', 'a1'],
+], columns=['user_id', 'item_id', 'activity'])
+
+item_cat_df = pd.DataFrame([
+    ['i1', 'g1'],
+    ['i2', 'g2'],
+    ['i3', 'g1'],
+], columns=['item_id', 'genre'])
+
+item_num_df = pd.DataFrame([
+    ['i1', 0.1, 1.],
+    ['i2', 0.2, 2.],
+    ['i3', 0.3, 3.],
+], columns=['item_id', 'x0', 'x1'])
+
+
+def make_loader(cache_dir, xn_path=xn_df):
+    return TrainDataLoader(
+        interactions_train=InteractionsSource(
+            path=xn_path.copy(), user_col='user_id', item_col='item_id',
+            activity_col='activity'),
+        group_features={
+            FGroup.USER: [],
+            FGroup.ITEM: [
+                FeatureSource(item_cat_df.copy(), FType.CAT,
+                              index_col='item_id'),
+                FeatureSource(item_num_df.copy(), FType.NUM,
+                              index_col='item_id'),
+            ],
+        },
+        cache_dir=cache_dir,
+    )
+
+
+def test_cache():
+    with TemporaryDirectory() as cache_dir:
+        loader = make_loader(cache_dir)
+        cached = make_loader(cache_dir)
+        assert cached.cache_key == loader.cache_key
+
+        assert cached.cats_d.keys() == loader.cats_d.keys()
+        for col, cats in loader.cats_d.items():
+            assert cached.cats_d[col].equals(cats)
+        assert cached.cat_cols == loader.cat_cols
+        assert cached.num_meta == loader.num_meta
+        assert cached.interactions_df.equals(loader.interactions_df)
+        for fg in [FGroup.USER, FGroup.ITEM]:
+            assert cached.feats_codes_df[fg].equals(loader.feats_codes_df[fg])
+            assert cached.feats_by_group[fg][FType.CAT].equals(
+                loader.feats_by_group[fg][FType.CAT])
+        assert np.allclose(cached.item_num_feats_df.values,
+                           loader.item_num_feats_df.values)
+        assert (cached.item_num_feats_df.index ==
+                loader.item_num_feats_df.index).all()
+
+        # Array columns are views of the memory-mapped arrays
+        for df in [cached.interactions_df, cached.feats_codes_df[FGroup.ITEM]]:
+            for col in ['user_id', 'item_id', 'genre']:
+                if col in df:
+                    s = df[col]
+                    values = s.cat.codes.values \
+                        if isinstance(s.dtype, pd.CategoricalDtype) \
+                        else s.values
+                    assert isinstance(values, np.memmap)
+
+        # Invalidated by a change of the sources
+        changed = make_loader(cache_dir, xn_df.iloc[:3])
+        assert changed.cache_key != loader.cache_key
+        assert len(changed.interactions_df) == 3
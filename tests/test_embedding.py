@@ -0,0 +1,159 @@
+import itertools as it
+
+import numpy as np
+import tensorflow as tf
+
+from tophat.constants import FGroup
+from tophat.embedding import EmbeddingMap
+from tophat.utils.quantization import quantize_rows, dequantize_rows
+
+
+def test_fused_look_up():
+    """
+    Fused lookups should match per-feature lookups of the same tables
+    """
+    rand = np.random.RandomState(0)
+    emb_dim = 4
+    cats_d = {
+        'user_id': list(range(5)),
+        'user_age': list(range(3)),
+        'item_id': list(range(7)),
+        'item_genre': list(range(4)),
+    }
+    cat_cols = {
+        FGroup.USER: ['user_id', 'user_age'],
+        FGroup.ITEM: ['item_id', 'item_genre'],
+    }
+    feature_weights_d = {'user_age': 0.5, 'item_genre': 2.}
+
+    with tf.Graph().as_default(), tf.Session() as sess:
+        emb_maps = {}
+        for fused in [False, True]:
+            with tf.variable_scope(f'fused_{fused}'):
+                emb_maps[fused] = EmbeddingMap(
+                    cats_d, embedding_dim=emb_dim,
+                    feature_weights_d=feature_weights_d, fused=fused)
+        sess.run(tf.global_variables_initializer())
+
+        # Same values (with non-zero biases) in both layouts
+        tables = [rand.randn(len(cats), emb_dim + 1).astype(np.float32)
+                  for cats in cats_d.values()]
+        for col, table in zip(cats_d.keys(), tables):
+            sess.run([
+                emb_maps[False].embeddings_d[col].assign(table[:, :emb_dim]),
+                emb_maps[False].biases_d[col].assign(table[:, emb_dim:]),
+            ])
+        sess.run(emb_maps[True].fused_var.assign(np.vstack(tables)))
+
+        # Items with several samples per observation (as tiled negatives)
+        input_xn_d = {
+            col: tf.constant(rand.randint(
+                len(cats_d[col]), size=[6] if fg == FGroup.USER else [3, 6]),
+                dtype=tf.int32)
+            for fg, cols in cat_cols.items() for col in cols
+        }
+        (embs, biases), (fused_embs, fused_biases) = sess.run([
+            emb_maps[fused].look_up(input_xn_d, cat_cols)
+            for fused in [False, True]])
+
+    for fg, cols in cat_cols.items():
+        for col in cols:
+            np.testing.assert_allclose(fused_embs[fg][col], embs[fg][col],
+                                       rtol=1e-6)
+    assert fused_biases.keys() == biases.keys()
+    for col, bias in biases.items():
+        np.testing.assert_allclose(fused_biases[col], bias, rtol=1e-6)
+
+
+def test_quantized_look_up():
+    """
+    Lookups of reduced precision tables (stored, or rounded from float32
+    master weights) should match the tables in that precision
+    """
+    rand = np.random.RandomState(0)
+    emb_dim = 4
+    cats_d = {'user_id': list(range(5)), 'item_id': list(range(7))}
+    cat_cols = {FGroup.USER: ['user_id'], FGroup.ITEM: ['item_id']}
+    tables = {col: rand.randn(len(cats), emb_dim).astype(np.float32)
+              for col, cats in cats_d.items()}
+    # Items with several samples per observation (as tiled negatives)
+    codes = {'user_id': np.array([0, 4, 4]),
+             'item_id': np.array([[1, 2, 6], [0, 0, 3]])}
+    exp_tables = {
+        'float16': {col: table.astype(np.float16).astype(np.float32)
+                    for col, table in tables.items()},
+        'int8': {col: dequantize_rows(quantize_rows(table))
+                 for col, table in tables.items()},
+    }
+
+    configs = list(it.product(['float16', 'int8'], [False, True]))
+    with tf.Graph().as_default(), tf.Session() as sess:
+        look_ups = {}
+        for storage, master_weights in configs:
+            with tf.variable_scope(f'{storage}_{master_weights}'):
+                emb_map = EmbeddingMap(
+                    cats_d, embedding_dim=emb_dim,
+                    init_emb_d={col: tf.constant(table)
+                                for col, table in tables.items()},
+                    storage=storage, master_weights=master_weights)
+            look_ups[storage, master_weights] = emb_map.look_up(
+                {col: tf.constant(c) for col, c in codes.items()},
+                cat_cols)[0]
+        sess.run(tf.global_variables_initializer())
+        looked_up = sess.run(look_ups)
+
+    for (storage, master_weights), embs in looked_up.items():
+        for fg, cols in cat_cols.items():
+            for col in cols:
+                exp_embs = exp_tables[storage][col][codes[col]]
+                if exp_embs.ndim == 3:
+                    exp_embs = exp_embs.mean(axis=0)
+                np.testing.assert_allclose(embs[fg][col], exp_embs,
+                                           rtol=1e-5, atol=1e-6)
+
+
+def test_partitioned_look_up(tmp_path):
+    """
+    Lookups of partitioned tables should match unpartitioned tables, and
+    checkpoints of partitioned tables restore into other partitionings
+    """
+    rand = np.random.RandomState(0)
+    emb_dim = 4
+    cats_d = {'user_id': list(range(11)), 'item_id': list(range(7))}
+    cat_cols = {FGroup.USER: ['user_id'], FGroup.ITEM: ['item_id']}
+    tables = {col: rand.randn(len(cats), emb_dim).astype(np.float32)
+              for col, cats in cats_d.items()}
+    codes = {'user_id': np.array([0, 10, 4, 5]),
+             'item_id': np.array([[1, 2, 6, 3], [0, 0, 3, 6]])}
+
+    def look_up(n_shards, init=True, path_restore=None, path_save=None):
+        with tf.Graph().as_default(), tf.Session() as sess:
+            emb_map = EmbeddingMap(
+                cats_d, embedding_dim=emb_dim,
+                init_emb_d={col: tf.constant(table)
+                            for col, table in tables.items()}
+                if init else None,
+                n_shards=n_shards)
+            if n_shards:
+                assert len(list(emb_map.embeddings_d['user_id'])) == \
+                    n_shards
+            embs, biases = emb_map.look_up(
+                {col: tf.constant(c) for col, c in codes.items()}, cat_cols)
+            saver = tf.train.Saver()
+            if path_restore:
+                saver.restore(sess, path_restore)
+            else:
+                sess.run(tf.global_variables_initializer())
+            if path_save:
+                saver.save(sess, path_save)
+            return sess.run(embs)
+
+    path = str(tmp_path / 'model.ckpt')
+    exp = look_up(None)
+    for looked_up in [look_up(3, path_save=path),
+                      look_up(2, init=False, path_restore=path),
+                      look_up(None, init=False, path_restore=path)]:
+        for fg, cols in cat_cols.items():
+            for col in cols:
+                np.testing.assert_allclose(looked_up[fg][col], exp[fg][col],
+                                           rtol=1e-6)
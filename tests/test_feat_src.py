@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
+import pytest
 import os
 from tophat.constants import FType
-from tophat.data import FeatureSource
+from tophat.data import FeatureSource, load_many_srcs, combine_cols
 
 from tempfile import NamedTemporaryFile
 
@@ -51,8 +53,37 @@ def test_feat_fn_src():
     assert dim.data.equals(feat_df2)
 
 
-
-
-
-
-
+def test_load_many_srcs_concurrent():
+    def srcs():
+        return [
+            FeatureSource(
+                path=feat_df1.copy(),
+                feature_type=FType.CAT,
+                index_col='item_id',
+                use_cols=[f'feat{i}'],
+                name=f'feat{i}',
+            ) for i in range(4)
+        ]
+
+    expected = load_many_srcs(srcs())
+    loaded_srcs = srcs()
+    feats = load_many_srcs(loaded_srcs, n_workers=2)
+    assert feats[FType.CAT].equals(expected[FType.CAT])
+    assert all(src.load_secs is not None for src in loaded_srcs)
+
+
+@pytest.mark.parametrize('mode', ['codes', 'hash'])
+def test_combine_cols_encoded(mode):
+    df = pd.DataFrame({
+        'brand': ['b1', 'b2', 'b1', None, 'b1'],
+        'cat': [1, 2, 1, 2, 3],
+    })
+    expected = combine_cols(df.copy(), [('brand', 'cat')])['brand__cat']
+
+    labelers = {}
+    combined = combine_cols(df.copy(), [('brand', 'cat')], mode=mode,
+                            n_buckets=1000, labelers=labelers)['brand__cat']
+    assert combined.dtype == np.int32
+    # Same combinations <=> same codes (no collisions at this size)
+    assert (pd.factorize(combined)[0] == pd.factorize(expected)[0]).all()
+    assert labelers['brand__cat'].labels(combined) == expected.tolist()
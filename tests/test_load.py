@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+import pytest
+from collections import defaultdict
+
+from tophat.constants import FType, FGroup
+from tophat.data import FeatureSource, InteractionsSource, load_simple, \
+    cast_cat, TrainDataLoader
+from tophat.vocab import FrequencyVocab, HashVocab, OOV_LABEL
+
+
+def make_srcs(seed=0, n_xns=500):
+    rand = np.random.RandomState(seed)
+    xn_df = pd.DataFrame({
+        'user_id': [f'u{i}' for i in rand.randint(60, size=n_xns)],
+        'item_id': rand.randint(40, size=n_xns),
+    })
+    # Features cover only some of the users/items (and a few unknown ones)
+    user_ids = [f'u{i}' for i in rand.permutation(70)[:50]]
+    item_ids = rand.permutation(50)[:35]
+    group_features = {
+        FGroup.USER: [FeatureSource(pd.DataFrame({
+            'user_id': user_ids,
+            'age': rand.choice(['a', 'b', 'c'], size=len(user_ids)),
+        }), FType.CAT, index_col='user_id')],
+        FGroup.ITEM: [
+            FeatureSource(pd.DataFrame({
+                'item_id': item_ids,
+                'genre': rand.choice(['g1', 'g2'], size=len(item_ids)),
+            }), FType.CAT, index_col='item_id'),
+            FeatureSource(pd.DataFrame({
+                'item_id': item_ids[5:],
+                'x': rand.rand(len(item_ids) - 5),
+            }), FType.NUM, index_col='item_id'),
+        ],
+    }
+    xn_src = InteractionsSource(xn_df, user_col='user_id', item_col='item_id')
+    return xn_src, group_features
+
+
+@pytest.mark.parametrize('existing', [False, True])
+def test_align_via_codes(existing):
+    loaded = {}
+    for align in ['isin', 'codes']:
+        existing_cats_d = {'user_id': [f'u{i}' for i in range(30)]} \
+            if existing else None
+        loaded[align] = load_simple(
+            *make_srcs(), specific_feature=defaultdict(lambda: True),
+            existing_cats_d=existing_cats_d, align=align)
+
+    (xn_isin, feats_isin), (xn_codes, feats_codes) = \
+        loaded['isin'], loaded['codes']
+    assert xn_codes.equals(xn_isin)
+    for fg in [FGroup.USER, FGroup.ITEM]:
+        assert feats_codes[fg].keys() == feats_isin[fg].keys()
+        for ftype, df in feats_isin[fg].items():
+            assert feats_codes[fg][ftype].equals(df)
+
+
+def test_cast_cat_appends():
+    feats_d = {FType.CAT: pd.DataFrame({'genre': ['g3', 'g1', 'g4', 'g3']})}
+    existing_cats_d = {'genre': ['g1', 'g2']}
+    cast_cat(feats_d, existing_cats_d, add_new_cats=True)
+
+    # Existing categories keep their codes, new ones in order of appearance
+    assert existing_cats_d['genre'].tolist() == ['g1', 'g2', 'g3', 'g4']
+    assert feats_d[FType.CAT]['genre'].cat.codes.tolist() == [2, 0, 3, 2]
+
+
+def test_load_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    xn_src, group_features = make_srcs()
+    xn_src.path.to_parquet(tmp_path / 'xns.parquet', index=False)
+    pq_group_features = {}
+    for fgroup, srcs in group_features.items():
+        pq_group_features[fgroup] = []
+        for i, src in enumerate(srcs):
+            path = tmp_path / f'{fgroup.value}_{i}.parquet'
+            src.path.to_parquet(path, index=False)
+            pq_group_features[fgroup].append(FeatureSource(
+                str(path), src.feature_type, index_col=src.index_col))
+    pq_xn_src = InteractionsSource(
+        str(tmp_path / 'xns.parquet'), user_col='user_id', item_col='item_id')
+    assert pq_xn_src.columnar
+
+    (xn_df, feats), (pq_xn_df, pq_feats) = [
+        load_simple(*srcs, specific_feature=defaultdict(lambda: True))
+        for srcs in [(xn_src, group_features),
+                     (pq_xn_src, pq_group_features)]]
+
+    # Same rows and vocabularies (categories may be in another order)
+    assert pq_xn_df.astype(str).equals(xn_df.astype(str))
+    for fgroup in [FGroup.USER, FGroup.ITEM]:
+        cat_df, pq_cat_df = feats[fgroup][FType.CAT], \
+            pq_feats[fgroup][FType.CAT]
+        assert pq_cat_df.astype(str).equals(cat_df.astype(str))
+        for col in cat_df.columns:
+            assert set(pq_cat_df[col].cat.categories) == \
+                set(cat_df[col].cat.categories)
+
+
+def test_load_vocab_policies():
+    xn_src, group_features = make_srcs()
+    loader = TrainDataLoader(xn_src, group_features)
+    vocab_loader = TrainDataLoader(*make_srcs(), vocab_policies={
+        'user_id': FrequencyVocab(min_count=10),
+        'item_id': FrequencyVocab(top_k=10, n_tail_buckets=4),
+        'genre': HashVocab(n_buckets=3),
+    })
+    vocabs = vocab_loader.vocabs
+
+    # Same categories (and aligned rows), codes are embedding rows
+    for col, cats in loader.cats_d.items():
+        assert list(vocab_loader.cats_d[col]) == list(cats)
+    emb_cats_d = vocab_loader.emb_cats_d
+    assert len(emb_cats_d['item_id']) == 14
+    assert len(emb_cats_d['genre']) == 3
+    assert list(emb_cats_d['age']) == list(loader.cats_d['age'])
+
+    xn_df = loader.interactions_df
+    user_counts = xn_df['user_id'].value_counts()
+    for fgroup in [FGroup.USER, FGroup.ITEM]:
+        codes_df = loader.feats_codes_df[fgroup]
+        vocab_codes_df = vocab_loader.feats_codes_df[fgroup]
+        assert vocab_codes_df.index.equals(codes_df.index)
+        for col in codes_df.columns:
+            n_rows = len(emb_cats_d[col])
+            assert vocab_codes_df[col].between(0, n_rows - 1).all()
+            if col not in vocabs:
+                assert vocab_codes_df[col].equals(codes_df[col])
+
+    # Frequent users get their own rows, the rest share the OOV row
+    user_rows = vocab_loader.feats_codes_df[FGroup.USER]['user_id']
+    n_kept = len(vocabs['user_id'].kept)
+    frequent = user_counts.reindex(user_rows.index).fillna(0) >= 10
+    assert (user_rows[frequent] < n_kept).all()
+    assert (user_rows[~frequent] == n_kept).all()
+    assert user_rows[frequent].is_unique
+    assert emb_cats_d['user_id'][-1] == OOV_LABEL
+
+    # Top items by interactions (ties broken by category order)
+    item_counts = xn_df['item_id'].value_counts()
+    kept = vocabs['item_id'].kept
+    assert len(kept) == 10
+    assert item_counts[kept].min() >= \
+        item_counts.drop(kept, errors='ignore').max()
+
+
+def test_update_context_cols():
+    """Loaders with context columns can not be updated"""
+    xn_src, group_features = make_srcs()
+    loader = TrainDataLoader(xn_src, group_features)
+    loader.context_cat_cols = ['month']
+    with pytest.raises(ValueError):
+        loader.update(make_srcs(seed=1)[0])
+
+
+def test_vocab_unseen():
+    cats = pd.Index(['a', 'b', 'c', 'd'])
+    vocab = FrequencyVocab(min_count=2, n_tail_buckets=2).fit(
+        cats, np.array([3, 1, 5, 2]))
+    assert vocab.kept.tolist() == ['c', 'a', 'd']
+    assert vocab.n_rows == 5
+    rows = vocab.rows(pd.Index(['a', 'b', 'z', 'c']))
+    assert rows[[0, 3]].tolist() == [1, 0]
+    assert 3 <= rows[1] < 5 and 3 <= rows[2] < 5
+    # Hashes are stable across calls (and loads)
+    assert (vocab.rows(pd.Index(['z', 'b'])) == rows[[2, 1]]).all()
+
+    s = pd.Series(['c', None, 'd']).astype('category')
+    assert vocab.encode(s).tolist() == [0, -1, 2]
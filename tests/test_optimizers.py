@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+
+def rowwise_adagrad_reference(table, acc, ids, grad_rows, lr):
+    """NumPy reference of a sparse row-wise Adagrad step
+
+    Args:
+        table: Embedding table (updated in-place)
+        acc: Accumulators, one per row of `table` (updated in-place)
+        ids: Looked up rows (possibly repeated)
+        grad_rows: Gradient of each lookup
+        lr: Learning rate
+    """
+    # (duplicate lookups are summed before the update)
+    rows, inv = np.unique(ids, return_inverse=True)
+    grad = np.zeros((len(rows),) + table.shape[1:], dtype=table.dtype)
+    np.add.at(grad, inv, grad_rows)
+    acc[rows] += (grad ** 2).reshape(len(rows), -1).mean(axis=1)
+    scale = lr / np.sqrt(acc[rows])
+    table[rows] -= scale.reshape((-1,) + (1,) * (table.ndim - 1)) * grad
+
+
+def test_rowwise_adagrad_reference():
+    """
+    The reference should sum duplicate lookups, keep one accumulator per
+    row, leave the other rows untouched, and reduce to Adagrad on tables
+    of a single column
+    """
+    rand = np.random.RandomState(0)
+    init = rand.randn(6, 3)
+    ids = np.array([1, 4, 1])
+    grad_rows = rand.randn(3, 3)
+    lr, acc0 = 0.1, 0.1
+
+    table, acc = init.copy(), np.full(6, acc0)
+    rowwise_adagrad_reference(table, acc, ids, grad_rows, lr)
+
+    grad = np.zeros_like(init)
+    grad[1] = grad_rows[0] + grad_rows[2]
+    grad[4] = grad_rows[1]
+    exp_acc = acc0 + (grad ** 2).mean(axis=1)
+    exp_table = init - lr * grad / np.sqrt(exp_acc)[:, None]
+    np.testing.assert_allclose(acc, exp_acc)
+    np.testing.assert_allclose(table, exp_table)
+    np.testing.assert_array_equal(table[[0, 2, 3, 5]], init[[0, 2, 3, 5]])
+
+    # One column: the accumulator is the element-wise Adagrad one
+    table, acc = init[:, :1].copy(), np.full(6, acc0)
+    rowwise_adagrad_reference(table, acc, ids, grad_rows[:, :1], lr)
+    exp_acc = acc0 + grad[:, 0] ** 2
+    np.testing.assert_allclose(acc, exp_acc)
+    np.testing.assert_allclose(
+        table[:, 0], init[:, 0] - lr * grad[:, 0] / np.sqrt(exp_acc))
+
+
+@pytest.mark.parametrize('use_resource', [False, True])
+def test_rowwise_adagrad_sparse(use_resource):
+    """
+    Row-wise Adagrad should only update the looked up rows (and their
+    accumulators), with one accumulator per row
+    """
+    tf = pytest.importorskip('tensorflow')
+    from tophat.optimizers import RowwiseAdagradOptimizer
+
+    rand = np.random.RandomState(0)
+    init = rand.randn(6, 3).astype(np.float32)
+    ids = np.array([1, 4, 1])
+    lr, acc0 = 0.1, 0.1
+
+    with tf.Graph().as_default(), tf.Session() as sess:
+        table = tf.get_variable('table', initializer=init,
+                                use_resource=use_resource)
+        loss = tf.reduce_sum(tf.nn.embedding_lookup(table, ids) ** 2)
+        opt = RowwiseAdagradOptimizer(learning_rate=lr,
+                                      initial_accumulator_value=acc0)
+        train_op = opt.minimize(loss)
+        acc = opt.get_slot(table, 'accumulator')
+        assert acc.get_shape().as_list() == [6]
+        sess.run(tf.global_variables_initializer())
+        sess.run(train_op)
+        table_val, acc_val = sess.run([table, acc])
+
+    exp_table, exp_acc = init.copy(), np.full(6, acc0, dtype=np.float32)
+    rowwise_adagrad_reference(exp_table, exp_acc, ids, 2 * init[ids], lr)
+    untouched = np.bincount(ids, minlength=len(init)) == 0
+    np.testing.assert_allclose(table_val, exp_table, rtol=1e-5)
+    np.testing.assert_allclose(acc_val, exp_acc, rtol=1e-5)
+    np.testing.assert_array_equal(table_val[untouched], init[untouched])
+    np.testing.assert_array_equal(acc_val[untouched], acc0)
+
+
+@pytest.mark.parametrize('use_resource', [False, True])
+def test_rowwise_adagrad_dense(use_resource):
+    """Dense gradients should update every row"""
+    tf = pytest.importorskip('tensorflow')
+    from tophat.optimizers import RowwiseAdagradOptimizer
+
+    rand = np.random.RandomState(0)
+    init = rand.randn(4, 3).astype(np.float32)
+    lr, acc0 = 0.1, 0.1
+
+    with tf.Graph().as_default(), tf.Session() as sess:
+        table = tf.get_variable('table', initializer=init,
+                                use_resource=use_resource)
+        loss = tf.reduce_sum(table ** 2)
+        opt = RowwiseAdagradOptimizer(learning_rate=lr,
+                                      initial_accumulator_value=acc0)
+        train_op = opt.minimize(loss)
+        acc = opt.get_slot(table, 'accumulator')
+        sess.run(tf.global_variables_initializer())
+        sess.run(train_op)
+        table_val, acc_val = sess.run([table, acc])
+
+    exp_table, exp_acc = init.copy(), np.full(4, acc0, dtype=np.float32)
+    rowwise_adagrad_reference(exp_table, exp_acc, np.arange(4), 2 * init, lr)
+    np.testing.assert_allclose(table_val, exp_table, rtol=1e-5)
+    np.testing.assert_allclose(acc_val, exp_acc, rtol=1e-5)
+
+
+def test_get_optimizer():
+    tf = pytest.importorskip('tensorflow')
+    from tophat.optimizers import RowwiseAdagradOptimizer, get_optimizer
+
+    opt = tf.train.GradientDescentOptimizer(0.5)
+    assert get_optimizer(opt) is opt
+    assert isinstance(get_optimizer('rowwise_adagrad', 0.5),
+                      RowwiseAdagradOptimizer)
+    with pytest.raises(ValueError):
+        get_optimizer('not_an_optimizer')
@@ -0,0 +1,45 @@
+import json
+import pandas as pd
+
+from tophat.constants import FType, FGroup
+from tophat.data import FeatureSource, InteractionsSource, TrainDataLoader
+from tophat.utils import profiling
+
+
+def test_degree_report():
+    report = profiling.degree_report([0, 1, 1, 2, 3, 8])
+    assert report['hist_edges'] == [0, 1, 2, 4, 8, 16]
+    assert report['hist_counts'] == [1, 2, 2, 0, 1]
+    assert report['n_zero'] == 1 and report['max'] == 8
+
+
+def test_profile_data_loader():
+    xn_df = pd.DataFrame([
+        ['u1', 'i1'],
+        ['u1', 'i1'],
+        ['u1', 'i2'],
+        ['u2', 'i2'],
+    ], columns=['user_id', 'item_id'])
+    item_feats_df = pd.DataFrame([
+        ['i1', 'g1'],
+        ['i2', 'g1'],
+        ['i3', 'g2'],
+    ], columns=['item_id', 'genre'])
+    loader = TrainDataLoader(
+        interactions_train=InteractionsSource(
+            xn_df, user_col='user_id', item_col='item_id'),
+        group_features={
+            FGroup.USER: [],
+            FGroup.ITEM: [FeatureSource(item_feats_df, FType.CAT,
+                                        index_col='item_id')],
+        },
+    )
+    report = profiling.profile(data_loader=loader)['data_loader']
+    json.dumps(report)
+
+    assert (report['n_users'], report['n_items']) == (2, 2)
+    assert report['n_pairs'] == 3
+    assert report['density'] == 3 / 4
+    assert report['user_degrees']['max'] == 3
+    assert report['features']['genre']['n_observed'] == 1
+    assert report['bytes']['interactions_df'] > 0
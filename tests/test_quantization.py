@@ -0,0 +1,51 @@
+import numpy as np
+
+from tophat.utils.quantization import quantize_rows, dequantize_rows, \
+    to_storage, write_tables, read_tables, table_nbytes, QuantizedTable
+
+
+def test_quantize_rows():
+    rand = np.random.RandomState(0)
+    table = rand.randn(50, 8).astype(np.float32) * \
+        rand.uniform(0.01, 10., size=[50, 1]).astype(np.float32)
+    table[3] = 0.
+
+    quantized = quantize_rows(table)
+    assert quantized.codes.dtype == np.int8
+    assert quantized.scales.shape == (50, 1)
+    # Largest magnitude of each (non-zero) row maps to 127
+    np.testing.assert_array_equal(
+        np.abs(quantized.codes).max(axis=1)[table.any(axis=1)], 127)
+
+    dequantized = dequantize_rows(quantized)
+    # Error within half a step of each row
+    assert (np.abs(dequantized - table) <=
+            quantized.scales / 2 + 1e-6).all()
+    np.testing.assert_array_equal(dequantized[3], 0.)
+    # Quantizing again is lossless
+    requantized = quantize_rows(dequantized)
+    np.testing.assert_array_equal(requantized.codes, quantized.codes)
+
+    assert table_nbytes(50, 8, 'int8') == 50 * 8 + 50 * 4
+    assert table_nbytes(50, 8, 'float16') == table.nbytes // 2
+
+
+def test_write_read_tables(tmp_path):
+    rand = np.random.RandomState(0)
+    tables = {'user_id': rand.randn(5, 4), 'item_id': rand.randn(7, 4)}
+    biases = {'user_id': rand.randn(5, 1), 'item_id': rand.randn(7, 1)}
+
+    for storage in ['float32', 'float16', 'int8']:
+        write_tables(tmp_path / storage,
+                     {k: to_storage(v, storage) for k, v in tables.items()},
+                     biases)
+        read, read_biases = read_tables(tmp_path / storage)
+        assert read.keys() == tables.keys()
+        for k, table in tables.items():
+            np.testing.assert_array_equal(read_biases[k], biases[k])
+            if storage == 'int8':
+                assert isinstance(read[k], QuantizedTable)
+                read[k] = dequantize_rows(read[k])
+            else:
+                assert read[k].dtype == storage
+            np.testing.assert_allclose(read[k], table, atol=0.05)
@@ -2,21 +2,34 @@
 
 TODO:
     - adaptive (might need to mock a lot of stuff)
-    - ordinal
 
 """
+import json
+import os
+import signal
 import pytest
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import tensorflow as tf
+from tophat.sampling import uniform, adaptive, parallel, popularity, scoring
+from tophat.sampling import native, schedulers
 from tophat.sampling.pair_sampler import PairSampler
 from tophat.constants import FGroup
+from tophat.data import InteractionsSource, TrainDataLoader
+from tophat.embedding import EmbeddingMap
+from tophat.nets.bilinear import BilinearNet
+from tophat.tasks.wrapper import FactorizationTaskWrapper
+from tophat.utils import profiling
+from tophat.utils.ph_conversions import fwd_dict_via_cats
+from tophat.vocab import HashVocab
 from pandas.api.types import CategoricalDtype
 
 N_BATCHES_TEST = 5
 
 
-@pytest.fixture(params=['uniform', 'uniform_verified'])
+@pytest.fixture(params=['uniform', 'uniform_verified',
+                        'popularity', 'popularity_verified'])
 def data(request):
     cats_d = {
         'user_id': ['u1', 'u2'],
@@ -149,7 +162,7 @@ def test_neg(data):
     User should have no interaction history with neg item
     """
     sampler, cats_d, interactions_df, feat_codes_df_d = data
-    if sampler.method in {'uniform', 'adaptive'}:
+    if sampler.method in {'uniform', 'popularity', 'adaptive'}:
         pytest.skip()
 
     gen = sampler.__iter__()
@@ -162,3 +175,536 @@ def test_neg(data):
             user_xn = interactions_df.loc[interactions_df['user_id'] == user_id]
 
             assert not set(neg_item_id).intersection(user_xn['item_id'].values)
+
+
+def test_uniform_verified_batch():
+    """
+    Batched verification should never sample a known positive
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items, n_neg = 50, 20, 3
+    xn_csr = sp.csr_matrix(rand.rand(n_users, n_items) < 0.5)
+    user_inds = rand.randint(n_users, size=1000)
+
+    neg_item_inds = uniform.sample_uniform_verified(
+        n_items, xn_csr, user_inds, n_neg)
+
+    assert neg_item_inds.shape == (len(user_inds), n_neg)
+    assert neg_item_inds.dtype == np.uint32
+    assert not xn_csr[np.repeat(user_inds, n_neg),
+                      neg_item_inds.ravel()].A1.any()
+
+
+def test_uniform_ordinal_batch():
+    """
+    A negative should never be of the same or higher tier than its positive
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items, n_neg = 50, 20, 3
+    tiers = (rand.rand(n_users, n_items) < 0.5) * \
+        rand.randint(1, 4, size=(n_users, n_items))
+    xn_csr = sp.csr_matrix(tiers.astype(np.float32))
+    user_inds, pos_item_inds = xn_csr.nonzero()
+
+    neg_item_inds = uniform.sample_uniform_ordinal(
+        n_items, xn_csr, user_inds, pos_item_inds, n_neg)
+
+    neg_tiers = tiers[np.repeat(user_inds, n_neg), neg_item_inds.ravel()]
+    assert (neg_tiers.reshape(-1, n_neg) <
+            tiers[user_inds, pos_item_inds][:, None]).all()
+
+
+def test_alias_table():
+    """
+    Alias table draws should follow the (unnormalized) weights
+    """
+    weights = np.array([0., 1., 2., 3., 10., 0.5])
+    table = popularity.AliasTable(weights)
+    draws = table.sample(200000, rand=np.random.RandomState(0))
+    np.testing.assert_allclose(
+        np.bincount(draws, minlength=len(weights)) / len(draws),
+        weights / weights.sum(), atol=5e-3)
+
+
+def test_popularity_verified_batch():
+    """
+    Popularity verification should never sample a known positive
+    (even for users whose positives hold most of the popularity mass)
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items, n_neg = 50, 20, 3
+    xn_csr = sp.csr_matrix(rand.rand(n_users, n_items) < 0.5)
+    xn_csr[0, :n_items - 1] = True
+    user_inds = rand.randint(n_users, size=1000)
+    table = popularity.AliasTable(
+        popularity.popularity_weights(xn_csr.nonzero()[1], n_items))
+
+    neg_item_inds = popularity.sample_popularity_verified(
+        table, xn_csr, user_inds, n_neg, max_trials=2)
+
+    assert neg_item_inds.shape == (len(user_inds), n_neg)
+    assert neg_item_inds.dtype == np.uint32
+    assert not xn_csr[np.repeat(user_inds, n_neg),
+                      neg_item_inds.ravel()].A1.any()
+
+
+def test_iter_via_workers():
+    """
+    Every batch of every shard should come through the shared ring intact
+    """
+    n_batches = 20
+
+    def batch_gen(shard):
+        for batch_ind in range(shard[0], n_batches, shard[1]):
+            yield {'a': np.full(4, batch_ind, dtype=np.int32),
+                   'b': np.full((2, 4), batch_ind / 2, dtype=np.float32)}
+
+    layout = {'a': (np.int32, [4]), 'b': (np.float32, [2, 4])}
+
+    seen = []
+    for batch in parallel.iter_via_workers(batch_gen, layout, n_workers=3):
+        np.testing.assert_array_equal(batch['b'], batch['a'][0] / 2)
+        seen.append(batch['a'][0])
+
+    assert sorted(seen) == list(range(n_batches))
+
+
+@pytest.mark.parametrize('kill', [False, True])
+def test_iter_via_workers_failure(kill):
+    """
+    A failing (or killed) worker should raise in the consumer rather than
+    leave it waiting
+    """
+    layout = {'a': (np.int32, [4])}
+
+    def batch_gen(shard):
+        yield {'a': np.full(4, shard[0], dtype=np.int32)}
+        if shard[0] == 1:
+            if kill:
+                os.kill(os.getpid(), signal.SIGKILL)
+            raise ValueError('bad shard')
+        yield {'a': np.full(4, shard[0], dtype=np.int32)}
+
+    with pytest.raises(parallel.WorkerError,
+                       match='codes' if kill else 'bad shard'):
+        for _ in parallel.iter_via_workers(batch_gen, layout, n_workers=2,
+                                           poll_secs=0.1):
+            pass
+
+
+def test_snapshot_scorer():
+    """
+    Snapshot scores should match the forward pass of the network
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items = 6, 8
+    cats_d = {
+        'user_id': list(range(n_users)),
+        'user_age': list(range(3)),
+        'item_id': list(range(n_items)),
+        'item_genre': list(range(4)),
+    }
+    feats_codes_arrs = {
+        FGroup.USER: np.c_[np.arange(n_users),
+                           rand.randint(3, size=n_users)],
+        FGroup.ITEM: np.c_[np.arange(n_items),
+                           rand.randint(4, size=n_items)],
+    }
+    code_df_cols = {
+        FGroup.USER: ['user_id', 'user_age'],
+        FGroup.ITEM: ['item_id', 'item_genre'],
+    }
+
+    with tf.Graph().as_default(), tf.Session() as sess:
+        net = BilinearNet(EmbeddingMap(cats_d, embedding_dim=4),
+                          code_df_cols[FGroup.USER],
+                          code_df_cols[FGroup.ITEM],
+                          [])
+        # Non-zero biases so they are covered too
+        sess.run(tf.global_variables_initializer())
+        for b in net.embedding_map.biases_d.values():
+            sess.run(b.assign(rand.randn(*b.shape.as_list())))
+
+        fwd_dict = fwd_dict_via_cats(cats_d.keys())
+        fwd_op = net.forward(fwd_dict)
+        user_inds = rand.randint(n_users, size=50)
+        item_inds = rand.randint(n_items, size=50)
+        feed_dict = {}
+        for fg, inds in [(FGroup.USER, user_inds), (FGroup.ITEM, item_inds)]:
+            for j, col in enumerate(code_df_cols[fg]):
+                feed_dict[fwd_dict[col]] = feats_codes_arrs[fg][inds, j]
+        expected = sess.run(fwd_op, feed_dict=feed_dict)
+
+        scorer = scoring.SnapshotScorer(net, feats_codes_arrs, code_df_cols)
+        scorer.step(sess)
+        np.testing.assert_allclose(scorer.score(user_inds, item_inds),
+                                   expected, rtol=1e-5, atol=1e-6)
+
+
+def test_progressive_first_violation():
+    """
+    Progressive WARP search should find the same violators as a full search
+    while scoring fewer candidates
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items, max_sampled = 30, 100, 32
+    scores = rand.randn(n_users, n_items)
+    n_scored = []
+
+    def score_fn(user_inds, item_inds):
+        n_scored.append(len(user_inds))
+        return scores[user_inds, item_inds]
+
+    user_inds = rand.randint(n_users, size=200)
+    pos_item_inds = rand.randint(n_items, size=200)
+    results = []
+    for progressive in [False, True]:
+        np.random.seed(1)
+        n_scored.clear()
+        results.append(adaptive.sample_adaptive(
+            n_items, max_sampled, score_fn, user_inds, pos_item_inds,
+            use_first_violation=True, return_n_samp=True,
+            progressive=progressive))
+        results[-1] += (sum(n_scored),)
+
+    (negs_full, inds_full, n_full), (negs_prog, inds_prog, n_prog) = results
+    np.testing.assert_array_equal(negs_full, negs_prog)
+    np.testing.assert_array_equal(inds_full, inds_prog)
+    assert n_prog < n_full
+
+
+def test_feed_tuples(data):
+    """
+    Feed tuples should be laid out like `feed_keys` and match the feed dicts
+    """
+    sampler, cats_d, interactions_df, feat_codes_df_d = data
+    sampler.input_pair_d = {k: None for k in [
+        'neg.item_feat1_code', 'user.user_feat0_code', 'pos.item_feat2_code']}
+
+    def first_batches(gen_fn):
+        np.random.seed(0)
+        sampler.rand = sampler.shuffle_rand = np.random.RandomState(0)
+        sampler.scheduler.setup(sampler.pos_xn_coo, interactions_df)
+        gen = gen_fn()
+        return [next(gen) for _ in range(N_BATCHES_TEST)]
+
+    for feed_d, feed in zip(first_batches(sampler.iter_feed_pairs),
+                            first_batches(sampler.iter_feed_tuples)):
+        assert len(feed) == len(sampler.feed_keys)
+        for k, v in zip(sampler.feed_keys, feed):
+            np.testing.assert_array_equal(feed_d[k], v)
+
+
+@pytest.mark.parametrize('reuse_buffers', [False, True])
+def test_gather(data, reuse_buffers):
+    """
+    Gathers should match plain indexing, and raise on bad indices
+    (even when gathering into reused buffers)
+    """
+    sampler = data[0]
+    sampler.reuse_buffers = reuse_buffers
+    arr = sampler.feats_codes_arrs[FGroup.ITEM]
+    inds = np.array([[4, 0, 2], [1, 1, 3]])
+    np.testing.assert_array_equal(sampler.gather('rows', arr, inds),
+                                  arr[inds])
+    cols = sampler.gather('cols', arr, inds, transpose=True)
+    np.testing.assert_array_equal(cols, np.moveaxis(arr[inds], -1, 0))
+    assert cols.flags.c_contiguous
+    with pytest.raises(IndexError):
+        sampler.gather('rows', arr, np.array([0, len(arr)]))
+
+
+@pytest.mark.parametrize('method', ['uniform', 'uniform_verified'])
+def test_uniform_users(method):
+    """
+    Sampling by user should pick one of the user's positives
+    (and verified negatives should not be positives), skipping the users
+    without interactions
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items, batch_size = 20, 10, 8
+    # The first and the last two users have no interactions
+    n_cold_users = 3
+    interactions_df = pd.DataFrame({
+        'user_id': 1 + np.r_[np.arange(n_users - n_cold_users),
+                             rand.randint(n_users - n_cold_users, size=60)],
+        'item_id': rand.randint(n_items, size=n_users - n_cold_users + 60),
+    }).drop_duplicates()
+    cats_d = {'user_id': list(range(n_users)),
+              'item_id': list(range(n_items))}
+    for col, cats in cats_d.items():
+        interactions_df[col] = interactions_df[col].astype(
+            CategoricalDtype(cats))
+    cols_d = {FGroup.USER: 'user_id', FGroup.ITEM: 'item_id',
+              'activity': 'activity', 'count': 'count'}
+    feat_codes_df_d = {
+        FGroup.USER: pd.DataFrame({'user_code': np.arange(n_users)}),
+        FGroup.ITEM: pd.DataFrame({'item_code': np.arange(n_items)}),
+    }
+    sampler = PairSampler(
+        interactions_df, cols_d, cats_d, feat_codes_df_d,
+        {FGroup.USER: {}, FGroup.ITEM: {}},
+        {k: tf.placeholder('int32', (batch_size,)) for k in
+         ['user.user_code', 'pos.item_code', 'neg.item_code']},
+        batch_size,
+        uniform_users=True,
+        method=method,
+    )
+
+    assert sampler.scheduler.epoch_len == n_users - n_cold_users
+    xn_set = set(zip(interactions_df['user_id'], interactions_df['item_id']))
+    gen = sampler.__iter__()
+    for batch_i in range(N_BATCHES_TEST):
+        sampled_batch = next(gen)
+        users = sampled_batch['user.user_code']
+        assert all((u, i) in xn_set
+                   for u, i in zip(users, sampled_batch['pos.item_code']))
+        if method != 'uniform':
+            assert not any((u, i) in xn_set for u, i in zip(
+                users, sampled_batch['neg.item_code'][0]))
+
+
+@pytest.mark.parametrize('method', ['uniform', 'uniform_verified'])
+@pytest.mark.parametrize('uniform_users', [False, True])
+def test_native_uniform_pair_dataset(method, uniform_users):
+    """
+    The native dataset should feed the same keys and shapes as the
+    generator, with in-range negatives (not positives if verified)
+    """
+    rand = np.random.RandomState(0)
+    n_users, n_items, batch_size, n_neg = 6, 8, 4, 3
+    interactions_df = pd.DataFrame({
+        'user_id': np.r_[np.arange(n_users), rand.randint(n_users, size=20)],
+        'item_id': rand.randint(n_items, size=n_users + 20),
+    }).drop_duplicates()
+    cats_d = {'user_id': list(range(n_users)),
+              'item_id': list(range(n_items))}
+    for col, cats in cats_d.items():
+        interactions_df[col] = interactions_df[col].astype(
+            CategoricalDtype(cats))
+    cols_d = {FGroup.USER: 'user_id', FGroup.ITEM: 'item_id',
+              'activity': 'activity', 'count': 'count'}
+    feat_codes_df_d = {
+        FGroup.USER: pd.DataFrame({'user_code': np.arange(n_users)}),
+        FGroup.ITEM: pd.DataFrame({'item_code': np.arange(n_items)}),
+    }
+
+    with tf.Graph().as_default(), tf.Session() as sess:
+        sampler = PairSampler(
+            interactions_df, cols_d, cats_d, feat_codes_df_d,
+            {FGroup.USER: {}, FGroup.ITEM: {}},
+            {k: tf.placeholder('int32', (batch_size,)) for k in
+             ['user.user_code', 'pos.item_code', 'neg.item_code']},
+            batch_size,
+            uniform_users=uniform_users,
+            method=method,
+            n_neg=n_neg,
+            seed=0,
+        )
+        expected = next(iter(sampler))
+        ds, feed_dict = native.uniform_pair_dataset(sampler)
+        # The arrays are fed, not embedded in the graph
+        assert any(np.array_equal(arr, sampler.feats_codes_arrs[FGroup.ITEM])
+                   for arr in feed_dict.values())
+        ds_iter = ds.make_initializable_iterator()
+        sess.run(ds_iter.initializer, feed_dict=feed_dict)
+        next_feed = ds_iter.get_next()
+
+        xn_set = set(zip(interactions_df['user_id'],
+                         interactions_df['item_id']))
+        for _ in range(N_BATCHES_TEST):
+            feed_d = sess.run(next_feed)
+            assert feed_d.keys() == expected.keys()
+            for k, v in expected.items():
+                assert feed_d[k].shape == np.shape(v)
+            users = feed_d['user.user_code']
+            negs = feed_d['neg.item_code']
+            assert all((u, i) in xn_set
+                       for u, i in zip(users, feed_d['pos.item_code']))
+            assert ((0 <= negs) & (negs < n_items)).all()
+            if method == 'uniform_verified':
+                assert not any((u, i) in xn_set
+                               for row in negs for u, i in zip(users, row))
+
+
+def small_sampler(batch_size=4, **kwargs):
+    rand = np.random.RandomState(0)
+    n_users, n_items = 10, 12
+    interactions_df = pd.DataFrame({
+        'user_id': rand.randint(n_users, size=40),
+        'item_id': rand.randint(n_items, size=40),
+    }).drop_duplicates()
+    cats_d = {'user_id': list(range(n_users)),
+              'item_id': list(range(n_items))}
+    for col, cats in cats_d.items():
+        interactions_df[col] = interactions_df[col].astype(
+            CategoricalDtype(cats))
+    cols_d = {FGroup.USER: 'user_id', FGroup.ITEM: 'item_id',
+              'activity': 'activity', 'count': 'count'}
+    feat_codes_df_d = {
+        FGroup.USER: pd.DataFrame({'user_code': np.arange(n_users)}),
+        FGroup.ITEM: pd.DataFrame({'item_code': np.arange(n_items)}),
+    }
+    return PairSampler(
+        interactions_df, cols_d, cats_d, feat_codes_df_d,
+        {FGroup.USER: {}, FGroup.ITEM: {}},
+        {k: tf.placeholder('int32', (batch_size,)) for k in
+         ['user.user_code', 'pos.item_code', 'neg.item_code']},
+        batch_size, **kwargs)
+
+
+def test_seed_stream():
+    """
+    Serial sampling keeps the epoch orders of a seed
+    (one `RandomState(seed)` stream, shuffling in place)
+    """
+    sampler = small_sampler(seed=3)
+    n_xns = len(sampler.pos_xn_coo.data)
+    rand = np.random.RandomState(3)
+    expected = np.arange(n_xns)
+    gen = iter(sampler)
+    for _ in range(2):
+        rand.shuffle(expected)
+        for start in range(0, n_xns - sampler.batch_size + 1,
+                           sampler.batch_size):
+            inds = expected[start:start + sampler.batch_size]
+            feed_d = next(gen)
+            np.testing.assert_array_equal(feed_d['user.user_code'],
+                                          sampler.pos_xn_coo.row[inds])
+            np.testing.assert_array_equal(feed_d['pos.item_code'],
+                                          sampler.pos_xn_coo.col[inds])
+
+
+def test_iter_feed_pairs_parallel():
+    """
+    With workers, feed dicts should be keyed like the serial ones (by
+    placeholder when feeding a session), and hold their own copies
+    """
+    sampler = small_sampler(n_workers=2, use_ds_iter=False)
+    xn_set = set(zip(sampler.pos_xn_coo.row, sampler.pos_xn_coo.col))
+    gen = iter(sampler)
+    feeds = [next(gen) for _ in range(N_BATCHES_TEST)]
+    gen.close()
+
+    placeholders = sampler.input_pair_d
+    for feed_d in feeds:
+        assert set(feed_d) == set(placeholders.values())
+        users = feed_d[placeholders['user.user_code']]
+        pos = feed_d[placeholders['pos.item_code']]
+        assert all((u, i) in xn_set for u, i in zip(users, pos))
+    for feed_d, next_feed_d in zip(feeds, feeds[1:]):
+        assert not any(np.shares_memory(feed_d[k], next_feed_d[k])
+                       for k in feed_d)
+
+
+def test_capped_user_scheduler():
+    """
+    Each user should get at most `k` (distinct) interactions per epoch
+    """
+    rand = np.random.RandomState(0)
+    n_users, k = 30, 3
+    users = np.minimum(rand.zipf(1.5, size=500) - 1, n_users - 1)
+    xn_coo = sp.coo_matrix((np.ones(len(users), dtype=bool),
+                            (users, np.arange(len(users)))))
+    scheduler = schedulers.CappedUserScheduler(k)
+    scheduler.setup(xn_coo, None)
+
+    for _ in range(3):
+        inds = scheduler.epoch_inds(rand)
+        assert len(inds) == scheduler.epoch_len
+        assert len(np.unique(inds)) == len(inds)
+        np.testing.assert_array_equal(
+            np.bincount(xn_coo.row[inds], minlength=n_users),
+            np.minimum(np.bincount(users, minlength=n_users), k))
+
+
+def test_kos_n_items_with_item_vocab():
+    """
+    The k-OS rank weights should use the number of items, not the number
+    of (hashed) embedding rows of the item ids
+    """
+    rand = np.random.RandomState(0)
+    n_items, n_buckets = 30, 4
+    xn_df = pd.DataFrame({
+        'user_id': [f'u{i}' for i in rand.randint(10, size=100)],
+        'item_id': [f'i{i}' for i in np.r_[np.arange(n_items),
+                                           rand.randint(n_items, size=70)]],
+    })
+    with tf.Graph().as_default():
+        task_wrapper = FactorizationTaskWrapper(
+            loss_fn='kos',
+            sample_method='adaptive_warp',
+            interactions=InteractionsSource(
+                xn_df, user_col='user_id', item_col='item_id'),
+            group_features={FGroup.USER: [], FGroup.ITEM: []},
+            vocab_policies={'item_id': HashVocab(n_buckets)},
+            embedding_map_kwargs={'embedding_dim': 4},
+            batch_size=8,
+        )
+    assert len(task_wrapper.embedding_map.cats_d['item_id']) == n_buckets
+    assert task_wrapper.task.n_items == n_items
+    assert task_wrapper.sampler.n_items == n_items
+
+
+def test_update_from_data_loader():
+    """
+    An updated sampler should match one made from all the interactions
+    """
+    def xn_src(df):
+        return InteractionsSource(df.copy(), user_col='user_id',
+                                  item_col='item_id')
+
+    xn_df = pd.DataFrame([['u1', 'i1'], ['u1', 'i2'], ['u2', 'i2']],
+                         columns=['user_id', 'item_id'])
+    delta_df = pd.DataFrame([['u3', 'i1'], ['u1', 'i3']],
+                            columns=['user_id', 'item_id'])
+
+    def make_sampler(loader):
+        input_pair_d = {
+            f'{tag}.{col}': tf.placeholder('int32', (2,))
+            for tag, col in [('user', 'user_id'), ('pos', 'item_id'),
+                             ('neg', 'item_id')]}
+        return PairSampler.from_data_loader(
+            loader, input_pair_d, batch_size=2, method='uniform_verified')
+
+    def pairs(sampler, xn_mat, loader):
+        xn_coo = xn_mat.tocoo()
+        return {(loader.cats_d['user_id'][u], loader.cats_d['item_id'][i])
+                for u, i in zip(xn_coo.row, xn_coo.col)}
+
+    loader = TrainDataLoader(xn_src(xn_df))
+    sampler = make_sampler(loader)
+    growth = loader.update(xn_src(delta_df))
+    assert growth == {'user_id': (2, 3), 'item_id': (2, 3)}
+    sampler.update_from_data_loader(loader)
+
+    full_loader = TrainDataLoader(xn_src(pd.concat([xn_df, delta_df])))
+    full_sampler = make_sampler(full_loader)
+
+    assert (sampler.n_users, sampler.n_items) == \
+        (full_sampler.n_users, full_sampler.n_items)
+    assert sampler.scheduler.epoch_len == 5
+    assert pairs(sampler, sampler.pos_xn_coo, loader) == \
+        pairs(full_sampler, full_sampler.pos_xn_coo, full_loader)
+    assert pairs(sampler, sampler.non_neg_xn_csr, loader) == \
+        pairs(full_sampler, full_sampler.non_neg_xn_csr, full_loader)
+    # Features stay aligned with the (stable) codes
+    for fg, col in [(FGroup.USER, 'user_id'), (FGroup.ITEM, 'item_id')]:
+        np.testing.assert_array_equal(
+            sampler.feats_codes_arrs[fg][:, 0],
+            np.arange(len(loader.cats_d[col])))
+
+
+def test_profile(data):
+    sampler, cats_d, interactions_df, _ = data
+    report = profiling.profile(sampler=sampler)
+    json.dumps(report)
+
+    sampling = report['sampler']['sampling']
+    assert sampling['verified'] == ('verified' in sampler.method)
+    # u1 has 5 of the 6 positives (3 distinct items), u2 has 1 (1 item)
+    assert np.isclose(sampling['expected_row_len'], (5 * 3 + 1 * 1) / 6)
+    assert sampling['batches_per_epoch'] == 3
+    assert report['sampler']['bytes']['pos_xn_coo'] == \
+        sampler.pos_xn_coo.row.nbytes + sampler.pos_xn_coo.col.nbytes + \
+        sampler.pos_xn_coo.data.nbytes
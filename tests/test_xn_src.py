@@ -1,9 +1,12 @@
+import numpy as np
 import pandas as pd
 import os
+import pytest
 
-from tophat.data import InteractionsSource
+from tophat.data import InteractionsSource, InteractionsDerived
+from tophat.utils import cache
 
-from tempfile import NamedTemporaryFile
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 
 
 xn_df1 = pd.DataFrame([
@@ -52,8 +55,140 @@ def test_xn_fn_src():
     assert xn.data.equals(xn_df2)
 
 
-
-
-
-
-
+def test_xn_src_chunked():
+    with TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'xns.csv')
+        xn_df1.to_csv(csv_path, index=False)
+
+        xn = InteractionsSource(
+            path=csv_path,
+            **col_params,
+            activity_filter_set={'a1'},
+            chunksize=1,
+            codes_dir=os.path.join(tmp_dir, 'codes'),
+        )
+        xn.load()
+
+        # (codes narrowed to the dtype of the categorical codes)
+        assert xn.arrs['user_id'].dtype == xn.data['user_id'].cat.codes.dtype
+        for col in ['user_id', 'item_id', 'activity']:
+            assert (xn.data[col].astype(str).values ==
+                    xn_df2[col].values).all()
+        assert (xn.data['count'].values == xn_df2['count'].values).all()
+
+
+def test_xn_src_chunked_mixed_ids():
+    """Ids that look numeric in one chunk and not in another should still
+    be encoded once"""
+    with TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'xns.csv')
+        pd.DataFrame({
+            'user_id': ['1', '2', 'a', '1'],
+            'item_id': ['10', 'b', '10', '20'],
+        }).to_csv(csv_path, index=False)
+
+        xn = InteractionsSource(
+            path=csv_path,
+            user_col='user_id',
+            item_col='item_id',
+            chunksize=2,
+            codes_dir=os.path.join(tmp_dir, 'codes'),
+        )
+        xn.load()
+
+        assert xn.vocabs['user_id'].categories.tolist() == ['1', '2', 'a']
+        assert xn.vocabs['item_id'].categories.tolist() == ['10', 'b', '20']
+        assert xn.arrs['user_id'].tolist() == [0, 1, 2, 0]
+        assert xn.arrs['item_id'].tolist() == [0, 1, 0, 2]
+        # the loaded codes are views of the memory-mapped code files
+        for col in ['user_id', 'item_id']:
+            codes = xn.data[col].cat.codes.values
+            assert np.shares_memory(codes, xn.arrs[col])
+        assert isinstance(xn.arrs['user_id'], np.memmap)
+
+
+def test_xn_src_parquet():
+    pytest.importorskip('pyarrow')
+    with TemporaryDirectory() as tmp_dir:
+        pq_path = os.path.join(tmp_dir, 'xns.parquet')
+        xn_df1.assign(other=0.).to_parquet(pq_path, index=False)
+
+        xn = InteractionsSource(
+            path=pq_path,
+            **col_params,
+            activity_filter_set={'a1'},
+            use_cols=[],
+        )
+        xn.load()
+
+        assert list(xn.data.columns) == list(xn_df2.columns)
+        assert xn.data['user_id'].dtype == 'category'
+        assert xn.data['activity'].cat.categories.tolist() == ['a1']
+        assert xn.data.astype(xn_df2.dtypes).equals(xn_df2)
+
+
+n_calls = []
+
+
+def only_a1(xn_src):
+    n_calls.append(1)
+    return xn_src.data.loc[xn_src.data['activity'] == 'a1']
+
+
+def test_xn_derived():
+    with TemporaryDirectory() as memo_dir:
+        parent = InteractionsSource(path=xn_df1.copy(), **col_params)
+        derived = InteractionsDerived(parent, only_a1, memoize=False,
+                                      memo_dir=memo_dir)
+        # The parent is loaded for the derived data
+        assert derived.data.equals(xn_df2)
+        # Later accesses (and other instances) read the persisted data back
+        assert derived.data.equals(xn_df2)
+        other = InteractionsDerived(parent, only_a1, memo_dir=memo_dir)
+        assert other.data.equals(xn_df2)
+        assert len(n_calls) == 1
+
+        # Another function is another entry
+        a2 = InteractionsDerived(
+            parent, lambda xn_src: xn_src.data.iloc[2:], memo_dir=memo_dir)
+        assert len(a2.data) == 1
+        assert len(os.listdir(memo_dir)) == 2
+
+
+def test_xn_derived_memo_key(monkeypatch):
+    """The memo key is only fingerprinted once per derived source"""
+    fingerprints = []
+
+    def fingerprint(*objs):
+        fingerprints.append(objs)
+        return 'key'
+    monkeypatch.setattr(cache, 'fingerprint', fingerprint)
+    with TemporaryDirectory() as memo_dir:
+        parent = InteractionsSource(path=xn_df1.copy(), **col_params)
+        derived = InteractionsDerived(parent, only_a1, memoize=False,
+                                      memo_dir=memo_dir)
+        for _ in range(3):
+            assert derived.data.equals(xn_df2)
+        assert len(fingerprints) == 1
+
+
+def test_xn_derived_fingerprint():
+    """Computing the memo key does not change the fingerprint of a derived
+    source (ex. in the cache key of a data loader)"""
+    with TemporaryDirectory() as memo_dir:
+        parent = InteractionsSource(path=xn_df1.copy(), **col_params)
+        derived = InteractionsDerived(parent, only_a1, memo_dir=memo_dir)
+        key = cache.fingerprint(derived)
+        assert derived.memo_key
+        assert cache.fingerprint(derived) == key
+
+
+def test_xn_derived_lru(monkeypatch):
+    monkeypatch.setattr(InteractionsDerived, 'max_memos', 2)
+    parent = InteractionsSource(path=xn_df1.copy(), **col_params)
+    derived_l = [InteractionsDerived(parent, lambda xn_src: xn_src.data)
+                 for _ in range(3)]
+    for derived in derived_l:
+        assert derived.data is not None
+    assert derived_l[0].memo is None
+    assert all(derived.memo is not None for derived in derived_l[1:])
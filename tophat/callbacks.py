@@ -99,10 +99,19 @@ class Projector(Callback):
 
 
 class ModelSaver(Callback):
-    def __init__(self, save_dir, sess=None):
+    def __init__(self, save_dir, sess=None, sharded=False):
+        """Saves a checkpoint at the end of training
+
+        Args:
+            save_dir: Directory to save the checkpoint in
+            sess: Session holding the variables
+            sharded: If `True`, write a checkpoint shard per device (see
+                `EmbeddingMap(n_shards=...)` to place table shards on
+                different devices)
+        """
         super().__init__()
         self.sess = sess
-        self.saver = tf.train.Saver()
+        self.saver = tf.train.Saver(sharded=sharded)
         self.save_dir = save_dir
 
     def on_train_end(self, logs=None):
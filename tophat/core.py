@@ -43,6 +43,8 @@ class TophatModel(object):
             task.sampler.sess = self.sess
         init = tf.global_variables_initializer()
         self.sess.run(init)
+        for task in self.tasks:
+            task.init_dataset(self.sess)
 
     def fit(self,
             n_epochs: Optional[int] = 1,
@@ -129,7 +131,8 @@ class TophatModel(object):
         return preds_arr
 
     def write_vocab(self, dir_export: Union[str, Path]):
-        write_vocab(dir_export, self.embedding_map.cats_d)
+        write_vocab(dir_export, self.embedding_map.cats_d,
+                    self.embedding_map.labelers)
 
     def write_cats(self, path_export):
         pickle.dump(self.embedding_map.cats_d, open(path_export, 'wb'))
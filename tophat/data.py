@@ -2,21 +2,30 @@ import numpy as np
 import pandas as pd
 from pandas.api.types import CategoricalDtype
 import itertools as it
-from collections import defaultdict
+import time
+import weakref
+from collections import defaultdict, OrderedDict
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import Optional, Iterable, Tuple, Dict, List, Any, Sized, \
     Sequence, Union, Callable
 
 from tophat.constants import FType, FGroup
 from tophat.utils.pp_utils import append_dt_extracts
+from tophat.utils import chunked, cache, columnar
 from tophat.utils.convenience import filter_col_isin, log_shape_or_npartitions
 from tophat.utils.log import logger
+from tophat.vocab import VocabPolicy
 
 
 class FeatureSource(object):
     """Container for a source of feature-related data
 
     Args:
-        path: Path of the data
+        path: Path of the data. Without a `load_fn`, a Parquet file (or
+            directory of files) is read column-wise: only the index and
+            `use_cols` columns are read, and categorical features stay
+            dictionary-encoded (see `tophat.utils.columnar`)
         feature_type: Type of feature (ex. categorical, numerical)
         index_col: Name of the column to set as the index
         use_cols: Subset of columns to consider
@@ -25,6 +34,8 @@ class FeatureSource(object):
         load_fn: function to load features from path
         load_kwargs: kwargs for `load_fn`
         name: Name of the data source
+        concat_mode: how to combine `concat_cols` (see `combine_cols`)
+        n_buckets: number of hash buckets for the `hash` `concat_mode`
     """
 
     def __init__(self,
@@ -38,10 +49,14 @@ class FeatureSource(object):
                      [Union[str, pd.DataFrame]], pd.DataFrame]] = None,
                  load_kwargs: Optional[Dict] = None,
                  name=None,
+                 concat_mode: str = 'str',
+                 n_buckets: Optional[int] = None,
                  ):
 
         self.name = name
         self.path = path
+        self.columnar = load_fn is None and isinstance(path, (str, Path)) \
+            and columnar.is_parquet(path)
         self.load_fn = load_fn or (lambda x: x)
         self.load_kwargs: Dict = load_kwargs or {}
         self.feature_type = feature_type
@@ -49,8 +64,14 @@ class FeatureSource(object):
         self.use_cols = use_cols
         self.concat_cols = concat_cols
         self.drop_cols = drop_cols
+        self.concat_mode = concat_mode
+        self.n_buckets = n_buckets
 
         self.data = None
+        # Labelers of the combined columns (see `combine_cols`)
+        self.labelers: Dict[str, CrossedLabeler] = {}
+        # Seconds taken by the last load
+        self.load_secs = None
 
     def __str__(self):
         return f'FeatureSource({self.name})'
@@ -68,7 +89,11 @@ class FeatureSource(object):
         if not (force_reload or self.data is None):
             logger.info('Already loaded')
         else:
-            feat_df = self.load_fn(self.path, **self.load_kwargs)
+            tic = time.perf_counter()
+            if self.columnar:
+                feat_df = self.read_columnar()
+            else:
+                feat_df = self.load_fn(self.path, **self.load_kwargs)
             if hasattr(feat_df, 'compute'):  # cant `.isin` dask
                 feat_df = feat_df.compute()
             if self.index_col:
@@ -86,20 +111,42 @@ class FeatureSource(object):
 
             if self.concat_cols is not None:
                 self.data = combine_cols(df=self.data,
-                                         cols_seq=self.concat_cols)
+                                         cols_seq=self.concat_cols,
+                                         mode=self.concat_mode,
+                                         n_buckets=self.n_buckets,
+                                         labelers=self.labelers)
 
             if self.drop_cols:
                 self.data.drop(list(set(self.drop_cols)), axis=1, inplace=True)
 
+            self.load_secs = time.perf_counter() - tic
+
         return self
 
+    def read_columnar(self) -> pd.DataFrame:
+        """Reads a Parquet source (only the index and used columns)"""
+        columns = None if self.use_cols is None else \
+            [col for col in [self.index_col] if col] + list(self.use_cols)
+        categorical_cols = None
+        if self.feature_type == FType.CAT:
+            categorical_cols = [
+                col for col in columns or columnar.column_names(self.path)
+                if col != self.index_col]
+        return columnar.read_parquet(self.path, columns=columns,
+                                     categorical_cols=categorical_cols,
+                                     **self.load_kwargs)
+
 
 FeatureSourceDictType = Dict[FGroup, Optional[Iterable[FeatureSource]]]
 
 
 def combine_cols(df: pd.DataFrame,
                  cols_seq: Sequence[Sequence[str]],
-                 sep: str='__'):
+                 sep: str='__',
+                 mode: str='str',
+                 n_buckets: Optional[int]=None,
+                 labelers: Optional[Dict[str, 'CrossedLabeler']]=None,
+                 ):
     """Concatenates columns (will output str dtypes)
     
     Args:
@@ -107,6 +154,17 @@ def combine_cols(df: pd.DataFrame,
         cols_seq: list-like of list-like columns to concat together
         sep: string separator
             Note: careful - tensorflow needs `[A-Za-z0-9_.\\-/]*` for scope
+        mode: One of {'str', 'codes', 'hash'}
+
+            - str: concatenated strings
+            - codes: int32 codes of the combinations (the codes of the
+              columns combined arithmetically). Codes depend on the data,
+              so they are not comparable across loads of different data
+            - hash: int32 bucket of a hash of the combination (stable
+              across loads, but combinations may collide)
+        n_buckets: number of hash buckets (`hash` mode)
+        labelers: dictionary to add a `CrossedLabeler` to per combined
+            column (`codes` and `hash` modes) -- to write labels later
 
     Returns:
         df: df with concatenated columns
@@ -115,17 +173,113 @@ def combine_cols(df: pd.DataFrame,
 
     for cols in cols_seq:
         new_col_name = sep.join(cols)
-        df[new_col_name] = df[cols[0]].astype(str).str.cat(
-            [df[col].astype(str) for col in cols[1:]], sep=sep)
+        if mode == 'str':
+            df[new_col_name] = df[cols[0]].astype(str).str.cat(
+                [df[col].astype(str) for col in cols[1:]], sep=sep)
+            continue
+
+        factorized = [factorize_with_nan(df[col]) for col in cols]
+        radix = np.prod([float(len(uniques)) for _, uniques in factorized])
+        if radix >= np.iinfo(np.int64).max:
+            raise ValueError(f'Too many combinations to cross {cols}')
+        key = np.zeros(len(df), dtype=np.int64)
+        for codes, uniques in factorized:
+            key = key * len(uniques) + codes
+        codes, keys = pd.factorize(key)
+
+        if mode == 'codes':
+            df[new_col_name] = codes.astype(np.int32)
+        elif mode == 'hash':
+            if not n_buckets:
+                raise ValueError('`hash` mode requires `n_buckets`')
+            # Hash the unique values of each column, then mix per row
+            h = np.zeros(len(df), dtype=np.uint64)
+            for col_codes, uniques in factorized:
+                h = h * np.uint64(0x9E3779B97F4A7C15) ^ \
+                    pd.util.hash_array(np.asarray(uniques))[col_codes]
+            buckets = (h % np.uint64(n_buckets)).astype(np.int32)
+            df[new_col_name] = buckets
+            # A representative combination of each (non-empty) bucket
+            bucket_keys = np.full(n_buckets, -1, dtype=np.int64)
+            bucket_keys[buckets[::-1]] = key[::-1]  # (first occurrence)
+            keys = bucket_keys
+        else:
+            raise ValueError(f'Unknown combine mode {mode}')
+
+        if labelers is not None:
+            labelers[new_col_name] = CrossedLabeler(
+                [uniques for _, uniques in factorized], keys, sep)
 
     return df
 
 
+def factorize_with_nan(s: pd.Series) -> Tuple[np.array, np.array]:
+    """Factorizes with missing values as their own (last) unique value"""
+    codes, uniques = pd.factorize(s)
+    uniques = np.asarray(uniques, dtype=object)
+    missing = codes < 0
+    if missing.any():
+        codes = np.where(missing, len(uniques), codes)
+        # (the missing value itself, so labels match `astype(str)`)
+        uniques = np.append(uniques, np.asarray(s, dtype=object)[
+            np.argmax(missing)])
+    return codes, uniques
+
+
+class CrossedLabeler(object):
+    """Builds the human-readable labels of a combined column lazily
+    (for vocab files and projector metadata) -- see `combine_cols`
+
+    Args:
+        uniques: unique values of each of the combined columns
+        keys: the combination (mixed-radix of the codes of the columns) of
+            each value of the combined column (-1 if unknown)
+        sep: string separator
+    """
+
+    def __init__(self,
+                 uniques: Sequence[np.array],
+                 keys: np.array,
+                 sep: str='__',
+                 ):
+        self.uniques = uniques
+        self.keys = keys
+        self.sep = sep
+
+    def labels(self, values: Iterable[int]) -> List[str]:
+        """Labels of values of the combined column
+
+        Args:
+            values: values (codes or buckets) of the combined column
+
+        Returns:
+            List of labels (the value itself if its combination is unknown)
+        """
+        values = np.asarray(values, dtype=np.int64)
+        in_range = (values >= 0) & (values < len(self.keys))
+        keys = np.where(in_range, self.keys[np.where(in_range, values, 0)],
+                        -1)
+        known = keys >= 0
+        keys = np.maximum(keys, 0)
+        parts = []
+        for uniques in self.uniques[::-1]:
+            parts.append(pd.Series(uniques[keys % len(uniques)]).astype(str))
+            keys = keys // len(uniques)
+        parts = parts[::-1]
+        labels = parts[0].str.cat(parts[1:], sep=self.sep)
+        return labels.where(known, pd.Series(values).astype(str)).tolist()
+
+
 class InteractionsSource(object):
     """Container for a source of interaction-related data
 
     Args:
-        path: Path of the data or a pre-loaded dataframe
+        path: Path of the data or a pre-loaded dataframe. Without a
+            `load_fn`, a Parquet file (or directory of files) is read
+            column-wise: only the needed columns are read, the activity
+            filter is pushed down into the reader, and the user, item, and
+            activity columns stay dictionary-encoded (as categoricals)
+            -- see `tophat.utils.columnar`
         user_col: Name of the user column
         item_col: Name of the item column
         count_col: Name of the count column
@@ -134,6 +288,21 @@ class InteractionsSource(object):
         load_fn: function to load interactions from path
         load_kwargs: kwargs for `load_fn`
         name: name for this object
+        chunksize: If set, stream `path` (CSV or Parquet) in chunks of this
+            many rows instead of calling `load_fn` -- the user, item, and
+            activity columns are encoded on the fly against growing
+            vocabularies and spilled to disk as integer codes, so that
+            reading holds one chunk (plus the vocabularies) in memory.
+            The loaded `data` is backed by the memory-mapped code files
+            rather than held in memory (though filtering it later still
+            copies the kept rows). Categorical columns of CSV files are
+            read as strings, so that ids are typed the same in every chunk.
+            `load_kwargs` are passed to `pd.read_csv`
+        codes_dir: Directory to write the encoded columns to in chunked mode
+            (a temporary directory if `None`)
+        use_cols: Other columns to keep besides the user, item, count, and
+            activity columns (ex. for context features). If `None`, all
+            columns are kept
     """
 
     def __init__(self,
@@ -147,9 +316,14 @@ class InteractionsSource(object):
                      [Union[str, pd.DataFrame]], pd.DataFrame]] = None,
                  load_kwargs: Optional[Dict] = None,
                  name: Optional[str] = None,
+                 chunksize: Optional[int] = None,
+                 codes_dir: Optional[str] = None,
+                 use_cols: Optional[Sequence[str]] = None,
                  ):
         self.name = name or ''
         self.path = path
+        self.columnar = load_fn is None and isinstance(path, (str, Path)) \
+            and columnar.is_parquet(path)
         self.load_fn = load_fn or (lambda x: x)
         self.load_kwargs: Dict = load_kwargs or {}
         self.user_col = user_col
@@ -157,8 +331,14 @@ class InteractionsSource(object):
         self.count_col = count_col
         self.activity_col = activity_col
         self.activity_filter_set = activity_filter_set
+        self.chunksize = chunksize
+        self.codes_dir = codes_dir
+        self.use_cols = use_cols
 
         self.data = None
+        # Chunked mode: memory-mapped columns and their vocabularies
+        self.arrs: Optional[Dict[str, np.array]] = None
+        self.vocabs: Optional[Dict[str, chunked.GrowingVocab]] = None
 
     def __str__(self):
         return f'InteractionsSource({self.path})'
@@ -175,26 +355,94 @@ class InteractionsSource(object):
     def load(self):
         if self.data is not None:
             logger.info('Already loaded')
+        elif self.chunksize:
+            self.data = self.load_chunked()
+        elif self.columnar:
+            # (the activity filter is already applied by the reader)
+            self.data = self.prep(columnar.read_parquet(
+                self.path,
+                columns=self.read_cols(),
+                filters=self.read_filters(),
+                categorical_cols=self.cat_cols(),
+                **self.load_kwargs), filter_activity=False)
         else:
-            interactions_df = self.load_fn(self.path, **self.load_kwargs)
-            if 'value' in interactions_df.columns \
-                    and self.item_col not in interactions_df.columns:
-                interactions_df = interactions_df.rename(
-                    columns={'value': self.item_col})
-            if self.activity_col and self.activity_filter_set:
-                interactions_df = filter_col_isin(
-                    interactions_df,
-                    self.activity_col, self.activity_filter_set)
+            interactions_df = self.prep(
+                self.load_fn(self.path, **self.load_kwargs))
             if hasattr(interactions_df, 'compute'):
                 interactions_df = interactions_df.compute()
+            if self.use_cols is not None:
+                interactions_df = interactions_df[self.read_cols()]
             self.data = interactions_df
         return self
 
+    def cat_cols(self) -> List[str]:
+        """User, item, and activity columns"""
+        return [col for col in [self.user_col, self.item_col,
+                                self.activity_col] if col]
+
+    def read_cols(self) -> Optional[List[str]]:
+        """Columns to read (`None` for all columns)"""
+        if self.use_cols is None:
+            return None
+        return list(dict.fromkeys(
+            self.cat_cols() + [col for col in [self.count_col] if col] +
+            list(self.use_cols)))
+
+    def read_filters(self) -> Optional[Dict[str, set]]:
+        """Allowed values keyed by column (for readers to push down)"""
+        if self.activity_col and self.activity_filter_set:
+            return {self.activity_col: self.activity_filter_set}
+        return None
+
+    def prep(self, interactions_df, filter_activity: bool = True):
+        """Renames and filters a (chunk of a) loaded dataframe"""
+        if 'value' in interactions_df.columns \
+                and self.item_col not in interactions_df.columns:
+            interactions_df = interactions_df.rename(
+                columns={'value': self.item_col})
+        if filter_activity and self.activity_col and self.activity_filter_set:
+            interactions_df = filter_col_isin(
+                interactions_df,
+                self.activity_col, self.activity_filter_set)
+        return interactions_df
+
+    def load_chunked(self) -> pd.DataFrame:
+        """Streams the interactions in chunks (see `chunksize`)
+
+        Returns:
+            Dataframe of categorical user, item, (and activity) columns
+            backed by the encoded codes, plus the count column (if any)
+        """
+        cat_cols = self.cat_cols()
+        num_cols = [self.count_col] if self.count_col else []
+        # (Parquet readers apply the activity filter themselves)
+        filter_activity = not columnar.is_parquet(self.path)
+        self.vocabs = {}
+        self.arrs = chunked.encode_chunks(
+            # (only the encoded columns are read)
+            chunked.iter_chunks(self.path, self.chunksize,
+                                columns=cat_cols + num_cols,
+                                filters=self.read_filters(),
+                                categorical_cols=cat_cols,
+                                **self.load_kwargs),
+            cat_cols=cat_cols,
+            num_cols=num_cols,
+            codes_dir=self.codes_dir,
+            vocabs=self.vocabs,
+            chunk_fn=lambda chunk: self.prep(chunk, filter_activity),
+        )
+        return chunked.codes_frame(self.arrs, self.vocabs)
+
 
 class InteractionsDerived(object):
     """Container for interaction-related data derived from another
     interaction dataset
 
+    The parent is loaded (once, and shared by all of its derived children)
+    before `fn` is applied. In-memory memos of all derived sources are
+    evicted least recently used first beyond `max_memos` of them (and then
+    re-read from `memo_dir`, or re-derived, on the next access)
+
     Args:
         xn_parent: the parent interaction source to derive data from
         fn: the function to apply to the parent data
@@ -202,7 +450,12 @@ class InteractionsDerived(object):
         item_col: optional item column name (if different from parent)
         activity_col: optional activity column name (if different from parent)
         memoize: if True, memoize the derived data, else, apply the function
-            on every property call
+            on every property call (or read it back from `memo_dir`)
+        memo_dir: Optional directory to persist the derived data to, keyed by
+            a fingerprint of the parent source and of `fn` -- its code and
+            captured values (see `tophat.utils.cache`). Later accesses --
+            also from other instances or processes -- read it back instead
+            of applying `fn`
 
     Todo:
         Wish we could subclass from `InteractionsSource`, but overriding
@@ -210,8 +463,12 @@ class InteractionsDerived(object):
 
     """
 
+    # Derived sources holding a memo, least recently used first
+    memo_lru: 'OrderedDict[int, weakref.ref]' = OrderedDict()
+    max_memos: int = 8
+
     def __init__(self,
-                 xn_parent: InteractionsSource,
+                 xn_parent: Union[InteractionsSource, 'InteractionsDerived'],
                  fn: Callable[[InteractionsSource], pd.DataFrame],
                  user_col: Optional[str]=None,
                  item_col: Optional[str]=None,
@@ -219,12 +476,15 @@ class InteractionsDerived(object):
                  count_col: Optional[str]=None,
                  memoize: bool=True,
                  name: Optional[str] = None,
+                 memo_dir: Optional[str] = None,
                  ):
 
         self.xn_parent = xn_parent
         self.fn = fn
         self.memoize = memoize
         self.memo = None
+        self.memo_dir = memo_dir
+        self._memo_key = None
 
         self.name = name or f'{xn_parent.name}_child'
         self.user_col = user_col or xn_parent.user_col
@@ -234,14 +494,60 @@ class InteractionsDerived(object):
 
     @property
     def data(self):
-        if self.memo is None or not self.memoize:
-            self.memo = self.fn(self.xn_parent)
-        return self.memo
+        if self.memo is not None and self.memoize:
+            self.touch()
+            return self.memo
+
+        key = self.memo_key if self.memo_dir else None
+        derived_df = self.read_memo(key) if key else None
+        if derived_df is None:
+            derived_df = self.fn(self.load().xn_parent)
+            if key:
+                self.write_memo(key, derived_df)
+        if self.memoize:
+            self.memo = derived_df
+            self.touch()
+        return derived_df
 
     def load(self):
         self.xn_parent.load()
         return self
 
+    @property
+    def memo_key(self) -> str:
+        """Fingerprint of the parent source and of `fn` (computed on first
+        access)"""
+        if self._memo_key is None:
+            self._memo_key = cache.fingerprint(
+                'derived', self.xn_parent, self.fn)
+        return self._memo_key
+
+    def read_memo(self, key: str) -> Optional[pd.DataFrame]:
+        """Reads the derived data from `memo_dir` (`None` if absent)"""
+        cached = cache.load_cache(self.memo_dir, key)
+        if cached is None:
+            return None
+        arrays, objects = cached
+        return cache.frame_from_arrays(arrays, objects['meta'], 'derived')
+
+    def write_memo(self, key: str, derived_df: pd.DataFrame):
+        """Writes the derived data to `memo_dir`"""
+        arrays, meta = cache.frame_to_arrays(derived_df, 'derived')
+        cache.save_cache(self.memo_dir, key, arrays,
+                         {'meta': meta})
+
+    def touch(self):
+        """Marks the memo as most recently used, evicting the memos of the
+        least recently used derived sources beyond `max_memos`"""
+        lru = InteractionsDerived.memo_lru
+        lru.pop(id(self), None)
+        lru[id(self)] = weakref.ref(self)
+        while len(lru) > self.max_memos:
+            _, ref = lru.popitem(last=False)
+            evicted = ref()
+            if evicted is not None:
+                evicted.memo = None
+
 
 class TrainDataLoader(object):
     """Convenience container to load and preprocess various sources of
@@ -256,6 +562,19 @@ class TrainDataLoader(object):
         existing_cats_d: Optional dictionary of existing categories
         add_new_cats: if `True`, will append newly seen categories to
             book-keeping dictionary of categories (mutates inplace)
+        cache_dir: Optional directory to cache the encoded data in. The
+            first load writes the categories, feature codes, numerical
+            features, and interactions as `.npy` files under a fingerprint
+            of the sources and options; later loads memory-map them instead
+            of re-loading and re-encoding. Changing any source (path, file
+            contents, or option) changes the fingerprint.
+        n_load_workers: number of feature sources to load concurrently
+            (0 to load one after another)
+        vocab_policies: Optional vocab policies keyed by categorical column
+            (see :mod:`tophat.vocab`) -- how categories map to embedding
+            rows. Unfitted policies are fitted on the training
+            interactions. `cats_d` keeps all categories, and the codes of
+            `feats_codes_df` are the embedding rows (see `emb_cats_d`)
     """
 
     def __init__(self,
@@ -267,6 +586,9 @@ class TrainDataLoader(object):
                  existing_cats_d: Optional[Dict[str, List[Any]]] = None,
                  add_new_cats: Optional[bool] = False,
                  name: Optional[str]=None,
+                 cache_dir: Optional[str] = None,
+                 n_load_workers: int = 0,
+                 vocab_policies: Optional[Dict[str, VocabPolicy]] = None,
                  ):
         self.name = name or interactions_train.name or ''
         self.batch_size = batch_size
@@ -291,6 +613,23 @@ class TrainDataLoader(object):
 
         self.cat_cols = {}
         self.cats_d = existing_cats_d or {}
+        # Labelers of combined feature columns (see `combine_cols`)
+        self.labelers = {}
+        self.vocabs = dict(vocab_policies or {})
+
+        self.cache_dir = cache_dir
+        self.cache_key = None
+        if self.cache_dir is not None:
+            # (before loading mutates any of these)
+            self.cache_key = cache.fingerprint(
+                interactions_train, group_features, specific_feature,
+                context_cols, existing_cats_d, add_new_cats, self.vocabs)
+            cached = cache.load_cache(self.cache_dir, self.cache_key)
+            if cached is not None:
+                self.delta_interactions_df = None
+                self.restore_encoding(*cached)
+                self.set_aliases()
+                return
 
         self.interactions_df, self.feats_by_group = \
             load_simple(
@@ -299,7 +638,13 @@ class TrainDataLoader(object):
                 specific_feature,
                 existing_cats_d=self.cats_d,
                 add_new_cats=add_new_cats,
+                n_load_workers=n_load_workers,
             )
+        self.labelers.update({
+            col: labeler
+            for srcs in group_features.values() for src in srcs or []
+            for col, labeler in src.labelers.items()
+        })
 
         for fgroup in [FGroup.USER, FGroup.ITEM]:
             col = self.cols[fgroup]
@@ -308,14 +653,14 @@ class TrainDataLoader(object):
 
             if not existing_cats_d:
                 self.cats_d.update({
-                    feat_name: feats[FType.CAT][feat_name].cat.categories.tolist()
+                    feat_name: feats[FType.CAT][feat_name].cat.categories
                     for feat_name in self.cat_cols[fgroup]
                 })
 
                 # If the user or item ids are not present in feature tables
                 if col not in self.cats_d:
                     self.cats_d[col] = self.interactions_df[col]\
-                        .cat.categories.tolist()
+                        .cat.categories
 
         self.context_cat_cols = context_cols or []
         if self.context_cat_cols:
@@ -323,11 +668,19 @@ class TrainDataLoader(object):
             if not existing_cats_d:
                 for col in self.context_cat_cols:
                     self.cats_d[col] = self.interactions_df[col]\
-                        .cat.categories.tolist()
+                        .cat.categories
 
+        self.fit_vocabs()
         self.make_feat_codes()
         self.process_num()
+        # Interactions appended by the last `update`
+        self.delta_interactions_df = None
+
+        if self.cache_key is not None:
+            self.save_encoding()
+        self.set_aliases()
 
+    def set_aliases(self):
         # Alias Attributes
         self.user_col = self.cols[FGroup.USER]
         self.item_col = self.cols[FGroup.ITEM]
@@ -344,27 +697,289 @@ class TrainDataLoader(object):
         self.n_users = self.interactions_df[self.user_col].nunique()
         self.n_items = self.interactions_df[self.item_col].nunique()
 
+    def save_encoding(self):
+        """Writes the encoded data to the cache (see `cache_dir`)"""
+        arrays = {}
+        metas = {}
+
+        def add_frame(key, prefix, df):
+            frame_arrays, metas[key] = cache.frame_to_arrays(df, prefix)
+            arrays.update(frame_arrays)
+
+        add_frame('xn', 'xn', self.interactions_df)
+        for fgroup, feats in self.feats_by_group.items():
+            for ftype, df in feats.items():
+                add_frame((fgroup, ftype),
+                          f'feats.{fgroup.value}.{ftype.value}', df)
+        for fgroup, df in self.feats_codes_df.items():
+            add_frame(('codes', fgroup), f'codes.{fgroup.value}', df)
+
+        cache.save_cache(self.cache_dir, self.cache_key, arrays, {
+            'metas': metas,
+            'cats_d': self.cats_d,
+            'labelers': self.labelers,
+            'cat_cols': self.cat_cols,
+            'context_cat_cols': self.context_cat_cols,
+            'vocabs': self.vocabs,
+        })
+
+    def restore_encoding(self, arrays: Dict[str, np.array],
+                         objects: Dict[str, Any]):
+        """Restores the encoded data from the cache (see `cache_dir`)"""
+        metas = objects['metas']
+        self.cats_d.update(objects['cats_d'])  # (in-place, as when loading)
+        self.labelers = objects['labelers']
+        self.cat_cols = objects['cat_cols']
+        self.context_cat_cols = objects['context_cat_cols']
+        self.vocabs = objects['vocabs']
+
+        self.interactions_df = cache.frame_from_arrays(
+            arrays, metas['xn'], 'xn')
+        self.feats_by_group = defaultdict(dict)
+        for key, meta in metas.items():
+            if key == 'xn':
+                continue
+            elif key[0] == 'codes':
+                fgroup = key[1]
+                self.feats_codes_df[fgroup] = cache.frame_from_arrays(
+                    arrays, meta, f'codes.{fgroup.value}')
+            else:
+                fgroup, ftype = key
+                self.feats_by_group[fgroup][ftype] = cache.frame_from_arrays(
+                    arrays, meta, f'feats.{fgroup.value}.{ftype.value}')
+        self.feats_by_group = dict(self.feats_by_group)
+        self.process_num()
+
+    def update(self,
+               delta_interactions: InteractionsSource,
+               delta_group_features: Optional[FeatureSourceDictType] = None,
+               ) -> Dict[str, Tuple[int, int]]:
+        """Incrementally appends interactions (and features of their users
+        and items) without re-encoding existing rows
+
+        New categories are appended to `cats_d` (and the categoricals), so
+        existing codes are unchanged. Rows of the delta features replace
+        the rows of existing users/items and are appended for new ones. As
+        when loading, delta interactions whose user or item has no
+        features are dropped. The appended (encoded) interactions are kept
+        in `delta_interactions_df` (see `PairSampler.update_from_data_loader`
+        of :mod:`tophat.sampling.pair_sampler`)
+
+        Loaders with context columns (`context_cols`) can not be updated
+        (their interaction-level codes are not extended), reload instead.
+
+        Args:
+            delta_interactions: new interactions (same columns as the
+                training interactions)
+            delta_group_features: new or updated feature sources keyed by
+                group (user, item)
+
+        Returns:
+            Dictionary of (old, new) number of categories for each column
+            whose categories grew -- the embedding rows to add
+
+        Raises:
+            ValueError: if the loader has context columns
+        """
+        if self.context_cat_cols:
+            raise ValueError(
+                f'Incremental updates are not supported with context '
+                f'columns {self.context_cat_cols}')
+        delta_group_features = delta_group_features or {}
+        old_sizes = {col: len(cats) for col, cats in self.cats_d.items()}
+
+        delta_df = delta_interactions.load().data.rename(columns={
+            delta_interactions.user_col: self.user_col,
+            delta_interactions.item_col: self.item_col,
+        })
+        delta_df = delta_df.dropna(subset=[self.user_col, self.item_col])
+
+        # Delta feature rows, and ids that have features after the update
+        delta_feats_by_group = {}
+        keep = np.ones(len(delta_df), dtype=bool)
+        for fgroup in [FGroup.USER, FGroup.ITEM]:
+            col = self.cols[fgroup]
+            feats = self.feats_by_group[fgroup]
+            src_l = delta_group_features.get(fgroup)
+            delta_feats = load_many_srcs(src_l) if src_l else {}
+            for ftype, df in delta_feats.items():
+                delta_feats[ftype] = df.loc[
+                    ~df.index.duplicated(keep='last')]
+
+            other_cols = [c for c in self.cat_cols[fgroup] if c != col]
+            if other_cols:
+                delta_cat = delta_feats.get(FType.CAT)
+                delta_cat = delta_cat[other_cols].dropna() \
+                    if delta_cat is not None else \
+                    pd.DataFrame(columns=other_cols,
+                                 index=pd.Index([], name=col))
+            else:
+                # Id-only features: any id has features
+                ids = pd.unique(delta_df[col].values)
+                delta_cat = pd.DataFrame(index=pd.Index(
+                    ids[~np.isin(ids, feats[FType.CAT].index)], name=col))
+            delta_feats[FType.CAT] = delta_cat
+
+            known = feats[FType.CAT].index.union(delta_cat.index)
+            if FType.NUM in feats:
+                delta_num = delta_feats.get(FType.NUM)
+                known = known.intersection(
+                    feats[FType.NUM].index.union(delta_num.index)
+                    if delta_num is not None else feats[FType.NUM].index)
+            keep &= delta_df[col].isin(known).values
+            delta_feats_by_group[fgroup] = delta_feats
+        delta_df = delta_df.loc[keep].copy()
+
+        for fgroup in [FGroup.USER, FGroup.ITEM]:
+            col = self.cols[fgroup]
+            feats = self.feats_by_group[fgroup]
+            delta_feats = delta_feats_by_group[fgroup]
+            # As when loading, only keep features of interacted ids
+            ids = pd.Index(pd.unique(delta_df[col].values))
+            for ftype, df in delta_feats.items():
+                delta_feats[ftype] = df.loc[
+                    df.index.isin(feats[FType.CAT].index) |
+                    df.index.isin(ids)].copy()
+
+            if FType.NUM in feats and FType.NUM in delta_feats:
+                delta_num = delta_feats[FType.NUM]
+                feats[FType.NUM] = pd.concat([
+                    feats[FType.NUM].drop(delta_num.index, errors='ignore'),
+                    delta_num[feats[FType.NUM].columns]])
+
+            delta_cat = delta_feats[FType.CAT]
+            if col in self.cat_cols[fgroup]:
+                delta_cat[col] = delta_cat.index
+
+            # Append unseen categories, then encode the delta rows
+            for cat_col in self.cat_cols[fgroup]:
+                cat_s = feats[FType.CAT][cat_col]
+                new_cats = pd.unique(delta_cat[cat_col][
+                    ~delta_cat[cat_col].isin(cat_s.cat.categories)])
+                if len(new_cats):
+                    feats[FType.CAT][cat_col] = cat_s.cat.add_categories(
+                        new_cats)
+                    self.cats_d[cat_col] = as_categories(
+                        self.cats_d[cat_col]).append(pd.Index(new_cats))
+                delta_cat[cat_col] = delta_cat[cat_col].astype(
+                    feats[FType.CAT][cat_col].dtype)
+            delta_cat = delta_cat[feats[FType.CAT].columns]
+
+            feats[FType.CAT] = pd.concat([
+                feats[FType.CAT].drop(delta_cat.index, errors='ignore'),
+                delta_cat])
+            self.feats_codes_df[fgroup] = pd.concat([
+                self.feats_codes_df[fgroup].drop(
+                    delta_cat.index, errors='ignore'),
+                self.encode_cats(delta_cat)])
+
+            if col not in feats[FType.CAT]:
+                # Ids are not a feature: categories of the interactions
+                cats = self.interactions_df[col].cat.categories
+                self.cats_d[col] = cats.append(ids[~ids.isin(cats)])
+
+        for fgroup in [FGroup.USER, FGroup.ITEM]:
+            col = self.cols[fgroup]
+            feats_cat = self.feats_by_group[fgroup][FType.CAT]
+            dtype = feats_cat[col].dtype if col in feats_cat else \
+                CategoricalDtype(self.cats_d[col])
+            self.interactions_df[col] = \
+                self.interactions_df[col].cat.set_categories(
+                    dtype.categories)
+            delta_df[col] = delta_df[col].astype(dtype)
+
+        if pd.api.types.is_integer_dtype(self.interactions_df.index) and \
+                len(self.interactions_df):
+            # Continue the index rather than repeating labels
+            delta_df.index = self.interactions_df.index.max() + 1 + \
+                np.arange(len(delta_df))
+        self.delta_interactions_df = delta_df
+        self.interactions_df = pd.concat(
+            [self.interactions_df, delta_df], axis=0)
+
+        self.process_num()
+        self.set_aliases()
+
+        # (columns with a vocab policy keep their rows)
+        growth = {col: (old_sizes.get(col, 0), len(cats))
+                  for col, cats in self.cats_d.items()
+                  if len(cats) != old_sizes.get(col, 0) and
+                  col not in self.vocabs}
+        logger.info(f'Appended {len(delta_df)} interactions, '
+                    f'categories grew: {growth}')
+        return growth
+
     def export_data_encoding(self):
         return (self.cats_d,
                 self.feats_codes_df[FGroup.USER],
                 self.feats_codes_df[FGroup.ITEM],
                 )
 
+    @property
+    def emb_cats_d(self) -> Dict[str, List[Any]]:
+        """Categories of the embedding rows of each column -- `cats_d`,
+        with the row labels of columns with a vocab policy"""
+        if not self.vocabs:
+            return self.cats_d
+        return {col: self.vocabs[col].labels() if col in self.vocabs
+                else cats for col, cats in self.cats_d.items()}
+
+    def category_counts(self, col: str) -> Tuple[pd.Index, np.array]:
+        """Categories of a categorical column, and the number of training
+        interactions of each (of users/items with the category)"""
+        for fgroup in [FGroup.USER, FGroup.ITEM]:
+            cat_df = self.feats_by_group[fgroup][FType.CAT]
+            if col not in cat_df:
+                continue
+            id_col = self.cols[fgroup]
+            id_cats = pd.Index(self.cats_d[id_col])
+            xn_codes = self.interactions_df[id_col].cat.codes.values
+            xn_counts = np.bincount(xn_codes[xn_codes >= 0],
+                                    minlength=len(id_cats))
+            pos = id_cats.get_indexer(cat_df.index)
+            weights = np.where(pos >= 0, xn_counts[pos], 0)
+            s = cat_df[col]
+            break
+        else:
+            if col not in self.context_cat_cols:
+                raise ValueError(f'No categorical column {col}')
+            s = self.interactions_df[col]
+            weights = np.ones(len(s))
+        codes = s.cat.codes.values
+        valid = codes >= 0
+        return s.cat.categories, np.bincount(
+            codes[valid], weights=weights[valid],
+            minlength=len(s.cat.categories))
+
+    def fit_vocabs(self):
+        """Fits the (unfitted) vocab policies on the training
+        interactions"""
+        for col, policy in self.vocabs.items():
+            if not policy.fitted:
+                policy.fit(*self.category_counts(col))
+            logger.info(f'Vocab of {col}: {policy.n_rows} rows for '
+                        f'{len(self.cats_d[col])} categories')
+
+    def encode_cats(self, cat_df: pd.DataFrame) -> pd.DataFrame:
+        """Codes of categorical columns (embedding rows of columns with a
+        vocab policy)"""
+        codes_df = cat_df.copy()
+        for col in codes_df.columns:
+            if col in self.vocabs:
+                codes_df[col] = self.vocabs[col].encode(codes_df[col])
+            else:
+                codes_df[col] = codes_df[col].cat.codes
+        return codes_df
+
     def make_feat_codes(self):
         # Convert all categorical cols to corresponding codes
         for fgroup in [FGroup.USER, FGroup.ITEM]:
-            self.feats_codes_df[fgroup] = \
-                self.feats_by_group[fgroup][FType.CAT].copy()
-            for col in self.feats_codes_df[fgroup].columns:
-                self.feats_codes_df[fgroup][col] = \
-                    self.feats_codes_df[fgroup][col].cat.codes
+            self.feats_codes_df[fgroup] = self.encode_cats(
+                self.feats_by_group[fgroup][FType.CAT])
 
         if self.context_cat_cols:
-            self.feats_codes_df[FGroup.CONTEXT] = \
-                self.interactions_df[self.context_cat_cols].copy()
-            for col in self.feats_codes_df[FGroup.CONTEXT].columns:
-                self.feats_codes_df[FGroup.CONTEXT][col] = \
-                    self.feats_codes_df[FGroup.CONTEXT][col].cat.codes
+            self.feats_codes_df[FGroup.CONTEXT] = self.encode_cats(
+                self.interactions_df[self.context_cat_cols])
 
     def process_num(self):
         # Process numerical metadata
@@ -382,6 +997,25 @@ class TrainDataLoader(object):
                 self.num_meta[fgroup] = self.num_feats_df[fgroup].shape[1]
 
 
+def as_categories(cats: Iterable[Any], dtype=None) -> pd.Index:
+    """Categories as a `pd.Index` (without copying an existing one)
+
+    Args:
+        cats: Categories (list-like or index)
+        dtype: Optional dtype to cast the categories to
+            (if categorical, the dtype of its categories)
+
+    Returns:
+        Index of categories
+    """
+    cats = cats if isinstance(cats, pd.Index) else pd.Index(cats)
+    if isinstance(dtype, CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if dtype is not None and cats.dtype != dtype:
+        cats = cats.astype(dtype)
+    return cats
+
+
 def cast_cat(feats_d: Dict[FType, pd.DataFrame],
              existing_cats_d: Optional[Dict[str, Iterable]] = None,
              add_new_cats: Optional[bool] = False,
@@ -393,29 +1027,33 @@ def cast_cat(feats_d: Dict[FType, pd.DataFrame],
         feats_d: Dictionary of feature dataframes
         existing_cats_d: Optional dictionary of existing categories.
             Note: these existing categories will be casted to the dtype of
-            the column being casted.
+            the column being casted (and replaced by a `pd.Index`).
         add_new_cats: if `True`, will append newly seen categories to
-            book-keeping dictionary of categories (mutates inplace)
+            book-keeping dictionary of categories (mutates inplace).
+            Existing categories keep their position (and so their codes)
 
     Returns:
         Modified version of `feats_d`
     """
 
     for col in feats_d[FType.CAT].columns:
+        col_s = feats_d[FType.CAT][col]
         if existing_cats_d and col in existing_cats_d:
             # Cast existing category to proper dtype (in-place)
-            col_dtype = feats_d[FType.CAT][col].dtype
-            existing_cats_d.update(
-                {col: list(np.array(existing_cats_d[col]).astype(col_dtype))}
-            )
+            existing_cats = as_categories(existing_cats_d[col], col_s.dtype)
             if add_new_cats:
-                existing_cats_d[col] += list(
-                    set(feats_d[FType.CAT][col].unique()) -
-                    set(existing_cats_d[col]))
-            existing_cats = existing_cats_d[col]
+                uniques = pd.Index(pd.unique(col_s.dropna()))
+                new_cats = uniques[existing_cats.get_indexer(uniques) < 0]
+                if len(new_cats):
+                    existing_cats = existing_cats.append(new_cats)
+            existing_cats_d[col] = existing_cats
+        elif isinstance(col_s.dtype, CategoricalDtype):
+            # Observed categories only (as when casting other dtypes)
+            existing_cats = col_s.cat.remove_unused_categories()\
+                .cat.categories
         else:
             existing_cats = None
-        feats_d[FType.CAT][col] = feats_d[FType.CAT][col].astype(
+        feats_d[FType.CAT][col] = col_s.astype(
             CategoricalDtype(existing_cats))
     return feats_d
 
@@ -426,6 +1064,8 @@ def load_simple(
         specific_feature: Dict[FGroup, bool],
         existing_cats_d: Optional[Dict[str, List[Any]]]=None,
         add_new_cats: Optional[bool] = False,
+        align: str = 'codes',
+        n_load_workers: int = 0,
 ) -> Tuple[pd.DataFrame, Dict[FGroup, Dict[FType, pd.DataFrame]]]:
     """Stand-in loader mostly for local testing
 
@@ -437,6 +1077,15 @@ def load_simple(
         specific_feature: If `True`, includes a primary id as a feature for
             that group (user, item)
         existing_cats_d: Optional dictionary of existing categories
+        align: How to align interactions and features. One of
+            {'codes', 'isin'}
+
+            - codes: factorize ids once and align with integer array ops
+              (see `align_via_codes`)
+            - isin: `simplifying_assumption` (falls back to this if a
+              feature index has duplicates)
+        n_load_workers: number of feature sources to load concurrently
+            (see `load_many_srcs`)
 
     Returns:
         Tuple of preprocessed interactions, user features, and item_features
@@ -456,7 +1105,7 @@ def load_simple(
         feats = {}
 
         if src_l:
-            feats.update(load_many_srcs(src_l))
+            feats.update(load_many_srcs(src_l, n_workers=n_load_workers))
         if not src_l or not any([src.feature_type == FType.CAT
                                  for src in src_l]):
             feats[FType.CAT] = pd.DataFrame(
@@ -469,18 +1118,26 @@ def load_simple(
 
         feats_by_group[fgroup] = feats
 
+    align_codes = align == 'codes' and all(
+        df.index.is_unique
+        for feats in feats_by_group.values() for df in feats.values())
     # TODO: Another simplifying assumption:
-    interactions_df, user_feats_d, item_feats_d, = simplifying_assumption(
-        interactions_df,
-        feats_by_group[FGroup.USER], feats_by_group[FGroup.ITEM],
-        cols[FGroup.USER], cols[FGroup.ITEM],
-    )
+    if align_codes:
+        interactions_df, xn_codes = align_via_codes(
+            interactions_df, feats_by_group, cols)
+    else:
+        interactions_df, user_feats_d, item_feats_d, = \
+            simplifying_assumption(
+                interactions_df,
+                feats_by_group[FGroup.USER], feats_by_group[FGroup.ITEM],
+                cols[FGroup.USER], cols[FGroup.ITEM],
+            )
 
     for fgroup in [FGroup.USER, FGroup.ITEM]:
         feats = feats_by_group[fgroup]
         col = cols[fgroup]
         # index alignment for numerical features
-        if FType.NUM in feats:
+        if FType.NUM in feats and not align_codes:
             feats[FType.NUM] = feats[FType.NUM] \
                 .loc[interactions_df[col].unique()]
 
@@ -494,8 +1151,20 @@ def load_simple(
 
         existing_fgroup_cats = feats[FType.CAT][col].cat.categories \
             if col in feats[FType.CAT] else None
-        interactions_df[col] = interactions_df[col].astype(
-            CategoricalDtype(existing_fgroup_cats))
+        if align_codes and existing_fgroup_cats is not None:
+            # Map the (few) unique ids rather than every row
+            row_codes, uniques = xn_codes[fgroup]
+            interactions_df[col] = pd.Categorical.from_codes(
+                existing_fgroup_cats.get_indexer(uniques)[row_codes],
+                dtype=CategoricalDtype(existing_fgroup_cats))
+        else:
+            col_s = interactions_df[col]
+            if existing_fgroup_cats is None and \
+                    isinstance(col_s.dtype, CategoricalDtype):
+                # (filtered out ids may remain as categories)
+                col_s = col_s.cat.remove_unused_categories()
+            interactions_df[col] = col_s.astype(
+                CategoricalDtype(existing_fgroup_cats))
 
         feats_by_group[fgroup] = feats
 
@@ -542,6 +1211,60 @@ def simplifying_assumption(interactions_df,
     return interactions_df, user_feats_d, item_feats_d,
 
 
+def align_via_codes(
+        interactions_df: pd.DataFrame,
+        feats_by_group: Dict[FGroup, Dict[FType, pd.DataFrame]],
+        cols: Dict[FGroup, str],
+) -> Tuple[pd.DataFrame, Dict[FGroup, Tuple[np.array, np.array]]]:
+    """Same filtering and alignment as `simplifying_assumption`
+    (plus aligning numerical features), but the ids of each group are
+    factorized once and the rest is integer array ops over code space:
+    membership is a boolean mask over unique ids, and feature tables are
+    aligned with `take` instead of `loc`.
+
+    Feature frames are replaced in `feats_by_group` (their indices must be
+    unique).
+
+    Args:
+        interactions_df: Interactions
+        feats_by_group: Feature frames by type, keyed by group
+        cols: Id column, keyed by group
+
+    Returns:
+        Tuple of filtered interactions and, for each group, the codes of
+        each remaining interaction into the (ordered) unique ids
+    """
+    factorized = {}
+    keep = np.ones(len(interactions_df), dtype=bool)
+    for fgroup in [FGroup.USER, FGroup.ITEM]:
+        codes, uniques = pd.factorize(interactions_df[cols[fgroup]])
+        uniques = np.asarray(uniques)
+        # Position of each unique id in each feature frame (-1 if missing)
+        positions = {ftype: df.index.get_indexer(uniques)
+                     for ftype, df in feats_by_group[fgroup].items()}
+        known = np.ones(len(uniques), dtype=bool)
+        for pos in positions.values():
+            known &= pos >= 0
+        keep &= (codes >= 0) & known[np.maximum(codes, 0)]
+        factorized[fgroup] = codes, uniques, positions
+
+    interactions_df = interactions_df.loc[keep].copy()
+
+    xn_codes = {}
+    for fgroup, (codes, uniques, positions) in factorized.items():
+        codes = codes[keep]
+        # Order of first appearance (as `.unique()`) of the remaining ids
+        order = pd.unique(codes)
+        rank = np.empty(len(uniques), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        xn_codes[fgroup] = rank[codes], uniques[order]
+        for ftype, pos in positions.items():
+            feats_by_group[fgroup][ftype] = \
+                feats_by_group[fgroup][ftype].take(pos[order])
+
+    return interactions_df, xn_codes
+
+
 def load_simple_warm_cats(
         interactions_src: InteractionsSource,
         users_filt: Optional[Iterable]=None,
@@ -585,21 +1308,75 @@ def load_simple_warm_cats(
     return interactions_df
 
 
-def load_many_srcs(features_srcs: Iterable[FeatureSource]):
+def _load_src(feat_src: FeatureSource):
+    feat_src.load()
+    return feat_src.data, feat_src.load_secs, feat_src.labelers
+
+
+def load_many_srcs(features_srcs: Iterable[FeatureSource],
+                   n_workers: int = 0,
+                   executor: str = 'thread',
+                   ):
     """Load and concatenate many feature sources
     
     Args:
         features_srcs: Feature sources
+        n_workers: number of sources to load concurrently
+            (0 to load one after another)
+        executor: One of {'thread', 'process'}
+
+            - thread: load in a thread pool (I/O and most of parsing
+              release the GIL)
+            - process: load in a process pool (sources must be picklable,
+              ex. no lambda `load_fn`)
 
     Returns:
+        Dictionary of concatenated feature dataframes keyed by feature type
 
     """
+    features_srcs = list(features_srcs)
+    tic = time.perf_counter()
+    to_load = [src for src in features_srcs if src.data is None]
+    if n_workers and len(to_load) > 1:
+        pool_cls = {'thread': ThreadPoolExecutor,
+                    'process': ProcessPoolExecutor}[executor]
+        with pool_cls(max_workers=n_workers) as pool:
+            # (results are assigned back for process pools)
+            for feat_src, (data, secs, labelers) in zip(
+                    to_load, pool.map(_load_src, to_load)):
+                feat_src.data, feat_src.load_secs = data, secs
+                feat_src.labelers.update(labelers)
+    else:
+        for feat_src in to_load:
+            feat_src.load()
+    if to_load:
+        log_load_times(to_load, time.perf_counter() - tic)
+
     src_d = defaultdict(list)
     for feat_src in features_srcs:
-        src_d[feat_src.feature_type].append(feat_src.load().data)
+        src_d[feat_src.feature_type].append(feat_src.data)
 
     # Upfront join
     # TODO: may consider NOT joining multiple numerical frames upfront
     for feature_type, df_l in src_d.items():
         src_d[feature_type] = pd.concat(df_l, axis=1)
     return src_d
+
+
+def log_load_times(features_srcs: Sequence[FeatureSource],
+                   total_secs: Optional[float] = None):
+    """Logs the load time of each source, slowest first
+
+    Args:
+        features_srcs: Loaded feature sources
+        total_secs: Optional wall time of loading all of them
+    """
+    lines = [f'{"source":<40}{"rows":>12}{"cols":>6}{"secs":>10}']
+    for feat_src in sorted(features_srcs,
+                           key=lambda src: -(src.load_secs or 0.)):
+        n_rows, n_cols = feat_src.data.shape
+        lines.append(f'{str(feat_src):<40}{n_rows:>12}{n_cols:>6}'
+                     f'{feat_src.load_secs or 0.:>10.2f}')
+    if total_secs is not None:
+        lines.append(f'{"(wall time)":<58}{total_secs:>10.2f}')
+    logger.info('Feature source load times:\n' + '\n'.join(lines))
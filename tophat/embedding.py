@@ -5,6 +5,7 @@ import numpy as np
 import pandas as pd
 import tensorflow as tf
 from tensorflow.contrib.framework import load_embedding_initializer
+from tensorflow.python.ops.variables import PartitionedVariable
 from collections import defaultdict
 from tensorflow.contrib.tensorboard.plugins import projector
 from typing import Iterable, Dict, Tuple, Optional, List, Any, Union, Callable
@@ -13,6 +14,8 @@ from tempfile import TemporaryDirectory
 from tophat.constants import FGroup
 from tophat.utils.metadata_proc import write_metadata_emb
 from tophat.utils.io import write_vocab
+from tophat.utils.quantization import QuantizedTable, INT8_MAX, \
+    check_storage, to_storage, write_tables
 
 
 class EmbeddingMap(object):
@@ -30,6 +33,12 @@ class EmbeddingMap(object):
                  init_emb_d: Optional[Dict[str, tf.Tensor]] = None,
                  init_emb_via_vocab: Optional[Dict[str, str]] = None,
                  path_checkpoint: Optional[str] = None,
+                 labelers: Optional[Dict[str, Any]] = None,
+                 fused: bool = False,
+                 storage: str = 'float32',
+                 master_weights: bool = True,
+                 n_shards: Optional[int] = None,
+                 max_shard_bytes: Optional[int] = None,
                  ):
         """Convenience container for embedding layers
         
@@ -77,11 +86,50 @@ class EmbeddingMap(object):
                 when serialized as str type.
             path_checkpoint: path of checkpoint (V2) to load from
                 (use in conjunction with `init_emb_via_vocab`)
+            labelers: Optional labelers of combined feature columns
+                (see `tophat.data.combine_cols`) used when writing vocab
+                files and metadata
+            fused: If `True`, all feature tables are stored in a single
+                variable (biases as an extra column) so that `look_up` does
+                a single gather per feature group. `embeddings_d` and
+                `biases_d` then hold slices of it. Initializing embeddings
+                (`init_emb_d`, `init_emb_via_vocab`) and projecting them
+                (`EmbeddingProjector`) are not supported
+            storage: Precision of the embedding tables, one of
+                {'float32', 'float16', 'int8'}
+
+                - float32: full precision
+                - float16: half precision
+                - int8: int8 codes with a float32 scale per row
+                  (dequantized on gather)
+
+                Biases are always float32. float16 and int8 are
+                experimental: their accuracy and memory have not been
+                benchmarked yet (see
+                `examples/benchmarks/bench_quantization.py`)
+            master_weights: If `True`, tables are trained as float32
+                variables, and the looked up rows are rounded to `storage`
+                (gradients pass straight through) -- use `export_tables` to
+                write the tables in `storage`. Else, tables are held in
+                `storage`: float16 tables are trained directly, and int8
+                tables are not trainable (for serving, ex. initialized with
+                the output of `tophat.utils.quantization.read_tables` via
+                `init_emb_d`)
+            n_shards: If provided, embedding and bias tables are partitioned
+                variables of this many shards (of contiguous rows, looked up
+                with the `div` partition strategy). Shards are separate
+                variables, so they are saved and restored as separate slices
+                of the checkpoint (and can be placed on different devices)
+            max_shard_bytes: If provided (instead of `n_shards`), tables are
+                partitioned into shards of at most this many bytes
+                (`zero_init_rows`, `fused`, and `EmbeddingProjector` are not
+                supported with partitioned tables)
                 
         """
 
         self.seed = seed
         self.cats_d = cats_d
+        self.labelers = labelers or {}
 
         # Regularization
         self.l1_bias = l1_bias
@@ -107,6 +155,68 @@ class EmbeddingMap(object):
 
         self.tmp_dir = TemporaryDirectory()
 
+        check_storage(storage)
+        self.storage = storage
+        self.master_weights = master_weights
+        # Precision of the variables
+        self.table_storage = 'float32' if master_weights else storage
+
+        if n_shards is not None and max_shard_bytes is not None:
+            raise ValueError(
+                'Only one of `n_shards` and `max_shard_bytes` can be given')
+        elif n_shards is not None:
+            self.partitioner = tf.fixed_size_partitioner(n_shards)
+        elif max_shard_bytes is not None:
+            self.partitioner = tf.variable_axis_size_partitioner(
+                max_shard_bytes)
+        else:
+            self.partitioner = None
+        if self.partitioner is not None and \
+                (fused or zero_init_rows is not None):
+            raise ValueError('`fused` and `zero_init_rows` are not '
+                             'supported with partitioned tables')
+
+        self.fused = fused
+        # Fused layout: the table, and the first row of each feature in it
+        self.fused_var = None
+        self.fused_table = None
+        self.offsets = {}
+        if self.fused:
+            if init_emb_d is not None or init_emb_via_vocab is not None:
+                raise ValueError(
+                    'Initializing embeddings is not supported when `fused`')
+            if storage != 'float32':
+                raise ValueError(
+                    'Reduced precision `storage` is not supported when '
+                    '`fused`')
+            self.make_fused_tables(zero_init_rows)
+        else:
+            self.make_tables(init_emb_d, init_emb_via_vocab, path_checkpoint,
+                             zero_init_rows)
+
+        # TODO: numerical specific factors for user (theta_u)
+        self.vis_emb_user_col = vis_emb_user_col
+        if self.vis_emb_user_col:
+            K2 = self.embedding_dim
+            with tf.variable_scope('visual'):
+                self.user_vis = tf.get_variable(  # vbpr: theta_u
+                    name='user_vis',
+                    # have K' = K (n_visual_factors = n_factors)
+                    shape=[len(self.cats_d[self.vis_emb_user_col]), K2],
+                    initializer=tf.random_normal_initializer(
+                        mean=0., stddev=1. / K2, seed=self.seed),
+                    regularizer=self.reg_emb,
+                )
+
+    def make_tables(self,
+                    init_emb_d: Optional[Dict[str, tf.Tensor]] = None,
+                    init_emb_via_vocab: Optional[Dict[str, str]] = None,
+                    path_checkpoint: Optional[str] = None,
+                    zero_init_rows: Optional[Dict[str, Iterable[int]]] = None,
+                    ):
+        """An embedding and a bias variable per feature"""
+        embedding_dim = self.embedding_dim
+
         # TODO: lots of repeated code coming up
         with tf.variable_scope('embeddings'):
             self.embeddings_d = {}
@@ -116,14 +226,18 @@ class EmbeddingMap(object):
                 if init_emb_d is not None and feat_name in init_emb_d:
                     # Initialize from passed-in weights
                     emb_init = init_emb_d[feat_name]
-                    assert emb_init.shape == [len(cats), embedding_dim]
+                    init_shape = emb_init.codes.shape \
+                        if isinstance(emb_init, QuantizedTable) \
+                        else emb_init.shape
+                    assert list(init_shape) == [len(cats), embedding_dim]
                     shape = None
                 elif init_emb_via_vocab is not None and \
                         tensor_name in init_emb_via_vocab:
                     # Initialize from vocab file
                     path_vocab = init_emb_via_vocab[tensor_name]
                     write_vocab(self.tmp_dir.name,
-                                {feat_name: self.cats_d[feat_name]})
+                                {feat_name: self.cats_d[feat_name]},
+                                self.labelers)
 
                     emb_init = load_embedding_initializer(
                         path_checkpoint,
@@ -144,19 +258,23 @@ class EmbeddingMap(object):
                         mean=0., stddev=1. / self.embedding_dim,
                         seed=self.seed)
                     shape = [len(cats), embedding_dim]
-                self.embeddings_d[feat_name] = tf.get_variable(
-                    name=feat_name,
-                    shape=shape,
-                    initializer=emb_init,
-                    regularizer=self.reg_emb
-                )
+                self.embeddings_d[feat_name] = self.make_table(
+                    feat_name, emb_init, shape)
 
         if zero_init_rows is not None:
             for k, v in zero_init_rows.items():
-                z = np.ones([len(self.cats_d[k]), embedding_dim],
-                            dtype=np.float32)
-                z[v] = False
-                self.embeddings_d[k] *= tf.constant(z)
+                table = self.embeddings_d[k]
+                if isinstance(table, QuantizedTable):
+                    # Zero scales zero the rows
+                    z = np.ones([len(self.cats_d[k]), 1], dtype=np.float32)
+                    z[v] = False
+                    self.embeddings_d[k] = QuantizedTable(
+                        table.codes, table.scales * tf.constant(z))
+                else:
+                    z = np.ones([len(self.cats_d[k]), embedding_dim],
+                                dtype=self.table_storage)
+                    z[v] = False
+                    self.embeddings_d[k] *= tf.constant(z)
 
         with tf.variable_scope('biases'):
             self.biases_d = {}
@@ -186,26 +304,127 @@ class EmbeddingMap(object):
                 else:
                     b_init = tf.zeros_initializer()
 
-                self.biases_d[feat_name] = tf.get_variable(
+                self.biases_d[feat_name] = self.get_variable(
                         name=feat_name,
                         shape=[len(cats), 1],
                         initializer=b_init,
                         regularizer=self.reg_bias
                     )
 
-        # TODO: numerical specific factors for user (theta_u)
-        self.vis_emb_user_col = vis_emb_user_col
-        if self.vis_emb_user_col:
-            K2 = self.embedding_dim
-            with tf.variable_scope('visual'):
-                self.user_vis = tf.get_variable(  # vbpr: theta_u
-                    name='user_vis',
-                    # have K' = K (n_visual_factors = n_factors)
-                    shape=[len(self.cats_d[self.vis_emb_user_col]), K2],
-                    initializer=tf.random_normal_initializer(
-                        mean=0., stddev=1. / K2, seed=self.seed),
-                    regularizer=self.reg_emb,
-                )
+    def get_variable(self, name: str, initializer: Any,
+                     shape: Optional[List[int]] = None,
+                     **kwargs) -> Union[tf.Variable, PartitionedVariable]:
+        """`tf.get_variable` partitioned by `self.partitioner` (initial
+        values are sliced by shard)"""
+        if self.partitioner is not None and not callable(initializer):
+            initializer = tf.convert_to_tensor(initializer)
+            shape = initializer.get_shape().as_list()
+            kwargs.setdefault('dtype', initializer.dtype.base_dtype)
+            initializer = values_initializer(initializer)
+        return tf.get_variable(name=name, shape=shape,
+                               initializer=initializer,
+                               partitioner=self.partitioner, **kwargs)
+
+    def make_table(self, feat_name: str, emb_init: Any,
+                   shape: Optional[List[int]] = None,
+                   ) -> Union[tf.Variable, QuantizedTable]:
+        """Embedding table of a feature in `self.table_storage`
+
+        Args:
+            feat_name: Name of the feature
+            emb_init: Initializer, or initial values (possibly quantized)
+            shape: Shape of the table (`None` if `emb_init` are values)
+
+        Returns:
+            Variable, or quantized table of (non-trainable) variables
+        """
+        if isinstance(emb_init, QuantizedTable) and \
+                self.table_storage != 'int8':
+            emb_init = tf.cast(emb_init.codes, tf.float32) * emb_init.scales
+
+        if self.table_storage == 'int8':
+            if not isinstance(emb_init, QuantizedTable):
+                values = emb_init(shape, dtype=tf.float32) \
+                    if callable(emb_init) else tf.cast(emb_init, tf.float32)
+                emb_init = quantize_rows(values)
+            return QuantizedTable(
+                self.get_variable(
+                    name=feat_name,
+                    initializer=tf.cast(emb_init.codes, tf.int8),
+                    trainable=False),
+                self.get_variable(
+                    name=f'{feat_name}_scales',
+                    initializer=tf.cast(emb_init.scales, tf.float32),
+                    trainable=False),
+            )
+
+        dtype = tf.as_dtype(self.table_storage)
+        def reg_float32(w):
+            # Regularization losses stay float32
+            return self.reg_emb(tf.cast(w, tf.float32))
+
+        reg = self.reg_emb if dtype == tf.float32 else reg_float32
+        if callable(emb_init) and dtype != tf.float32:
+            init_fn = emb_init
+
+            def emb_init(shape, dtype=dtype, partition_info=None):
+                return tf.cast(init_fn(shape, dtype=tf.float32,
+                                       partition_info=partition_info), dtype)
+        elif not callable(emb_init):
+            emb_init = tf.cast(emb_init, dtype)
+        return self.get_variable(
+            name=feat_name,
+            shape=shape,
+            dtype=dtype,
+            initializer=emb_init,
+            regularizer=reg,
+        )
+
+    def make_fused_tables(self,
+                          zero_init_rows: Optional[
+                              Dict[str, Iterable[int]]] = None,
+                          ):
+        """A single variable of all embeddings, with the biases as an extra
+        (last) column. The rows of each feature start at `self.offsets`"""
+        dim = self.embedding_dim
+        sizes = [len(cats) for cats in self.cats_d.values()]
+        self.offsets = dict(zip(self.cats_d.keys(),
+                                np.cumsum([0] + sizes[:-1]).tolist()))
+        n_rows = int(sum(sizes))
+
+        def fused_init(shape, dtype=tf.float32, partition_info=None):
+            return tf.concat([
+                tf.truncated_normal([shape[0], dim], mean=0., stddev=1. / dim,
+                                    dtype=dtype, seed=self.seed),
+                tf.zeros([shape[0], 1], dtype=dtype),
+            ], axis=1)
+
+        with tf.variable_scope('embeddings'):
+            self.fused_var = tf.get_variable(
+                name='fused',
+                shape=[n_rows, dim + 1],
+                initializer=fused_init,
+            )
+        # Same regularization as separate tables
+        for reg, part in [(self.reg_emb, self.fused_var[:, :dim]),
+                          (self.reg_bias, self.fused_var[:, dim:])]:
+            loss = reg(part)
+            if loss is not None:
+                tf.add_to_collection(tf.GraphKeys.REGULARIZATION_LOSSES, loss)
+
+        self.fused_table = self.fused_var
+        if zero_init_rows is not None:
+            z = np.ones([n_rows, dim + 1], dtype=np.float32)
+            for k, v in zero_init_rows.items():
+                z[self.offsets[k] + np.asarray(list(v), dtype=np.int64),
+                  :dim] = 0.
+            self.fused_table = self.fused_var * tf.constant(z)
+
+        for feat_name, cats in self.cats_d.items():
+            rows = slice(self.offsets[feat_name],
+                         self.offsets[feat_name] + len(cats))
+            self.embeddings_d[feat_name] = self.fused_table[rows, :dim]
+            self.biases_d[feat_name] = self.fused_table[rows, dim:]
 
     def look_up(self, input_xn_d, cat_cols: Dict[FGroup, List[str]],
                 ) -> Tuple[Dict[FGroup, Dict[str, tf.Tensor]],  # embs
@@ -222,6 +441,8 @@ class EmbeddingMap(object):
         Returns:
             Tuple of embeddings and biases
         """
+        if self.fused:
+            return self.look_up_fused(input_xn_d, cat_cols)
 
         emb_lookup_d = {}
 
@@ -230,6 +451,7 @@ class EmbeddingMap(object):
                 self.embeddings_d, input_xn_d, cols,
                 f'{fg.value}_lookup', name_tmp='{}_emb',
                 feature_weights_d=self.feature_weights_d,
+                storage=self.storage if self.master_weights else None,
             )
 
         # Pre-squeeze biases from shape `[len(cats), 1]` to `[len(cats)]`
@@ -241,6 +463,146 @@ class EmbeddingMap(object):
 
         return emb_lookup_d, biases
 
+    def look_up_fused(self, input_xn_d, cat_cols: Dict[FGroup, List[str]],
+                      ) -> Tuple[Dict[FGroup, Dict[str, tf.Tensor]],
+                                 Dict[str, tf.Tensor],
+                                 ]:
+        """`look_up` for the fused layout -- per feature group, the codes
+        of all features are shifted by their offsets and gathered at once
+        (embeddings with their biases), then weighted by a single multiply
+
+        Args:
+            input_xn_d: Dictionary of feature names to category codes
+                for a single interaction
+            cat_cols: categorical feature columns keyed by feature group
+
+        Returns:
+            Tuple of embeddings and biases
+        """
+        dim = self.embedding_dim
+        emb_lookup_d = {}
+        biases = {}
+        for fg, cols in cat_cols.items():
+            cols = list(cols)
+            emb_lookup_d[fg] = {}
+            if not cols:
+                continue
+            with tf.name_scope(f'{fg.value}_lookup'):
+                codes = tf.stack([
+                    input_xn_d[col] if input_xn_d[col].dtype == tf.int32
+                    else tf.cast(input_xn_d[col], tf.int32)
+                    for col in cols], axis=-1)
+                codes += tf.constant([self.offsets[col] for col in cols],
+                                     dtype=tf.int32)
+                # [..., n_cols, dim + 1]
+                looked_up = tf.nn.embedding_lookup(
+                    self.fused_table, codes, name='fused_emb')
+
+                weights = [self.feature_weights_d[col]
+                           if col in self.feature_weights_d else 1.
+                           for col in cols]
+                if any(w != 1. for w in weights):
+                    looked_up = tf.multiply(
+                        looked_up,
+                        tf.constant(weights, shape=[len(cols), 1]),
+                        name='fused_emb_weighted')
+
+                # Aggregate if multiple samples per observation
+                if len(looked_up.get_shape()) == 4:
+                    looked_up = tf.reduce_mean(looked_up, axis=0)
+
+                embs = tf.unstack(looked_up[..., :dim], axis=-2)
+                fg_biases = tf.unstack(looked_up[..., dim], axis=-1)
+            emb_lookup_d[fg] = dict(zip(cols, embs))
+            biases.update(zip(cols, fg_biases))
+
+        return emb_lookup_d, biases
+
+    def table(self, feat_name: str) -> tf.Tensor:
+        """Float32 embedding table of a feature, with the values seen by
+        `look_up` (dequantized, or rounded to `storage`)"""
+        table = self.embeddings_d[feat_name]
+        if isinstance(table, QuantizedTable):
+            return tf.cast(table.codes, tf.float32) * table.scales
+        elif table.dtype.base_dtype != tf.float32:
+            return tf.cast(table, tf.float32)
+        # (shards of partitioned tables are concatenated)
+        return fake_quantize(tf.convert_to_tensor(table), self.storage)
+
+    def export_tables(self, sess: tf.Session, export_dir: str,
+                      storage: Optional[str] = None):
+        """Writes the embedding tables and biases for serving
+        (see `tophat.utils.quantization.read_tables`). Vocabs are written
+        separately (`TophatModel.write_vocab`)
+
+        Args:
+            sess: Session holding the current variable values
+            export_dir: Directory to write a `.npz` file per feature to
+            storage: Storage of the written tables
+                (defaults to `self.storage`)
+        """
+        storage = storage or self.storage
+        tables, biases = sess.run((
+            {feat_name: self.table(feat_name) for feat_name in self.cats_d},
+            {feat_name: tf.convert_to_tensor(bias)
+             for feat_name, bias in self.biases_d.items()}))
+        write_tables(export_dir,
+                     {k: to_storage(v, storage) for k, v in tables.items()},
+                     biases)
+
+
+def quantize_rows(table: tf.Tensor) -> QuantizedTable:
+    """Graph version of `tophat.utils.quantization.quantize_rows`
+    (quantizes the last axis)"""
+    scales = tf.reduce_max(tf.abs(table), axis=-1, keepdims=True) / INT8_MAX
+    scales = tf.where(tf.equal(scales, 0.), tf.ones_like(scales), scales)
+    codes = tf.clip_by_value(tf.round(table / scales), -INT8_MAX, INT8_MAX)
+    return QuantizedTable(tf.cast(codes, tf.int8), scales)
+
+
+def values_initializer(values: tf.Tensor) -> Callable:
+    """Initializer of a variable (or of a shard of a partitioned variable)
+    from the values of the whole variable"""
+    def init(shape, dtype=None, partition_info=None):
+        if partition_info is not None:
+            offset = partition_info.single_offset(shape)
+            values_shard = values[offset:offset + shape[0]]
+        else:
+            values_shard = values
+        return values_shard if dtype is None else tf.cast(values_shard, dtype)
+    return init
+
+
+def fake_quantize(x: tf.Tensor, storage: str) -> tf.Tensor:
+    """Rounds float32 values to the precision of `storage`, with gradients
+    passing straight through"""
+    if storage == 'float16':
+        rounded = tf.cast(tf.cast(x, tf.float16), tf.float32)
+    elif storage == 'int8':
+        quantized = quantize_rows(x)
+        rounded = tf.cast(quantized.codes, tf.float32) * quantized.scales
+    else:
+        return x
+    return x + tf.stop_gradient(rounded - x)
+
+
+def gather(table: Union[tf.Tensor, QuantizedTable], ids: tf.Tensor,
+           name: Optional[str] = None) -> tf.Tensor:
+    """Float32 rows of a table in any storage -- rows of reduced
+    precision tables are dequantized after the gather. Shards of
+    partitioned tables hold contiguous rows (the `div` strategy)"""
+    if isinstance(table, QuantizedTable):
+        return tf.multiply(
+            tf.cast(tf.nn.embedding_lookup(
+                table.codes, ids, partition_strategy='div'), tf.float32),
+            tf.nn.embedding_lookup(
+                table.scales, ids, partition_strategy='div'), name=name)
+    looked_up = tf.nn.embedding_lookup(table, ids, partition_strategy='div',
+                                       name=name)
+    if looked_up.dtype != tf.float32:
+        looked_up = tf.cast(looked_up, tf.float32)
+    return looked_up
+
 
 def lookup_wrapper(emb_d: Dict[str, tf.Tensor],
                    input_xn_d: Dict[str, tf.Tensor],
@@ -248,19 +610,27 @@ def lookup_wrapper(emb_d: Dict[str, tf.Tensor],
                    scope: str, name_tmp: str = '{}',
                    feature_weights_d: Dict[str, float] = None,
                    agg_fn: Callable = tf.reduce_mean,
+                   storage: Optional[str] = None,
                    ) -> Dict[str, tf.Tensor]:
     """Embedding lookup for each categorical feature
     Can be stacked downstream to yield a tensor
     ie) `tf.stack(list(looked_up.values()), axis=-1)`
+
+    Tables can be float16, or quantized (see `gather`). If `storage` is
+    given, the looked up rows are rounded to it (see `fake_quantize`)
     """
     if not cols:
         return {}
     with tf.name_scope(scope):
-        looked_up = {feat_name: tf.nn.embedding_lookup(
+        looked_up = {feat_name: gather(
             emb_d[feat_name], input_xn_d[feat_name],
             name=name_tmp.format(feat_name))
             for feat_name in cols}
 
+        if storage is not None:
+            for feat_name, tensor in looked_up.items():
+                looked_up[feat_name] = fake_quantize(tensor, storage)
+
         if feature_weights_d is not None:
             for feat_name, tensor in looked_up.items():
                 if feat_name in feature_weights_d:
@@ -332,11 +702,19 @@ class EmbeddingProjector(object):
                      Dict[str, Union[str, pd.DataFrame]]] = None,
                  ):
 
+        if embedding_map.fused:
+            raise ValueError('Projecting `fused` embeddings is not supported')
+        if embedding_map.table_storage == 'int8':
+            raise ValueError('Projecting int8 embeddings is not supported')
+        if embedding_map.partitioner is not None:
+            raise ValueError(
+                'Projecting partitioned embeddings is not supported')
         self.summary_writer = summary_writer
         feat_to_metapath = write_metadata_emb(
             embedding_map.cats_d,
             log_dir,
             names_d,
+            labelers=embedding_map.labelers,
         )
 
         self.projection_config = projector.ProjectorConfig()
@@ -170,9 +170,7 @@ class Validator(object):
         for fgroup, feats_d in feats_by_group.items():
 
             # Prep cat codes
-            cat_code_df = feats_d[FType.CAT].copy()
-            for col in cat_code_df.columns:
-                cat_code_df[col] = cat_code_df[col].cat.codes
+            cat_code_df = train_data_loader.encode_cats(feats_d[FType.CAT])
 
             # Prep num feats
             # TODO: assuming numerical features aggregated into 1 table for now
@@ -207,21 +205,18 @@ class Validator(object):
 
         # Special processing for context
         if train_data_loader.context_cat_cols:
-            self.cat_codes_dfs[FGroup.CONTEXT] = self.interactions_df[
-                train_data_loader.context_cat_cols].copy()
-            for col in self.cat_codes_dfs[FGroup.CONTEXT].columns:
-                self.cat_codes_dfs[FGroup.CONTEXT][col] = self.cat_codes_dfs\
-                    [FGroup.CONTEXT][col].cat.codes
+            self.cat_codes_dfs[FGroup.CONTEXT] = train_data_loader.encode_cats(
+                self.interactions_df[train_data_loader.context_cat_cols])
 
         # Get the cold users/items that we need to zero enforce
+        # (columns with a vocab policy have no new rows)
         self.zero_init_rows = {}
         for col in self.cats_d.keys():
-            new_ids = set(self.cats_d[col]) - set(self.cats_d_orig[col])
-            id_to_ind_d = dict(
-                zip(self.cats_d[col], range(len(self.cats_d[col]))))
-            new_inds = [id_to_ind_d[i] for i in
-                        new_ids]  # TODO: I think this is not optimal
-            self.zero_init_rows[col] = new_inds
+            if col in train_data_loader.vocabs:
+                continue
+            cats = pd.Index(self.cats_d[col])
+            new_inds = np.flatnonzero(~cats.isin(self.cats_d_orig[col]))
+            self.zero_init_rows[col] = new_inds.tolist()
 
     def make_ops(self):
         # Eval ops
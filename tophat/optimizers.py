@@ -0,0 +1,139 @@
+"""
+Optimizers that only update the rows of embedding tables touched by a batch
+
+Gradients of `tf.nn.embedding_lookup` are sparse (`tf.IndexedSlices`), but
+`tf.train.AdamOptimizer` decays its moments over every row of every table
+each step. The optimizers here apply sparse gradients to the looked up rows
+only (and their slots).
+
+Note: Anything that makes the gradient of a table dense also makes its
+update dense, ex. l1/l2 regularization of whole tables (`l1_emb`, `l2_emb`
+of `EmbeddingMap`) or `zero_init_rows` masks
+"""
+import tensorflow as tf
+from tensorflow.python.ops import resource_variable_ops
+from typing import Union
+
+
+class RowwiseAdagradOptimizer(tf.train.Optimizer):
+    """Adagrad with a single accumulator per row (of the mean squared
+    gradient of the row) rather than per element, so that its slots are
+    `1 / embedding_dim` of the size of the tables
+
+    Args:
+        learning_rate: Learning rate
+        initial_accumulator_value: Starting value of the accumulators
+            (must be positive)
+        use_locking: If `True`, use locks for update operations
+        name: Name of the operations
+    """
+
+    def __init__(self,
+                 learning_rate: float = 0.01,
+                 initial_accumulator_value: float = 0.1,
+                 use_locking: bool = False,
+                 name: str = 'RowwiseAdagrad',
+                 ):
+        if initial_accumulator_value <= 0.:
+            raise ValueError('`initial_accumulator_value` must be positive')
+        super().__init__(use_locking, name)
+        self._learning_rate = learning_rate
+        self._initial_accumulator_value = initial_accumulator_value
+        self._learning_rate_tensor = None
+
+    def _create_slots(self, var_list):
+        for var in var_list:
+            shape = var.get_shape()[:1]
+            dtype = var.dtype.base_dtype
+            self._get_or_make_slot_with_initializer(
+                var, tf.constant_initializer(
+                    self._initial_accumulator_value, dtype=dtype),
+                shape, dtype, 'accumulator', self._name)
+
+    def _prepare(self):
+        self._learning_rate_tensor = tf.convert_to_tensor(
+            self._learning_rate, name='learning_rate')
+
+    @staticmethod
+    def _row_mean_square(grad: tf.Tensor) -> tf.Tensor:
+        ndims = grad.get_shape().ndims
+        if ndims <= 1:
+            return tf.square(grad)
+        return tf.reduce_mean(tf.square(grad), axis=list(range(1, ndims)))
+
+    def _row_scale(self, acc: tf.Tensor, grad: tf.Tensor) -> tf.Tensor:
+        """Learning rate over the root of the accumulators, shaped to
+        broadcast over the rows of `grad`"""
+        lr = tf.cast(self._learning_rate_tensor, grad.dtype.base_dtype)
+        scale = lr * tf.rsqrt(acc)
+        ndims = grad.get_shape().ndims
+        if ndims <= 1:
+            return scale
+        return tf.reshape(scale, [-1] + [1] * (ndims - 1))
+
+    def _apply_dense(self, grad, var):
+        acc = self.get_slot(var, 'accumulator')
+        acc_t = tf.assign_add(acc, self._row_mean_square(grad),
+                              use_locking=self._use_locking)
+        return tf.assign_sub(var, self._row_scale(acc_t, grad) * grad,
+                             use_locking=self._use_locking)
+
+    def _apply_sparse(self, grad, var):
+        # (duplicate indices are summed beforehand by the base class)
+        acc = self.get_slot(var, 'accumulator')
+        acc_t = tf.scatter_add(acc, grad.indices,
+                               self._row_mean_square(grad.values),
+                               use_locking=self._use_locking)
+        acc_rows = tf.gather(acc_t, grad.indices)
+        return tf.scatter_sub(var, grad.indices,
+                              self._row_scale(acc_rows, grad.values) *
+                              grad.values,
+                              use_locking=self._use_locking)
+
+    def _resource_apply_dense(self, grad, var):
+        # (`tf.assign_add` and `tf.assign_sub` also update resource
+        # variables)
+        return self._apply_dense(grad, var)
+
+    def _resource_apply_sparse(self, grad, var, indices):
+        # (duplicate indices are summed beforehand by the base class)
+        acc = self.get_slot(var, 'accumulator')
+        acc_update = resource_variable_ops.resource_scatter_add(
+            acc.handle, indices, self._row_mean_square(grad))
+        with tf.control_dependencies([acc_update]):
+            acc_rows = acc.sparse_read(indices)
+        return resource_variable_ops.resource_scatter_add(
+            var.handle, indices, -self._row_scale(acc_rows, grad) * grad)
+
+
+NAMED_OPTIMIZERS = {
+    # Dense moments (every row is updated every step)
+    'adam': tf.train.AdamOptimizer,
+    # Moments of the looked up rows only
+    'lazy_adam': tf.contrib.opt.LazyAdamOptimizer,
+    # Accumulators of the looked up rows only
+    'adagrad': tf.train.AdagradOptimizer,
+    'rowwise_adagrad': RowwiseAdagradOptimizer,
+    'sgd': tf.train.GradientDescentOptimizer,
+}
+
+
+def get_optimizer(optimizer: Union[str, tf.train.Optimizer],
+                  learning_rate: float = 0.001,
+                  **kwargs) -> tf.train.Optimizer:
+    """Optimizer by name (see `NAMED_OPTIMIZERS`)
+
+    Args:
+        optimizer: Name of the optimizer, or an optimizer (returned as is)
+        learning_rate: Learning rate of a named optimizer
+        **kwargs: Other kwargs of a named optimizer
+
+    Returns:
+        Optimizer
+    """
+    if isinstance(optimizer, tf.train.Optimizer):
+        return optimizer
+    if optimizer not in NAMED_OPTIMIZERS:
+        raise ValueError(f'Unknown optimizer {optimizer}. '
+                         f'One of {sorted(NAMED_OPTIMIZERS)}')
+    return NAMED_OPTIMIZERS[optimizer](learning_rate=learning_rate, **kwargs)
@@ -1,8 +1,7 @@
 import numpy as np
 import scipy.sparse as sp
-from typing import Sequence, Callable
-from tophat.utils.sparse_utils import get_row_nz_data
-from tophat.sampling.utils import neg_samp_bsearch
+from typing import Sequence, Callable, Optional, Tuple
+from tophat.sampling.utils import neg_samp_bsearch_batch, rows_nz_at_or_above
 
 
 def sample_adaptive(
@@ -14,6 +13,8 @@ def sample_adaptive(
         use_first_violation: bool = False,
         xn_csr: sp.csr_matrix = None,
         return_n_samp: bool = False,
+        progressive: bool = False,
+        rows_nz: Optional[Tuple[np.array, np.array]] = None,
 ):
     """Uses the forward prediction of `self.model` to adaptively sample
     the first, or most violating negative candidate
@@ -35,7 +36,7 @@ def sample_adaptive(
             `use_first_violation` is True)
         use_first_violation: If True, the sampled negative will be the
             first negative candidate to score over 1+score(positive). If
-            there are no such violations, the last candidate is used.
+            there are no such violations, the first candidate is used.
             If False, use the worst offender
             (negative candidate with the highest score)
         xn_csr: sparse matrix of positive interactions
@@ -48,6 +49,12 @@ def sample_adaptive(
                 matrix)
         return_n_samp: If True, also return the number of samples to reach
             the first violation. Requires `use_first_violation` to be True.
+        progressive: If True, search for the first violation in growing
+            chunks of candidates (see `first_violators_progressive`) instead
+            of scoring all `max_sampled` candidates. The result is the same.
+            Only applies if `use_first_violation` is True.
+        rows_nz: Optional output of `get_rows_nz_pos` of `xn_csr` for
+            `user_inds_batch` (if already computed)
 
     Returns:
         Array with shape [batch_size] of random items as negatives
@@ -65,55 +72,100 @@ def sample_adaptive(
         neg_item_inds = np.random.randint(
             n_items, size=[batch_size, max_sampled])
     else:  # Ordinal verification
-        neg_item_inds = np.empty([batch_size, max_sampled], dtype=int)
-        pos_item_vals = xn_csr[user_inds_batch, pos_item_inds_batch]
-
-        for i, (user_ind, cur_pos_item_val) in enumerate(
-                zip(user_inds_batch, pos_item_vals.A1)):
-            # Get all positive interactions for this user
-            user_pos_item_inds, user_pos_item_vals = get_row_nz_data(
-                xn_csr, user_ind)
-
-            # Filter interactions of same or higher tier than current positive
-            user_pos_item_inds = user_pos_item_inds[
-                user_pos_item_vals >= cur_pos_item_val]
-            user_neg_item_inds = neg_samp_bsearch(
-                user_pos_item_inds, n_items, max_sampled)
-
-            neg_item_inds[i, :] = user_neg_item_inds
-
-    # These have shape = (batch_size, max_sampled)
-    neg_cand_scores = score_fn(
-        user_inds=np.tile(user_inds_batch[:, None], max_sampled).flatten(),
-        item_inds=neg_item_inds.flatten(),
-    ).reshape([-1, max_sampled])
+        # Filter interactions of same or higher tier than current positive
+        pos_inds, lens = rows_nz_at_or_above(
+            xn_csr, user_inds_batch, pos_item_inds_batch, rows_nz)
+        neg_item_inds = neg_samp_bsearch_batch(
+            pos_inds, lens, n_items, max_sampled)
 
     if use_first_violation:
         pos_scores = score_fn(
             user_inds=user_inds_batch,
             item_inds=pos_item_inds_batch,
         )
-        pos_scores_tile = np.tile(pos_scores[:, None], max_sampled)
-        violations = (neg_cand_scores > pos_scores_tile - 1)  # hinge
-        # Get index of the first violation
-        first_violator_inds = np.argmax(violations, axis=1)
-
-        # For the users with no sampled violations, set violation index to inf
-        #   this will cause the loss weight to be 0 (no update)
+        if progressive:
+            first_violator_inds = first_violators_progressive(
+                score_fn, user_inds_batch, neg_item_inds, pos_scores)
+        else:
+            # These have shape = (batch_size, max_sampled)
+            neg_cand_scores = score_fn(
+                user_inds=np.repeat(user_inds_batch, max_sampled),
+                item_inds=neg_item_inds.flatten(),
+            ).reshape([-1, max_sampled])
+            violations = (neg_cand_scores > pos_scores[:, None] - 1)  # hinge
+            # Get index of the first violation
+            first_violator_inds = np.argmax(violations, axis=1)
+            first_violator_inds[~violations[
+                range(batch_size), first_violator_inds]] = -1
+
+        # For the users with no sampled violations, use the first candidate
+        no_violation = first_violator_inds < 0
         neg_item_inds_batch = neg_item_inds[
-            range(len(neg_item_inds)), first_violator_inds
+            range(batch_size), np.maximum(first_violator_inds, 0)
         ].reshape(batch_size, 1)
 
-        first_violator_inds[~violations[
-            range(batch_size), first_violator_inds]
-        ] = 2**31 - 1  # (our int32 "infinity")
+        # and set the violation index to inf
+        #   this will cause the loss weight to be 0 (no update)
+        first_violator_inds[no_violation] = 2**31 - 1  # (our int32 "infinity")
 
         if return_n_samp:
             return neg_item_inds_batch, first_violator_inds
     else:
+        # These have shape = (batch_size, max_sampled)
+        neg_cand_scores = score_fn(
+            user_inds=np.repeat(user_inds_batch, max_sampled),
+            item_inds=neg_item_inds.flatten(),
+        ).reshape([-1, max_sampled])
         # Get the worst offender
         neg_item_inds_batch = neg_item_inds[
             range(batch_size), np.argmax(neg_cand_scores, axis=1)
         ].reshape(batch_size, 1)
 
     return neg_item_inds_batch
+
+
+def first_violators_progressive(
+        score_fn: Callable,
+        user_inds_batch: Sequence[int],
+        neg_item_inds: np.array,
+        pos_scores: np.array,
+        first_chunk: int = 4,
+) -> np.array:
+    """Finds the first violating negative candidate of each row by scoring
+    candidates in geometrically growing chunks (ex. 4, 8, 16, ...)
+    Only the rows that have not found a violator yet are scored, and the
+    search stops as soon as every row has one
+
+    Args:
+        score_fn: function that scores user-item pairs
+        user_inds_batch: The users of the batch
+        neg_item_inds: Negative candidates [batch_size, max_sampled]
+        pos_scores: Scores of the positive of each row
+        first_chunk: Number of candidates in the first chunk
+
+    Returns:
+        Array with shape [batch_size] of the index of the first violating
+        candidate (same as a full search) or -1 if there is none
+
+    """
+    user_inds_batch = np.asarray(user_inds_batch)
+    batch_size, max_sampled = neg_item_inds.shape
+    first_violator_inds = np.full(batch_size, -1, dtype=np.int64)
+
+    unresolved = np.arange(batch_size)
+    start, chunk = 0, first_chunk
+    while len(unresolved) and start < max_sampled:
+        stop = min(start + chunk, max_sampled)
+        n_cands = stop - start
+        cand_scores = score_fn(
+            user_inds=np.repeat(user_inds_batch[unresolved], n_cands),
+            item_inds=neg_item_inds[unresolved, start:stop].flatten(),
+        ).reshape([-1, n_cands])
+        violations = cand_scores > pos_scores[unresolved, None] - 1  # hinge
+        found = violations.any(axis=1)
+        first_violator_inds[unresolved[found]] = \
+            start + np.argmax(violations[found], axis=1)
+        unresolved = unresolved[~found]
+        start, chunk = stop, 2 * chunk
+
+    return first_violator_inds
@@ -0,0 +1,255 @@
+"""
+Implements uniform negative sampling as a native `tf.data` pipeline
+(no python generator in the training hot path)
+"""
+import sys
+
+import numpy as np
+import scipy.sparse as sp
+import tensorflow as tf
+from typing import Dict, Sequence, Optional, Tuple
+
+from tophat.constants import *
+from tophat.sampling import schedulers
+from tophat.sampling.pair_sampler import PairSampler
+
+
+class GraphArrays(object):
+    """Placeholders of the arrays a dataset reads, fed once when its
+    iterator is initialized (with `feed_dict`) rather than serialized into
+    the graph as constants (a `GraphDef` is capped at 2GB)"""
+
+    def __init__(self):
+        self.feed_dict: Dict[tf.Tensor, np.array] = {}
+
+    def __call__(self, arr: Optional[np.array], dtype: np.dtype,
+                 name: str) -> Optional[tf.Tensor]:
+        if arr is None:
+            return None
+        arr = np.asarray(arr, dtype=dtype)
+        ph = tf.placeholder(dtype, arr.shape, name=name)
+        self.feed_dict[ph] = arr
+        return ph
+
+
+def gather_feed(tag: str,
+                inds: tf.Tensor,
+                cols: Optional[Sequence[str]],
+                codes: Optional[tf.Tensor],
+                num: Optional[tf.Tensor] = None,
+                num_key: Optional[str] = None,
+                ) -> Dict[str, tf.Tensor]:
+    """Graph version of :func:`tophat.sampling.pair_sampler.feed_via_inds`
+
+    Args:
+        tag: Prefix tag of the feed keys (ex. "user", "neg")
+        inds: Indices to gather (any shape)
+        cols: Names of the categorical columns of `codes`
+        codes: Encoded categorical features
+            [n_total_samples x n_categorical_features]
+        num: Numerical features
+            [n_total_samples x n_numerical_features]
+        num_key: Numerical features key (for book-keeping)
+
+    Returns:
+        Dictionary of gathered tensors keyed like the placeholders
+    """
+    if codes is None:
+        return {}
+    with tf.name_scope(f'{tag}_gather'):
+        gathered = tf.gather(codes, inds)
+        d = {f'{tag}{TAG_DELIM}{col}': gathered[..., i]
+             for i, col in enumerate(cols)}
+        if num is not None and num_key is not None:
+            d[f'{tag}{TAG_DELIM}{num_key}'] = tf.gather(num, inds)
+    return d
+
+
+def verification_arrays(xn_csr: sp.csr_matrix,
+                        ) -> Tuple[np.array, np.array, int]:
+    """Arrays of a CSR matrix read by `verified_negatives`
+
+    Args:
+        xn_csr: sparse matrix of positive interactions
+            (with sorted indices)
+
+    Returns:
+        Tuple of the row pointers, the positives minus the number of
+        positives before them in their row, and the number of bisection
+        steps of the longest row
+    """
+    indptr = xn_csr.indptr.astype(np.int64)
+    lens = np.diff(indptr)
+    # A draw `r` maps to `r + (number of adjusted positives <= r)`
+    pos_adj = (xn_csr.indices.astype(np.int64) -
+               (np.arange(xn_csr.nnz) - np.repeat(indptr[:-1], lens)))
+    n_steps = int(np.ceil(np.log2(lens.max() + 1))) if xn_csr.nnz else 0
+    if not len(pos_adj):
+        pos_adj = np.zeros(1, dtype=np.int64)  # (never read)
+    return indptr, pos_adj, n_steps
+
+
+def verified_negatives(indptr: tf.Tensor,
+                       pos_adj: tf.Tensor,
+                       n_steps: int,
+                       user_inds: tf.Tensor,
+                       n_items: int,
+                       n_neg: int,
+                       seed: Optional[int] = None,
+                       ) -> tf.Tensor:
+    """Graph version of :func:`tophat.sampling.uniform.sample_uniform_verified`
+
+    Like :func:`tophat.sampling.utils.neg_samp_bsearch_batch`, a draw among
+    the `n_items - len(row)` non-positives of a user is shifted past the
+    positives at or below it. The shift is found by a bisection over the
+    CSR arrays, unrolled to the length of the longest row
+
+    Args:
+        indptr: Row pointers of the positives (see `verification_arrays`)
+        pos_adj: Adjusted positives (see `verification_arrays`)
+        n_steps: Number of bisection steps (see `verification_arrays`)
+        user_inds: The users of the batch [batch_size]
+        n_items: number of items in catalog to sample from
+        n_neg: number of negatives to sample per positive
+        seed: Optional op seed
+
+    Returns:
+        Tensor with shape [n_neg, batch_size] of verified negatives
+    """
+    with tf.name_scope('verified_negatives'):
+        user_inds = tf.cast(user_inds, tf.int64)
+        starts = tf.gather(indptr, user_inds)
+        ends = tf.gather(indptr, user_inds + 1)
+        lo = tf.tile(starts[None, :], [n_neg, 1])
+        hi = tf.tile(ends[None, :], [n_neg, 1])
+        n_cands = tf.cast(n_items - (hi - lo), tf.float32)
+        raw = tf.cast(tf.floor(
+            tf.random_uniform(tf.shape(lo), seed=seed) * n_cands), tf.int64)
+
+        last = tf.size(pos_adj, out_type=tf.int64) - 1
+        for _ in range(n_steps):
+            active = lo < hi
+            mid = (lo + hi) // 2
+            # (inactive entries may point past the end)
+            right = tf.gather(pos_adj, tf.minimum(mid, last)) <= raw
+            lo = tf.where(active & right, mid + 1, lo)
+            hi = tf.where(active & ~right, mid, hi)
+        return tf.cast(raw + lo - starts, tf.int32)
+
+
+def uniform_pair_dataset(sampler: PairSampler,
+                         ) -> Tuple[tf.data.Dataset,
+                                    Dict[tf.Tensor, np.array]]:
+    """Builds a dataset equivalent to iterating a `uniform` `PairSampler`
+
+    The positive interactions (and feature codes) are fed to placeholders
+    when the iterator is initialized, and the epoch shuffle, batching,
+    negative draws and feature gathers all happen in `tf.data` / TF ops.
+
+    Args:
+        sampler: sampler to mirror (only its data and settings are used)
+
+    Returns:
+        Tuple of the dataset of feed dictionaries keyed like
+        `sampler.input_pair_d`, and the feed dict to initialize its
+        (initializable) iterator with
+
+    """
+    if sampler.method not in {'uniform', 'uniform_verified'}:
+        raise ValueError(f'Native sampling only supports `uniform` and '
+                         f'`uniform_verified` sampling '
+                         f'(got `{sampler.method}`)')
+    if type(sampler.scheduler) not in {schedulers.InteractionScheduler,
+                                       schedulers.UserScheduler}:
+        raise ValueError(f'Native sampling does not support '
+                         f'`{type(sampler.scheduler).__name__}`')
+
+    batch_size = sampler.batch_size
+    n_neg = sampler.n_neg
+    n_items = sampler.n_items
+    n_epochs = -1 if sampler.n_epochs == sys.maxsize else sampler.n_epochs
+
+    arrays = GraphArrays()
+    with tf.name_scope('native_sampler_arrays'):
+        codes = {fg: arrays(arr, np.int32, f'{fg.value}_codes')
+                 for fg, arr in sampler.feats_codes_arrs.items()}
+        user_num = arrays(sampler.user_num_feats_arr, np.float32,
+                          'user_num')
+        item_num = arrays(sampler.item_num_feats_arr, np.float32,
+                          'item_num')
+        if sampler.uniform_users:
+            indptr = arrays(sampler.pos_xn_csr.indptr, np.int32, 'indptr')
+            indices = arrays(sampler.pos_xn_csr.indices, np.int32,
+                             'indices')
+            # Only users with positives (see `UserScheduler`)
+            users = arrays(sampler.scheduler.users, np.int64, 'users')
+        else:
+            rows = arrays(sampler.pos_xn_coo.row, np.int32, 'rows')
+            cols = arrays(sampler.pos_xn_coo.col, np.int32, 'cols')
+        if sampler.method == 'uniform_verified':
+            verify_indptr, verify_pos_adj, n_steps = verification_arrays(
+                sampler.non_neg_xn_csr)
+            verify_indptr = arrays(verify_indptr, np.int64, 'verify_indptr')
+            verify_pos_adj = arrays(verify_pos_adj, np.int64,
+                                    'verify_pos_adj')
+
+    def feed_via_inds_batch(inds_batch):
+        inds_batch = tf.cast(inds_batch, tf.int32)
+        if sampler.uniform_users:
+            # Select random known pos for user
+            user_inds_batch = inds_batch
+            starts = tf.gather(indptr, user_inds_batch)
+            lens = tf.gather(indptr, user_inds_batch + 1) - starts
+            offsets = tf.cast(tf.floor(
+                tf.random_uniform([batch_size], seed=sampler.seed) *
+                tf.cast(lens, tf.float32)), tf.int32)
+            pos_item_inds_batch = tf.gather(indices, starts + offsets)
+        else:
+            user_inds_batch = tf.gather(rows, inds_batch)
+            pos_item_inds_batch = tf.gather(cols, inds_batch)
+
+        # Same layout as the tiled negative placeholders: [n_neg, batch_size]
+        if sampler.method == 'uniform_verified':
+            neg_item_inds_batch = verified_negatives(
+                verify_indptr, verify_pos_adj, n_steps, user_inds_batch,
+                n_items, n_neg, seed=sampler.seed)
+        else:
+            neg_item_inds_batch = tf.random_uniform(
+                [n_neg, batch_size], maxval=n_items, dtype=tf.int32,
+                seed=sampler.seed)
+
+        feed_d = {
+            **gather_feed(USER_VAR_TAG, user_inds_batch,
+                          sampler.code_df_cols[FGroup.USER],
+                          codes[FGroup.USER], user_num, 'user_num_feats'),
+            **gather_feed(POS_VAR_TAG, pos_item_inds_batch,
+                          sampler.code_df_cols[FGroup.ITEM],
+                          codes[FGroup.ITEM], item_num, 'item_num_feats'),
+            **gather_feed(NEG_VAR_TAG, neg_item_inds_batch,
+                          sampler.code_df_cols[FGroup.ITEM],
+                          codes[FGroup.ITEM], item_num, 'item_num_feats'),
+            **gather_feed(CONTEXT_VAR_TAG, inds_batch,
+                          sampler.code_df_cols.get(FGroup.CONTEXT, None),
+                          codes.get(FGroup.CONTEXT, None)),
+        }
+
+        # Only keep what the task actually consumes (like `from_generator`)
+        missing = set(sampler.input_pair_d) - set(feed_d)
+        if missing:
+            raise KeyError(f'Native sampler can not produce {missing}')
+        return {k: feed_d[k] for k in sampler.input_pair_d}
+
+    epoch_len = sampler.scheduler.epoch_len
+    if sampler.uniform_users:
+        ds = tf.data.Dataset.from_tensor_slices(users)
+    else:
+        ds = tf.data.Dataset.range(epoch_len)
+    if sampler.scheduler.shuffle:
+        ds = ds.shuffle(epoch_len, seed=sampler.seed,
+                        reshuffle_each_iteration=True)
+    # Batch within an epoch (drops the last small batch like `batcher`)
+    ds = ds.apply(tf.contrib.data.batch_and_drop_remainder(batch_size))\
+        .repeat(n_epochs)\
+        .map(feed_via_inds_batch)
+
+    return ds, arrays.feed_dict
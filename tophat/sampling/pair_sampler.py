@@ -8,13 +8,13 @@ import pandas as pd
 from pandas.api.types import CategoricalDtype
 import scipy.sparse as sp
 import tensorflow as tf
-from collections import ChainMap
-from typing import Iterable, Sized, Sequence, Optional
+from typing import Iterable, Sized, Sequence, Optional, Tuple
 
 from tophat.constants import *
 from tophat.data import TrainDataLoader
-from tophat.sampling import uniform, adaptive
-from tophat.utils.sparse_utils import get_row_nz
+from tophat.sampling import uniform, adaptive, parallel, popularity, scoring
+from tophat.sampling import schedulers
+from tophat.utils.sparse_utils import get_rows_nz_pos
 from tophat.utils.pseudo_rating import calc_pseudo_ratings
 
 
@@ -34,34 +34,6 @@ def batcher(seq: Sized, n: int=1):
         yield seq[ii:min(ii + n, l)]
 
 
-def feed_via_pair(
-        user_feed_d: Dict[str, Iterable],
-        pos_item_feed_d: Dict[str, Iterable],
-        neg_item_feed_d: Dict[str, Iterable],
-        context_feed_d: Dict[str, Iterable],
-        misc_feed_d: Optional[Dict[str, Iterable]] = None,
-        input_pair_d: Optional[Dict[str, tf.Tensor]] = None,
-        ) -> Dict[str, np.array]:
-
-    feed_pair_dict = dict(ChainMap(
-        *[{f'{tag}.{feat_name}': data_in
-           for feat_name, data_in in feed_d.items()}
-          for tag, feed_d in [
-              (USER_VAR_TAG, user_feed_d),
-              (POS_VAR_TAG, pos_item_feed_d),
-              (NEG_VAR_TAG, neg_item_feed_d),
-              (CONTEXT_VAR_TAG, context_feed_d),
-              (MISC_TAG, misc_feed_d),
-          ] if feed_d is not None]
-    ))
-
-    if input_pair_d is not None:
-        feed_pair_dict = {
-            input_pair_d[k]: v for k, v in feed_pair_dict.items()}
-
-    return feed_pair_dict
-
-
 def feed_via_inds(inds_batch: Sequence[int],
                   cols: Sequence[str],
                   codes_arr: Optional[np.array],
@@ -108,6 +80,7 @@ class PairSampler(object):
         uniform_users: If `True` sample by user
             rather than by positive interaction
             (optimize all users equally rather than weighing more active users)
+            Ignored if a `scheduler` is provided
         method: Negative sampling method
         model: Optional model for adaptive sampling
         use_ds_iter: If `True`, use tf.data.Dataset iterator API, else
@@ -116,6 +89,26 @@ class PairSampler(object):
         non_negs_df: Additional interactions that are safeguarded from being
             sampled as negatives. But they will not be chosen as positives.
         n_neg: number of negatives to sample per positive
+        n_workers: number of background processes to produce batches with
+            (0 to sample in the calling process). Not supported for adaptive
+            methods since they need the model session
+        pop_alpha: exponent applied to item interaction counts for the
+            `popularity` methods (0 is uniform, 1 is proportional to counts)
+        scorer: How adaptive methods score negative candidates.
+            One of {'session', 'snapshot'}
+
+            - session: forward pass of the model in `sess` for every batch
+            - snapshot: NumPy snapshot of the embeddings
+              (see :class:`tophat.sampling.scoring.SnapshotScorer`)
+        scorer_refresh: number of batches between snapshot refreshes
+        max_sampled: max number of negative candidates to score per positive
+            for adaptive methods
+        scheduler: Orders the positives of each epoch
+            (see :mod:`tophat.sampling.schedulers`). Defaults to
+            `UserScheduler` if `uniform_users` else `InteractionScheduler`
+        progressive: If `True`, `adaptive_warp` scores candidates in growing
+            chunks until each positive has a violator
+            (see :func:`tophat.sampling.adaptive.first_violators_progressive`)
 
     Terminology:
 
@@ -143,47 +136,61 @@ class PairSampler(object):
                  seed: int = 0,
                  non_negs_df: Optional[pd.DataFrame] = None,
                  n_neg: int = 1,
+                 n_workers: int = 0,
+                 pop_alpha: float = 0.75,
+                 scorer: str = 'session',
+                 scorer_refresh: int = 100,
+                 max_sampled: int = 32,
+                 progressive: bool = False,
+                 scheduler: Optional[schedulers.BatchScheduler] = None,
                  ):
 
+        self.seed = seed
         self.rand = np.random.RandomState(seed)
+        # Epochs are shuffled with the same stream, except in workers where
+        #   it is the stream they share (see `reseed_worker`)
+        self.shuffle_rand = self.rand
 
+        self.cols_d = cols_d
         user_col = cols_d[FGroup.USER]
         item_col = cols_d[FGroup.ITEM]
-        activity_col = cols_d['activity']
-        count_col = cols_d['count']
-
-        # Index alignment
-        feats_codes_dfs = {
-            # TODO: fishy... this breaks sometimes if changed to `reindex`
-            fg: feat_codes_df_d[fg].loc[cats_d[cols_d[fg]]]
-            for fg in [FGroup.USER, FGroup.ITEM]
-        }
 
-        # Grab underlying numerical feature array(s)
-        self.user_num_feats_arr = None
-        self.item_num_feats_arr = None
-        if feats_d_d and FType.NUM in feats_d_d[FGroup.USER]:
-            self.user_num_feats_arr = feats_d_d[FGroup.USER][FType.NUM]\
-                .loc[cats_d[user_col]].values
-        if feats_d_d and FType.NUM in feats_d_d[FGroup.ITEM]:
-            self.item_num_feats_arr = feats_d_d[FGroup.ITEM][FType.NUM]\
-                .loc[cats_d[item_col]].values
-        # TODO: NUM not supported for context right now
+        feats_codes_dfs = self.set_feats(cats_d, feat_codes_df_d, feats_d_d)
 
         self.method = method
         self.get_negs = {
             'uniform': self.sample_uniform,
             'uniform_verified': self.sample_uniform_verified,
             'uniform_ordinal': self.sample_uniform_ordinal,
+            'popularity': self.sample_popularity,
+            'popularity_verified': self.sample_popularity_verified,
             'adaptive': self.sample_adaptive,
             'adaptive_ordinal': self.sample_adaptive_ordinal,
             'adaptive_warp': self.sample_adaptive_warp,
         }[self.method]
 
+        self.n_workers = n_workers
+        if self.n_workers and 'adaptive' in self.method:
+            raise ValueError(
+                f'Background workers are not supported for `{self.method}`')
+
         self.n_epochs = n_epochs if n_epochs >= 0 else sys.maxsize
         self.shuffle = shuffle
 
-        self.uniform_users = uniform_users
+        if scheduler is None:
+            scheduler = schedulers.UserScheduler(shuffle) if uniform_users \
+                else schedulers.InteractionScheduler(shuffle)
+        self.scheduler = scheduler
+        self.uniform_users = self.scheduler.by_user
+
+        if isinstance(self.scheduler, schedulers.CurriculumScheduler):
+            if self.method not in {'adaptive', 'adaptive_ordinal'}:
+                raise ValueError(f'Curriculum scheduling is not supported '
+                                 f'for `{self.method}`')
+            self.get_easy_negs = {
+                'adaptive': self.sample_uniform,
+                'adaptive_ordinal': self.sample_uniform_ordinal,
+            }[self.method]
 
         self.input_pair_d = input_pair_d
         self.use_ds_iter = use_ds_iter
@@ -195,77 +202,34 @@ class PairSampler(object):
         self.n_users = len(interactions_df[user_col].cat.categories)
         self.n_items = len(interactions_df[item_col].cat.categories)
 
-        self.pos_xn_coo = sp.coo_matrix(
-            (np.ones(len(interactions_df), dtype=bool),
-             (interactions_df[user_col].cat.codes,
-              interactions_df[item_col].cat.codes)),
-            shape=(self.n_users, self.n_items), dtype=bool)
-
-        if non_negs_df is not None:
-            # Additional non-negs passed in
-            # should match interaction cats
-            for col in [user_col, item_col]:
-                non_negs_df[col] = non_negs_df[col].astype(CategoricalDtype(
-                    categories=interactions_df[col].cat.categories))
-            non_negs_df.dropna(inplace=True)
-
-            non_negs_df = pd.concat([non_negs_df, interactions_df], axis=0)
-        else:
-            non_negs_df = interactions_df
+        self.pos_xn_coo = self.xn_coo(interactions_df)
 
         # Methods that require non-neg verification
         if self.method in {'uniform_verified',
                            'uniform_ordinal',
+                           'popularity_verified',
                            'adaptive',
                            'adaptive_ordinal',
                            'adaptive_warp',
                            }:
-
-            # Pseudo-ratings for non-neg
-            if ('ordinal' in self.method and
-                    activity_col in interactions_df.columns):
-                non_negs_pr_df = calc_pseudo_ratings(
-                    interactions_df=non_negs_df,
-                    user_col=user_col,
-                    item_col=item_col,
-                    counts_col=count_col,
-                    weight_switch_col=activity_col,
-                    sublinear=True,
-                    reagg_counts=False,
-                    output_col='pseudo_rating',
-                )
-
-                self.non_neg_xn_csr = sp.csr_matrix(
-                    (non_negs_pr_df['pseudo_rating'],
-                     (non_negs_pr_df[user_col].cat.codes,
-                      non_negs_pr_df[item_col].cat.codes)),
-                    shape=(self.n_users, self.n_items), dtype=np.float32)
-            else:
-                self.non_neg_xn_csr = sp.csr_matrix(
-                    (np.ones(len(non_negs_df), dtype=bool),
-                     (non_negs_df[user_col].cat.codes,
-                      non_negs_df[item_col].cat.codes)),
-                    shape=(self.n_users, self.n_items), dtype=bool)
+            self.non_neg_xn_csr = self.non_neg_csr(
+                interactions_df, non_negs_df)
         else:
             self.non_neg_xn_csr = None
 
-        if self.uniform_users:
-            # index for each user
-            self.shuffle_inds = np.arange(self.n_users)
+        self.pop_alpha = pop_alpha
+        if 'popularity' in self.method:
+            self.alias_table = popularity.AliasTable(
+                popularity.popularity_weights(
+                    self.pos_xn_coo.col, self.n_items, self.pop_alpha))
         else:
-            # index for each pos interaction
-            self.shuffle_inds = np.arange(len(self.pos_xn_coo.data))
+            self.alias_table = None
 
-        self.batch_size = min(batch_size, len(self.shuffle_inds))
+        self.set_pos_csr()
+
+        self.scheduler.setup(self.pos_xn_coo, interactions_df)
+        self.batch_size = min(batch_size, self.scheduler.epoch_len)
 
-        self.feats_codes_arrs = {
-            fg: df.values if hasattr(df, 'values') else None
-            for fg, df in feats_codes_dfs.items()
-        }
-        self.code_df_cols = {
-            fg: df.columns if hasattr(df, 'columns') else None
-            for fg, df in feats_codes_dfs.items()
-        }
         self.user_cols = feats_codes_dfs[FGroup.USER].columns
         self.item_cols = feats_codes_dfs[FGroup.ITEM].columns
         self.context_cols = feats_codes_dfs[FGroup.CONTEXT].columns \
@@ -273,19 +237,43 @@ class PairSampler(object):
             FGroup.CONTEXT in feats_codes_dfs and
             feats_codes_dfs[FGroup.CONTEXT] is not None) else []
 
+        self.snapshot_scorer = None
         if 'adaptive' in self.method:
-            self.max_sampled = 32  # for WARP
-
-            # Re-usable -- just get it once
-            # Flexible batch_size for negative sampling
-            #   which will pass in batch_size * max_sampled records
-            self.fwd_dict = self._model.get_fwd_dict(batch_size=None)
-            self.fwd_op = self._model.forward(self.fwd_dict)
+            self.max_sampled = max_sampled  # for WARP
+            self.progressive = progressive
+
+            if scorer == 'session':
+                # Re-usable -- just get it once
+                # Flexible batch_size for negative sampling
+                #   which will pass in batch_size * max_sampled records
+                self.fwd_dict = self._model.get_fwd_dict(batch_size=None)
+                self.fwd_op = self._model.forward(self.fwd_dict)
+                self.score_fn = self.score_via_inds_fn
+            elif scorer == 'snapshot':
+                self.snapshot_scorer = scoring.SnapshotScorer(
+                    self._model.net,
+                    self.feats_codes_arrs,
+                    self.code_df_cols,
+                    refresh_every=scorer_refresh,
+                )
+                self.score_fn = self.snapshot_scorer.score
+            else:
+                raise ValueError(f'Unknown scorer {scorer}')
 
         self.n_neg = n_neg
 
         self.sess = sess
 
+        # Feed plans keyed by feed keys (see `resolve_feed`)
+        self._feed_plans = {}
+        # Reusable output buffers of gathered features (see `gather`).
+        #   Not with `tf.data`, which may hold on to yielded arrays while
+        #   prefetching, so the default (generator) path still allocates
+        #   its outputs every batch. Workers copy out of their buffers
+        #   right away (see `reseed_worker`)
+        self.reuse_buffers = not self.use_ds_iter
+        self._buffers = {}
+
     @classmethod
     def from_data_loader(cls,
                          train_data_loader: TrainDataLoader,
@@ -299,6 +287,14 @@ class PairSampler(object):
                          use_ds_iter: bool = True,
                          seed: int = 0,
                          non_negs_df: Optional[pd.DataFrame] = None,
+                         n_workers: int = 0,
+                         pop_alpha: float = 0.75,
+                         scorer: str = 'session',
+                         scorer_refresh: int = 100,
+                         max_sampled: int = 32,
+                         progressive: bool = False,
+                         scheduler: Optional[
+                             schedulers.BatchScheduler] = None,
                          ):
         return cls(
             interactions_df=train_data_loader.interactions_df,
@@ -316,9 +312,194 @@ class PairSampler(object):
             use_ds_iter=use_ds_iter,
             seed=seed,
             non_negs_df=non_negs_df,
+            n_workers=n_workers,
+            pop_alpha=pop_alpha,
+            scorer=scorer,
+            scorer_refresh=scorer_refresh,
+            max_sampled=max_sampled,
+            progressive=progressive,
+            scheduler=scheduler,
         )
 
+    def set_feats(self,
+                  cats_d: Dict[str, List],
+                  feat_codes_df_d: Dict[FGroup, pd.DataFrame],
+                  feats_d_d: Dict[FGroup, Dict[FType, pd.DataFrame]],
+                  ) -> Dict[FGroup, pd.DataFrame]:
+        """Aligns the feature arrays to the categories of the ids
+
+        Returns:
+            Aligned feature codes dataframes by group
+        """
+        user_col = self.cols_d[FGroup.USER]
+        item_col = self.cols_d[FGroup.ITEM]
+
+        # Index alignment
+        feats_codes_dfs = {
+            # TODO: fishy... this breaks sometimes if changed to `reindex`
+            fg: feat_codes_df_d[fg].loc[cats_d[self.cols_d[fg]]]
+            for fg in [FGroup.USER, FGroup.ITEM]
+        }
+
+        # Grab underlying numerical feature array(s)
+        self.user_num_feats_arr = None
+        self.item_num_feats_arr = None
+        if feats_d_d and FType.NUM in feats_d_d[FGroup.USER]:
+            self.user_num_feats_arr = feats_d_d[FGroup.USER][FType.NUM]\
+                .loc[cats_d[user_col]].values
+        if feats_d_d and FType.NUM in feats_d_d[FGroup.ITEM]:
+            self.item_num_feats_arr = feats_d_d[FGroup.ITEM][FType.NUM]\
+                .loc[cats_d[item_col]].values
+        # TODO: NUM not supported for context right now
+
+        # Row-major so that gathering an entity's codes is a contiguous read
+        self.feats_codes_arrs = {
+            fg: np.ascontiguousarray(df.values, dtype=np.int32)
+            if hasattr(df, 'values') else None
+            for fg, df in feats_codes_dfs.items()
+        }
+        self.code_df_cols = {
+            fg: df.columns if hasattr(df, 'columns') else None
+            for fg, df in feats_codes_dfs.items()
+        }
+        return feats_codes_dfs
+
+    def xn_coo(self, interactions_df: pd.DataFrame) -> sp.coo_matrix:
+        """Positive interaction matrix of (encoded) interactions"""
+        return sp.coo_matrix(
+            (np.ones(len(interactions_df), dtype=bool),
+             (interactions_df[self.cols_d[FGroup.USER]].cat.codes,
+              interactions_df[self.cols_d[FGroup.ITEM]].cat.codes)),
+            shape=(self.n_users, self.n_items), dtype=bool)
+
+    def non_neg_csr(self,
+                    interactions_df: pd.DataFrame,
+                    non_negs_df: Optional[pd.DataFrame] = None,
+                    ) -> sp.csr_matrix:
+        """Non-negative interaction matrix of (encoded) interactions and
+        additional non-negs
+
+        For ordinal methods, the values are pseudo-ratings
+        """
+        user_col = self.cols_d[FGroup.USER]
+        item_col = self.cols_d[FGroup.ITEM]
+        activity_col = self.cols_d['activity']
+        count_col = self.cols_d['count']
+
+        if non_negs_df is not None:
+            # Additional non-negs passed in
+            # should match interaction cats
+            for col in [user_col, item_col]:
+                non_negs_df[col] = non_negs_df[col].astype(CategoricalDtype(
+                    categories=interactions_df[col].cat.categories))
+            non_negs_df.dropna(inplace=True)
+
+            non_negs_df = pd.concat([non_negs_df, interactions_df], axis=0)
+        else:
+            non_negs_df = interactions_df
+
+        # Pseudo-ratings for non-neg
+        if ('ordinal' in self.method and
+                activity_col in interactions_df.columns):
+            non_negs_pr_df = calc_pseudo_ratings(
+                interactions_df=non_negs_df,
+                user_col=user_col,
+                item_col=item_col,
+                counts_col=count_col,
+                weight_switch_col=activity_col,
+                sublinear=True,
+                reagg_counts=False,
+                output_col='pseudo_rating',
+            )
+
+            return sp.csr_matrix(
+                (non_negs_pr_df['pseudo_rating'],
+                 (non_negs_pr_df[user_col].cat.codes,
+                  non_negs_pr_df[item_col].cat.codes)),
+                shape=(self.n_users, self.n_items), dtype=np.float32)
+        else:
+            return sp.csr_matrix(
+                (np.ones(len(non_negs_df), dtype=bool),
+                 (non_negs_df[user_col].cat.codes,
+                  non_negs_df[item_col].cat.codes)),
+                shape=(self.n_users, self.n_items), dtype=bool)
+
+    def set_pos_csr(self):
+        """Row lookups of positives for user-based schedules"""
+        if self.uniform_users:
+            self.pos_xn_csr = self.pos_xn_coo.tocsr()
+            # If the non-negs have the same rows as the positives,
+            #   the rows looked up to select positives are reused for
+            #   verification
+            self.share_rows_nz = (
+                self.non_neg_xn_csr is not None and
+                np.array_equal(self.pos_xn_csr.indptr,
+                               self.non_neg_xn_csr.indptr) and
+                np.array_equal(self.pos_xn_csr.indices,
+                               self.non_neg_xn_csr.indices))
+        else:
+            self.pos_xn_csr = None
+            self.share_rows_nz = False
+
+    def update_from_data_loader(self,
+                                train_data_loader: TrainDataLoader,
+                                delta_non_negs_df: Optional[
+                                    pd.DataFrame] = None,
+                                ):
+        """Extends the sampler with the interactions (and categories) of the
+        last `TrainDataLoader.update`
+
+        The interaction matrices are extended with the delta only. Since
+        codes of existing categories are stable, existing entries are
+        unchanged. Call this before (re-)starting iteration -- background
+        workers that are already running keep their copy of the data.
+
+        Args:
+            train_data_loader: data loader this sampler was made from, after
+                `TrainDataLoader.update`
+            delta_non_negs_df: Additional non-negs of the delta
+        """
+        delta_df = train_data_loader.delta_interactions_df
+        interactions_df = train_data_loader.interactions_df
+
+        self.set_feats(train_data_loader.cats_d,
+                       train_data_loader.feats_codes_df,
+                       train_data_loader.feats_by_group)
+        self.n_users = len(
+            interactions_df[self.cols_d[FGroup.USER]].cat.categories)
+        self.n_items = len(
+            interactions_df[self.cols_d[FGroup.ITEM]].cat.categories)
+        shape = (self.n_users, self.n_items)
+
+        delta_coo = self.xn_coo(delta_df)
+        self.pos_xn_coo = sp.coo_matrix(
+            (np.concatenate([self.pos_xn_coo.data, delta_coo.data]),
+             (np.concatenate([self.pos_xn_coo.row, delta_coo.row]),
+              np.concatenate([self.pos_xn_coo.col, delta_coo.col]))),
+            shape=shape, dtype=bool)
+
+        if self.non_neg_xn_csr is not None:
+            self.non_neg_xn_csr.resize(shape)
+            # (the max keeps the higher pseudo-rating for ordinal methods)
+            self.non_neg_xn_csr = self.non_neg_xn_csr.maximum(
+                self.non_neg_csr(delta_df, delta_non_negs_df)).tocsr()
+            self.non_neg_xn_csr.sort_indices()
+
+        if self.alias_table is not None:
+            self.rebuild_popularity()
+
+        self.set_pos_csr()
+        self.scheduler.setup(self.pos_xn_coo, interactions_df)
+
+        if self.snapshot_scorer is not None:
+            self.snapshot_scorer.codes_arrs.update(
+                {fg: self.feats_codes_arrs[fg]
+                 for fg in self.snapshot_scorer.codes_arrs})
+            self.snapshot_scorer.n_batches = 0  # refresh at the next batch
+
     def __iter__(self):
+        if self.n_workers:
+            return self.iter_feed_pairs_parallel()
         return self.iter_feed_pairs()
 
     def sample_uniform(self, **_):
@@ -328,17 +509,20 @@ class PairSampler(object):
 
     def sample_uniform_verified(self,
                                 user_inds_batch: Sequence[int],
+                                rows_nz=None,
                                 **_):
         """See :func:`tophat.sampling.uniform.sample_uniform_verified`"""
         return uniform.sample_uniform_verified(self.n_items,
                                                self.non_neg_xn_csr,
                                                user_inds_batch,
                                                self.n_neg,
+                                               rows_nz,
                                                )
 
     def sample_uniform_ordinal(self,
                                user_inds_batch: Sequence[int],
                                pos_item_inds_batch: Sequence[int],
+                               rows_nz=None,
                                **_):
         """See :func:`tophat.sampling.uniform.sample_uniform_ordinal`"""
         return uniform.sample_uniform_ordinal(
@@ -347,17 +531,52 @@ class PairSampler(object):
             user_inds_batch,
             pos_item_inds_batch,
             self.n_neg,
+            rows_nz,
         )
 
+    def sample_popularity(self, **_):
+        """See :func:`tophat.sampling.popularity.sample_popularity`"""
+        return popularity.sample_popularity(self.alias_table,
+                                            self.batch_size, self.n_neg)
+
+    def sample_popularity_verified(self,
+                                   user_inds_batch: Sequence[int],
+                                   rows_nz=None,
+                                   **_):
+        """See :func:`tophat.sampling.popularity.sample_popularity_verified`
+        """
+        return popularity.sample_popularity_verified(self.alias_table,
+                                                     self.non_neg_xn_csr,
+                                                     user_inds_batch,
+                                                     self.n_neg,
+                                                     rows_nz=rows_nz,
+                                                     )
+
+    def rebuild_popularity(self, item_inds: Optional[Sequence[int]] = None):
+        """Rebuilds the popularity alias table in place
+
+        Args:
+            item_inds: Item index of each interaction to count popularity
+                from. If `None`, the positive interactions are used
+        """
+        if item_inds is None:
+            item_inds = self.pos_xn_coo.col
+        weights = popularity.popularity_weights(
+            item_inds, self.n_items, self.pop_alpha)
+        if self.alias_table is None:
+            self.alias_table = popularity.AliasTable(weights)
+        else:
+            self.alias_table.build(weights)
+
     def sample_adaptive(self,
                         user_inds_batch: Sequence[int],
                         pos_item_inds_batch: Sequence[int],
                         use_first_violation: bool = False,
-                        ):
+                        **_):
         """See :func:`tophat.sampling.adaptive.sample_adaptive`"""
         return adaptive.sample_adaptive(self.n_items,
                                         self.max_sampled,
-                                        self.score_via_inds_fn,
+                                        self.score_fn,
                                         user_inds_batch,
                                         pos_item_inds_batch,
                                         use_first_violation,
@@ -368,15 +587,17 @@ class PairSampler(object):
                                 user_inds_batch: Sequence[int],
                                 pos_item_inds_batch: Sequence[int],
                                 use_first_violation: bool = False,
+                                rows_nz=None,
                                 ):
         """See :func:`tophat.sampling.adaptive.sample_adaptive`"""
         return adaptive.sample_adaptive(self.n_items,
                                         self.max_sampled,
-                                        self.score_via_inds_fn,
+                                        self.score_fn,
                                         user_inds_batch,
                                         pos_item_inds_batch,
                                         use_first_violation,
                                         self.non_neg_xn_csr,
+                                        rows_nz=rows_nz,
                                         )
 
     def sample_adaptive_warp(self,
@@ -384,18 +605,47 @@ class PairSampler(object):
                              pos_item_inds_batch: Sequence[int],
                              use_first_violation: bool = True,
                              return_n_samp: bool = True,
+                             rows_nz=None,
                              ):
         """See :func:`tophat.sampling.adaptive.sample_adaptive`"""
         return adaptive.sample_adaptive(self.n_items,
                                         self.max_sampled,
-                                        self.score_via_inds_fn,
+                                        self.score_fn,
                                         user_inds_batch,
                                         pos_item_inds_batch,
                                         use_first_violation,
                                         self.non_neg_xn_csr,
                                         return_n_samp,
+                                        self.progressive,
+                                        rows_nz,
                                         )
 
+    def sample_curriculum(self,
+                          hard_fraction: float,
+                          user_inds_batch: Sequence[int],
+                          pos_item_inds_batch: Sequence[int],
+                          rows_nz=None,
+                          ):
+        """Adaptive ("hard") negatives for a random `hard_fraction` of the
+        batch and uniform ("easy") negatives for the rest
+        (see :class:`tophat.sampling.schedulers.CurriculumScheduler`)
+        """
+        neg_item_inds_batch = self.get_easy_negs(
+            user_inds_batch=user_inds_batch,
+            pos_item_inds_batch=pos_item_inds_batch,
+            rows_nz=rows_nz,
+        )
+        n_hard = int(round(hard_fraction * len(user_inds_batch)))
+        if n_hard:
+            hard_rows = self.rand.choice(
+                len(user_inds_batch), n_hard, replace=False)
+            # (one adaptive negative per positive -- repeated over `n_neg`)
+            neg_item_inds_batch[hard_rows] = self.get_negs(
+                user_inds_batch=user_inds_batch[hard_rows],
+                pos_item_inds_batch=pos_item_inds_batch[hard_rows],
+            )
+        return neg_item_inds_batch
+
     def score_via_dict_fn(self, fwd_dict):
         return self.sess.run(self.fwd_op, feed_dict=fwd_dict)
 
@@ -432,64 +682,315 @@ class PairSampler(object):
                              num_key=None,
                              )
 
-    def iter_feed_pairs(self):
-        # The feed dict generator itself
+    @property
+    def feed_keys(self) -> Tuple[str, ...]:
+        """Keys of the features consumed by the task (`input_pair_d`), in the
+        order of the tuples generated by `iter_feed_tuples`"""
+        return tuple(self.input_pair_d)
+
+    def feed_sources(self) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Every feature this sampler can produce with its source, a
+        `(block, column)` pair. Blocks are gathered once per batch
+        (see `gather_blocks`) and a column of `None` is the whole block"""
+        sources = {}
+        for tag, block, fg in [(USER_VAR_TAG, 'user', FGroup.USER),
+                               (POS_VAR_TAG, 'pos', FGroup.ITEM),
+                               (NEG_VAR_TAG, 'neg', FGroup.ITEM),
+                               (CONTEXT_VAR_TAG, 'context', FGroup.CONTEXT),
+                               ]:
+            if self.code_df_cols.get(fg, None) is None:
+                continue
+            for j, col in enumerate(self.code_df_cols[fg]):
+                sources[f'{tag}{TAG_DELIM}{col}'] = (block, j)
+        if self.user_num_feats_arr is not None:
+            sources[f'{USER_VAR_TAG}{TAG_DELIM}user_num_feats'] = \
+                ('user_num', None)
+        if self.item_num_feats_arr is not None:
+            sources[f'{POS_VAR_TAG}{TAG_DELIM}item_num_feats'] = \
+                ('pos_num', None)
+            sources[f'{NEG_VAR_TAG}{TAG_DELIM}item_num_feats'] = \
+                ('neg_num', None)
+        if self.method == 'adaptive_warp':
+            sources[f'{MISC_TAG}{TAG_DELIM}first_violator_inds'] = \
+                ('misc', None)
+        return sources
+
+    def resolve_feed(self, keys: Sequence[str],
+                     ) -> List[Tuple[str, Optional[int]]]:
+        """Resolves (once) the source of each feed key
+
+        Args:
+            keys: Feed keys to produce
+
+        Returns:
+            List of `(block, column)` sources aligned with `keys`
+
+        """
+        keys = tuple(keys)
+        if keys not in self._feed_plans:
+            sources = self.feed_sources()
+            missing = [k for k in keys if k not in sources]
+            if missing:
+                raise KeyError(f'Sampler can not produce {missing}')
+            self._feed_plans[keys] = [sources[k] for k in keys]
+        return self._feed_plans[keys]
+
+    def _buffer(self, name: str, shape: Tuple[int, ...], dtype):
+        buf = self._buffers.get(name, None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def gather(self, name: str, arr: np.array, inds: np.array,
+               transpose: bool = False) -> np.array:
+        """Gathers rows of `arr` with `np.take`
+        (into reusable buffers if `self.reuse_buffers`)
+
+        Transposed blocks are gathered as rows of the row-major `arr`, then
+        copied to the column layout: with a few dozen columns this is about
+        3x faster than a single `take` along a column-major copy of `arr`
+        (which reads every index once per column)
+
+        Args:
+            name: Name of the buffer(s) to reuse
+            arr: Array to gather rows of
+            inds: Row indices (any shape)
+            transpose: If `True`, columns are moved to the first axis
+                (each column of the result is then contiguous)
+
+        Returns:
+            Gathered array
+        """
+        if not self.reuse_buffers:
+            rows = np.take(arr, inds, axis=0)
+            if transpose:
+                return np.ascontiguousarray(np.moveaxis(rows, -1, 0))
+            return rows
+
+        # (`clip` mode gathers straight into `out` without buffering, but
+        #   would silently clamp bad indices)
+        if np.size(inds) and (np.min(inds) < 0 or
+                              np.max(inds) >= len(arr)):
+            raise IndexError(f'Indices out of bounds gathering {name} '
+                             f'(of {len(arr)} rows)')
+        rows_shape = np.shape(inds) + arr.shape[1:]
+        rows = np.take(arr, inds, axis=0, mode='clip',
+                       out=self._buffer(name, rows_shape, arr.dtype))
+        if not transpose:
+            return rows
+        cols = np.moveaxis(rows, -1, 0)
+        out = self._buffer(f'{name}_t', cols.shape, arr.dtype)
+        np.copyto(out, cols)
+        return out
+
+    def gather_blocks(self,
+                      blocks: Iterable[str],
+                      inds_batch: np.array,
+                      user_inds_batch: np.array,
+                      pos_item_inds_batch: np.array,
+                      neg_item_inds_batch: np.array,
+                      misc: Optional[np.array] = None,
+                      ) -> Dict[str, np.array]:
+        """Gathers the feature blocks of a batch
+        Categorical blocks are `[n_cols, ...batch shape]` so each feature is
+        a contiguous row"""
+        codes = self.feats_codes_arrs
+        gathered = {}
+        for block in blocks:
+            if block == 'user':
+                gathered[block] = self.gather(
+                    block, codes[FGroup.USER], user_inds_batch, True)
+            elif block == 'pos':
+                gathered[block] = self.gather(
+                    block, codes[FGroup.ITEM], pos_item_inds_batch, True)
+            elif block == 'neg':
+                # Negatives are fed as [n_neg, batch_size]
+                gathered[block] = self.gather(
+                    block, codes[FGroup.ITEM], neg_item_inds_batch.T, True)
+            elif block == 'context':
+                gathered[block] = self.gather(
+                    block, codes[FGroup.CONTEXT], inds_batch, True)
+            elif block == 'user_num':
+                gathered[block] = self.gather(
+                    block, self.user_num_feats_arr, user_inds_batch)
+            elif block == 'pos_num':
+                gathered[block] = self.gather(
+                    block, self.item_num_feats_arr, pos_item_inds_batch)
+            elif block == 'neg_num':
+                gathered[block] = self.gather(
+                    block, self.item_num_feats_arr, neg_item_inds_batch)
+            elif block == 'misc':
+                gathered[block] = misc
+        return gathered
+
+    def iter_feed_tuples(self, shard: Optional[Tuple[int, int]] = None):
+        """Generates the features of each batch as a tuple laid out like
+        `self.feed_keys` (no per-batch dictionary or key building)
+
+        Args:
+            shard: Optional `(shard_ind, n_shards)` to only produce every
+                `n_shards`-th batch of each epoch starting at `shard_ind`
+                (the epoch ordering is the same for every shard)
+
+        Yields:
+            Tuples of batch arrays
+
+        """
+        if self.n_workers and shard is None:
+            # Copy out of the shared ring, the consumer may hold on to them
+            #   (ex. `tf.data` prefetching)
+            for feed in self.iter_feed_tuples_parallel():
+                yield tuple(arr.copy() for arr in feed)
+        else:
+            yield from self._iter_feeds(self.resolve_feed(self.feed_keys),
+                                        shard)
+
+    def iter_feed_pairs(self, shard: Optional[Tuple[int, int]] = None):
+        """The feed dict generator itself
+
+        Args:
+            shard: Optional `(shard_ind, n_shards)` to only produce every
+                `n_shards`-th batch of each epoch starting at `shard_ind`
+                (the epoch ordering is the same for every shard)
+
+        Yields:
+            Feed dictionaries
+
+        """
+        if self.input_pair_d_usage is None:
+            # Everything we can produce, keyed by name
+            keys = list(self.feed_sources())
+            out_keys = keys
+        else:
+            # Keyed by placeholder
+            keys = list(self.input_pair_d_usage)
+            out_keys = [self.input_pair_d_usage[k] for k in keys]
+
+        for feed in self._iter_feeds(self.resolve_feed(keys), shard):
+            yield dict(zip(out_keys, feed))
+
+    def _iter_feeds(self,
+                    feed_plan: List[Tuple[str, Optional[int]]],
+                    shard: Optional[Tuple[int, int]] = None,
+                    ):
+        """Generates batch tuples laid out like `feed_plan`"""
         # Note: can implement __next__ as well
         #   if we want book-keeping state info to be kept
 
-        if self.uniform_users:
-            pos_xn_csr = self.pos_xn_coo.tocsr()
+        blocks = {block for block, _ in feed_plan}
 
+        step = -1
         for i in range(self.n_epochs):
-            if self.shuffle:
-                self.rand.shuffle(self.shuffle_inds)
-            inds_batcher = batcher(self.shuffle_inds, n=self.batch_size)
+            inds_batcher = batcher(
+                self.scheduler.epoch_inds(self.shuffle_rand),
+                n=self.batch_size)
             # inds are either on interaction or user level
-            for inds_batch in inds_batcher:
+            for batch_ind, inds_batch in enumerate(inds_batcher):
+                step += 1
+                if shard is not None and batch_ind % shard[1] != shard[0]:
+                    continue
 
+                rows_nz = None
                 if self.uniform_users:
                     user_inds_batch = inds_batch
-                    pos_l = []
-                    # Pre-generate rands (`random.choice` slow)
-                    rand_rats = self.rand.rand(self.batch_size)
-                    for user_ind, rat in zip(user_inds_batch, rand_rats):
-                        # TODO: `get_row_nz` repeated in sampling
-                        user_pos_item_inds = get_row_nz(pos_xn_csr, user_ind)
-                        user_pos_item = user_pos_item_inds[
-                            int(rat * len(user_pos_item_inds))]
-                        pos_l.append(user_pos_item)
                     # Select random known pos for user
-                    pos_item_inds_batch = np.array(pos_l)
+                    if self.share_rows_nz:
+                        rows_nz = get_rows_nz_pos(self.pos_xn_csr,
+                                                  user_inds_batch)
+                        pos, lens = rows_nz
+                        starts = np.cumsum(lens) - lens
+                        pos_item_inds_batch = self.pos_xn_csr.indices[pos[
+                            starts + (self.rand.rand(self.batch_size) *
+                                      lens).astype(np.int64)]]
+                    else:
+                        indptr = self.pos_xn_csr.indptr
+                        starts = indptr[user_inds_batch]
+                        lens = indptr[user_inds_batch + 1] - starts
+                        pos_item_inds_batch = self.pos_xn_csr.indices[
+                            starts + (self.rand.rand(self.batch_size) *
+                                      lens).astype(np.int64)]
 
                 else:
                     user_inds_batch = self.pos_xn_coo.row[inds_batch]
                     pos_item_inds_batch = self.pos_xn_coo.col[inds_batch]
 
-                neg_samp_results = self.get_negs(
-                    user_inds_batch=user_inds_batch,
-                    pos_item_inds_batch=pos_item_inds_batch,)
+                if self.snapshot_scorer is not None:
+                    self.snapshot_scorer.step(self.sess)
+
+                hard_fraction = self.scheduler.hard_fraction(step)
+                if hard_fraction is None:
+                    neg_samp_results = self.get_negs(
+                        user_inds_batch=user_inds_batch,
+                        pos_item_inds_batch=pos_item_inds_batch,
+                        rows_nz=rows_nz,)
+                else:
+                    neg_samp_results = self.sample_curriculum(
+                        hard_fraction,
+                        user_inds_batch=user_inds_batch,
+                        pos_item_inds_batch=pos_item_inds_batch,
+                        rows_nz=rows_nz,)
                 # Return signature based on method
                 if self.method == 'adaptive_warp':
                     neg_item_inds_batch, first_violator_inds = neg_samp_results
-                    misc_feed_d = {'first_violator_inds': first_violator_inds}
                 else:
                     neg_item_inds_batch = neg_samp_results
-                    misc_feed_d = None
+                    first_violator_inds = None
+
+                gathered = self.gather_blocks(
+                    blocks,
+                    inds_batch,
+                    user_inds_batch,
+                    pos_item_inds_batch,
+                    neg_item_inds_batch,
+                    misc=first_violator_inds,
+                )
+                yield tuple(gathered[block] if j is None
+                            else gathered[block][j]
+                            for block, j in feed_plan)
 
-                user_feed_d = self.user_feed_via_inds(user_inds_batch)
-                pos_item_feed_d = self.item_feed_via_inds(pos_item_inds_batch)
-                neg_item_feed_d = self.item_feed_via_inds(neg_item_inds_batch)
+    def iter_feed_tuples_parallel(self):
+        """Generates feed tuples produced by `self.n_workers` background
+        processes (see :func:`tophat.sampling.parallel.iter_via_workers`)
 
-                context_feed_d = self.context_feed_via_inds(inds_batch)
+        Each worker produces its own shard of every epoch, with a random
+        state seeded by `(self.seed, worker_ind + 1)`
 
-                feed_pair_dict = feed_via_pair(
-                    user_feed_d,
-                    pos_item_feed_d, neg_item_feed_d,
-                    context_feed_d,
-                    misc_feed_d=misc_feed_d,
-                    input_pair_d=self.input_pair_d_usage,
-                )
-                yield feed_pair_dict
+        Note: the yielded arrays are views into shared memory which are only
+        valid until the next batch is requested
+        """
+        keys = self.feed_keys
+        layout = {i: (self.input_pair_d[k].dtype.as_numpy_dtype,
+                      self.input_pair_d[k].shape.as_list())
+                  for i, k in enumerate(keys)}
+        if any(d is None for _, shape in layout.values() for d in shape):
+            raise ValueError('Background workers need fully defined '
+                             'input shapes (is `batch_size` set?)')
+        # Resolve before forking so workers don't each do it
+        self.resolve_feed(keys)
+        for batch in parallel.iter_via_workers(
+                self.iter_feed_tuples, layout, self.n_workers,
+                init_worker_fn=self.reseed_worker):
+            yield tuple(batch[i] for i in range(len(keys)))
+
+    def iter_feed_pairs_parallel(self):
+        """Generates feed dicts produced by `self.n_workers` background
+        processes (see `iter_feed_tuples_parallel`), keyed like
+        `iter_feed_pairs` (by placeholder if `input_pair_d_usage`)
+        """
+        keys = self.feed_keys
+        if self.input_pair_d_usage is not None:
+            keys = [self.input_pair_d_usage[k] for k in keys]
+        # Copied out of the shared ring like `iter_feed_tuples`
+        for feed in self.iter_feed_tuples():
+            yield dict(zip(keys, feed))
+
+    def reseed_worker(self, worker_ind: int):
+        """Gives a worker its own reproducible sampling random states"""
+        # Batches are copied into the shared ring right away
+        self.reuse_buffers = True
+        self.rand = np.random.RandomState([self.seed, worker_ind + 1])
+        # Some samplers draw from the global random state
+        np.random.seed([self.seed, worker_ind + 1])
 
     def fwd_dicter_via_inds(self,
                             user_inds: Union[int, Sequence[int]],
@@ -0,0 +1,175 @@
+"""
+Implements multi-process background production of sampled batches
+"""
+import multiprocessing as mp
+import queue
+import traceback
+
+import numpy as np
+from typing import Dict, Tuple, Sequence, Callable, Iterator, Optional
+
+from tophat.utils.log import logger
+
+# name -> (dtype, shape) of every array in a batch
+BatchLayout = Dict[str, Tuple[np.dtype, Sequence[int]]]
+
+
+class SharedBatchRing(object):
+    """Ring of fixed-layout batch slots backed by shared memory
+
+    Slots are handed between producers and the consumer by index through two
+    queues, so the batch data itself is never pickled
+
+    Args:
+        layout: dtype and shape of every array in a batch keyed by name
+        n_slots: number of batches that can be in flight at once
+        ctx: multiprocessing context to allocate with
+    """
+
+    def __init__(self,
+                 layout: BatchLayout,
+                 n_slots: int,
+                 ctx=mp,
+                 ):
+        self.layout = {k: (np.dtype(dtype), tuple(shape))
+                       for k, (dtype, shape) in layout.items()}
+        self.n_slots = n_slots
+
+        # Byte offset of each array within a slot (aligned to its itemsize)
+        self.offsets = {}
+        nbytes = 0
+        for k, (dtype, shape) in self.layout.items():
+            nbytes = -(-nbytes // dtype.itemsize) * dtype.itemsize
+            self.offsets[k] = nbytes
+            nbytes += int(np.prod(shape)) * dtype.itemsize
+        self.slot_nbytes = -(-max(nbytes, 1) // 8) * 8
+
+        self.buf = ctx.RawArray('b', self.slot_nbytes * n_slots)
+        self.free_q = ctx.Queue()
+        self.full_q = ctx.Queue()
+        for slot_ind in range(n_slots):
+            self.free_q.put(slot_ind)
+
+    def slot(self, slot_ind: int) -> Dict[str, np.array]:
+        """Array views into a slot of the ring"""
+        base = slot_ind * self.slot_nbytes
+        return {
+            k: np.frombuffer(self.buf, dtype=dtype, count=int(np.prod(shape)),
+                             offset=base + self.offsets[k]).reshape(shape)
+            for k, (dtype, shape) in self.layout.items()
+        }
+
+
+def produce_into_ring(ring: SharedBatchRing,
+                      batch_gen_fn: Callable[..., Iterator[Dict]],
+                      worker_ind: int,
+                      n_workers: int,
+                      init_worker_fn: Optional[Callable[[int], None]] = None,
+                      ):
+    """Worker loop: writes its shard of batches into free slots of the ring
+
+    Args:
+        ring: ring to fill
+        batch_gen_fn: function returning a generator of batch dictionaries
+            given a `shard=(worker_ind, n_workers)` keyword
+        worker_ind: index of this worker
+        n_workers: total number of workers
+        init_worker_fn: optional hook called with `worker_ind` before
+            producing (ex. to reseed random states)
+    """
+    try:
+        if init_worker_fn is not None:
+            init_worker_fn(worker_ind)
+        slots = [ring.slot(i) for i in range(ring.n_slots)]
+        for batch_d in batch_gen_fn(shard=(worker_ind, n_workers)):
+            slot_ind = ring.free_q.get()
+            for k, arr in slots[slot_ind].items():
+                arr[...] = batch_d[k]
+            ring.full_q.put(slot_ind)
+    except Exception:
+        # Hand the traceback to the consumer (to re-raise)
+        ring.full_q.put(traceback.format_exc())
+        raise
+    # Signal that this worker is exhausted
+    ring.full_q.put(None)
+
+
+class WorkerError(RuntimeError):
+    """A sampling worker failed"""
+
+
+def iter_via_workers(batch_gen_fn: Callable[..., Iterator[Dict]],
+                     layout: BatchLayout,
+                     n_workers: int,
+                     n_slots: Optional[int] = None,
+                     init_worker_fn: Optional[Callable[[int], None]] = None,
+                     poll_secs: float = 1.,
+                     ) -> Iterator[Dict[str, np.array]]:
+    """Generates batches produced by background worker processes
+
+    Workers are forked when iteration starts, so `batch_gen_fn` (and whatever
+    it references) does not need to be picklable.
+
+    Note: a yielded batch is a view into shared memory which is only valid
+    until the next batch is requested (copy it if it needs to be kept)
+
+    Args:
+        batch_gen_fn: function returning a generator of batch dictionaries
+            given a `shard=(worker_ind, n_workers)` keyword
+        layout: dtype and shape of every array in a batch keyed by name
+        n_workers: number of worker processes
+        n_slots: number of batches that can be in flight at once
+            (defaults to `2 * n_workers`)
+        init_worker_fn: optional hook called in each worker with its index
+        poll_secs: seconds between checks that the workers are still alive
+            while waiting for a batch
+
+    Yields:
+        Batch dictionaries
+
+    Raises:
+        WorkerError: if a worker raises (with its traceback), or exits
+            without finishing its shard (ex. killed)
+
+    """
+    ctx = mp.get_context('fork')
+    ring = SharedBatchRing(layout, n_slots or 2 * n_workers, ctx=ctx)
+    slots = [ring.slot(i) for i in range(ring.n_slots)]
+
+    workers = [
+        ctx.Process(target=produce_into_ring,
+                    args=(ring, batch_gen_fn, worker_ind, n_workers,
+                          init_worker_fn),
+                    daemon=True)
+        for worker_ind in range(n_workers)]
+    for w in workers:
+        w.start()
+    logger.info(f'Started {n_workers} sampling workers')
+
+    n_done = 0
+    slot_ind = None
+    try:
+        while n_done < n_workers:
+            # The consumer is done with the last batch once it asks for more
+            if slot_ind is not None:
+                ring.free_q.put(slot_ind)
+            try:
+                slot_ind = ring.full_q.get(timeout=poll_secs)
+            except queue.Empty:
+                slot_ind = None
+                exitcodes = [w.exitcode for w in workers]
+                if any(code not in (None, 0) for code in exitcodes):
+                    raise WorkerError(
+                        f'Sampling worker exited with codes {exitcodes}')
+                continue
+            if isinstance(slot_ind, str):
+                raise WorkerError(f'Sampling worker failed:\n{slot_ind}')
+            elif slot_ind is None:
+                n_done += 1
+                continue
+            yield slots[slot_ind]
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+            w.join()
@@ -0,0 +1,170 @@
+import numpy as np
+import scipy.sparse as sp
+from typing import Sequence, Union, Tuple, Optional
+
+from tophat.utils.sparse_utils import get_rows_nz_pos, find_in_rows
+from tophat.sampling.utils import neg_samp_bsearch_batch
+
+
+class AliasTable(object):
+    """Walker alias table for O(1) draws from a discrete distribution [1]_
+
+    Args:
+        weights: Unnormalized weight of each outcome
+
+    References:
+        .. [1] Vose, Michael D. "A linear algorithm for generating random
+           numbers with a given distribution." IEEE Transactions on software
+           engineering 17.9 (1991): 972-975.
+
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        self.prob: np.array = None
+        self.alias: np.array = None
+        self.build(weights)
+
+    def __len__(self):
+        return len(self.prob)
+
+    def build(self, weights: Sequence[float]):
+        """(Re)builds the table
+        If the number of outcomes is unchanged, the existing arrays are
+        overwritten in place
+
+        Args:
+            weights: Unnormalized weight of each outcome
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if not (weights >= 0).all() or not weights.sum() > 0:
+            raise ValueError(
+                'Weights must be non-negative with a positive sum')
+        n = len(weights)
+        p = weights * (n / weights.sum())
+
+        prob = np.ones(n)
+        alias = np.arange(n)
+        small = np.flatnonzero(p < 1.)
+        large = np.flatnonzero(p >= 1.)
+        # Vose's pairing, but every small outcome is paired at once: a small
+        # outcome goes to the large outcome whose cumulative surplus covers
+        # where the small outcome's deficit starts. Larges that drop below 1
+        # become the smalls of the next round.
+        while len(small) and len(large):
+            deficits = 1. - p[small]
+            deficit_starts = np.cumsum(deficits) - deficits
+            surplus_ends = np.cumsum(p[large] - 1.)
+            # (clip for round-off past the end of the surplus)
+            to_large = np.minimum(
+                np.searchsorted(surplus_ends, deficit_starts, side='right'),
+                len(large) - 1)
+
+            prob[small] = p[small]
+            alias[small] = large[to_large]
+            p[large] -= np.bincount(to_large, weights=deficits,
+                                    minlength=len(large))
+
+            small = large[p[large] < 1.]
+            large = large[p[large] >= 1.]
+        # Anything left over is only off from 1 by round-off (keeps prob 1)
+
+        if self.prob is not None and len(self.prob) == n:
+            self.prob[:] = prob
+            self.alias[:] = alias
+        else:
+            self.prob = prob
+            self.alias = alias
+
+    def sample(self, size: Union[int, Tuple[int, ...]],
+               rand: np.random.RandomState = np.random):
+        """Draws outcomes
+
+        Args:
+            size: Output shape
+            rand: Random state to draw with
+
+        Returns:
+            Array of sampled outcomes
+        """
+        cols = rand.randint(len(self.prob), size=size)
+        return np.where(rand.random_sample(size) < self.prob[cols],
+                        cols, self.alias[cols])
+
+
+def popularity_weights(item_inds: Sequence[int], n_items: int,
+                       alpha: float = 0.75) -> np.array:
+    """Popularity weights of items (count ** alpha) from positive interactions
+    """
+    return np.bincount(item_inds, minlength=n_items) ** alpha
+
+
+def sample_popularity(alias_table: AliasTable,
+                      batch_size: int = 1, n_neg: int = 1):
+    """Sample negatives by popularity over the entire catalog of items
+    There is a chance of accidentally sampling a positive
+    (See `sample_popularity_verified` to prevent this caveat)
+
+    Args:
+        alias_table: alias table of item popularity
+        batch_size: number of samples to get
+        n_neg: number of negatives to sample per positive
+
+    Returns:
+        Array with shape [batch_size, n_neg] of random items as negatives
+
+    """
+    return alias_table.sample([batch_size, n_neg]).astype(np.uint32)
+
+
+def sample_popularity_verified(
+        alias_table: AliasTable,
+        xn_csr: sp.csr_matrix,
+        user_inds_batch: Sequence[int],
+        n_neg: int = 1,
+        max_trials: int = 16,
+        rows_nz: Optional[Tuple[np.array, np.array]] = None,
+):
+    """Sample negatives by popularity over the entire catalog of items
+    Ensures that the neg samples are not known positives via rejection
+
+    Args:
+        alias_table: alias table of item popularity
+        xn_csr: sparse interaction matrix
+        user_inds_batch: The users of the batch
+            (used to lookup positives for verification)
+        n_neg: number of negatives to sample per positive
+        max_trials: number of redraws of rejected negatives. Negatives that
+            are still rejected after this are drawn uniformly from the
+            user's non-positives instead (ex. heavy users of popular items)
+        rows_nz: Optional output of `get_rows_nz_pos` for `user_inds_batch`
+            (if already computed)
+
+    Returns:
+        Array with shape [batch_size, n_neg] of random items as negatives
+
+    """
+    user_inds_batch = np.asarray(user_inds_batch)
+    if rows_nz is None:
+        rows_nz = get_rows_nz_pos(xn_csr, user_inds_batch)
+    neg_item_inds_batch = alias_table.sample([len(user_inds_batch), n_neg])
+    rejected = find_in_rows(
+        xn_csr, user_inds_batch, neg_item_inds_batch, rows_nz) >= 0
+
+    for _ in range(max_trials):
+        if not rejected.any():
+            break
+        redraws = alias_table.sample(rejected.sum())
+        neg_item_inds_batch[rejected] = redraws
+        rejected[rejected] = find_in_rows(
+            xn_csr, user_inds_batch[np.nonzero(rejected)[0]], redraws) >= 0
+
+    if rejected.any():
+        rejected_rows = np.nonzero(rejected.any(axis=1))[0]
+        pos, lens = get_rows_nz_pos(xn_csr, user_inds_batch[rejected_rows])
+        fallback = neg_samp_bsearch_batch(
+            xn_csr.indices[pos], lens, xn_csr.shape[1], n_neg)
+        neg_item_inds_batch[rejected_rows] = np.where(
+            rejected[rejected_rows], fallback,
+            neg_item_inds_batch[rejected_rows])
+
+    return neg_item_inds_batch.astype(np.uint32)
@@ -0,0 +1,201 @@
+"""
+Implements batch schedulers -- the ordering of the positives of an epoch
+that `PairSampler` batches
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Optional
+
+
+class BatchScheduler(object):
+    """Base class of batch schedulers
+
+    A scheduler orders the indices of an epoch. These are either indices of
+    positive interactions (rows of `PairSampler.pos_xn_coo`) or, if
+    `by_user` is `True`, indices of users (a random positive is then picked
+    for each user).
+
+    The ordering must only depend on the random state passed to `epoch_inds`
+    and on the previous epochs (both are shared by background workers which
+    shard the batches of each epoch)
+
+    Args:
+        shuffle: If `True`, shuffle the order of each epoch
+    """
+    by_user = False
+
+    def __init__(self, shuffle: bool = True):
+        self.shuffle = shuffle
+        self.epoch_len = 0
+
+    def setup(self,
+              pos_xn_coo: sp.coo_matrix,
+              interactions_df: pd.DataFrame,
+              ):
+        """Called once by the sampler with its data before iterating
+
+        Args:
+            pos_xn_coo: positive interactions (in the order of
+                `interactions_df`)
+            interactions_df: interactions (with all of their columns)
+        """
+        raise NotImplementedError
+
+    def epoch_inds(self, rand: np.random.RandomState) -> np.array:
+        """Ordered indices of an epoch
+
+        Args:
+            rand: random state to shuffle/select with
+
+        Returns:
+            Array of indices
+        """
+        raise NotImplementedError
+
+    def hard_fraction(self, step: int) -> Optional[float]:
+        """Fraction of a batch to sample adaptive ("hard") negatives for
+        (`None` to leave it to the sampling method)
+
+        Args:
+            step: index of the batch since the start of sampling
+        """
+        return None
+
+
+class InteractionScheduler(BatchScheduler):
+    """Every positive interaction once per epoch (the default)"""
+
+    def __init__(self, shuffle: bool = True):
+        super().__init__(shuffle)
+        self.inds = np.array([], dtype=np.int64)
+
+    def setup(self, pos_xn_coo, interactions_df):
+        self.epoch_len = len(pos_xn_coo.data)
+        self.inds = np.arange(self.epoch_len)
+
+    def epoch_inds(self, rand):
+        # (shuffled in place, so the orders of a seed are kept across
+        #   versions)
+        if self.shuffle:
+            rand.shuffle(self.inds)
+        return self.inds
+
+
+class UserScheduler(BatchScheduler):
+    """Every user once per epoch (optimize all users equally rather than
+    weighing more active users). Users without positive interactions
+    are skipped (there is no positive to pick for them)"""
+    by_user = True
+
+    def __init__(self, shuffle: bool = True):
+        super().__init__(shuffle)
+        self.users = np.array([], dtype=np.int64)
+
+    def setup(self, pos_xn_coo, interactions_df):
+        self.users = np.flatnonzero(np.bincount(
+            pos_xn_coo.row, minlength=pos_xn_coo.shape[0]))
+        if not len(self.users):
+            raise ValueError('No users with positive interactions')
+        self.epoch_len = len(self.users)
+
+    def epoch_inds(self, rand):
+        if self.shuffle:
+            rand.shuffle(self.users)
+        return self.users
+
+
+class CappedUserScheduler(BatchScheduler):
+    """At most `k` random positive interactions per user per epoch
+    (keeps power users from dominating epochs)
+
+    Args:
+        k: max number of interactions per user per epoch
+        shuffle: If `True`, shuffle the order of each epoch
+    """
+
+    def __init__(self, k: int, shuffle: bool = True):
+        super().__init__(shuffle=shuffle)
+        self.k = k
+        self.users = None
+        self.counts = None
+
+    def setup(self, pos_xn_coo, interactions_df):
+        self.users = pos_xn_coo.row
+        self.counts = np.bincount(self.users, minlength=pos_xn_coo.shape[0])
+        self.epoch_len = int(np.minimum(self.counts, self.k).sum())
+
+    def epoch_inds(self, rand):
+        perm = rand.permutation(len(self.users))
+        users = self.users[perm]
+        # Rank of each interaction within its user (in permuted order)
+        by_user = np.argsort(users, kind='stable')
+        starts = np.cumsum(self.counts) - self.counts
+        ranks = np.empty(len(perm), dtype=np.int64)
+        ranks[by_user] = np.arange(len(perm)) - np.repeat(starts, self.counts)
+        inds = perm[ranks < self.k]
+        if not self.shuffle:
+            inds.sort()
+        return inds
+
+
+class TimeOrderedScheduler(BatchScheduler):
+    """Streams positive interactions in time order (no shuffling)
+    Note: with background workers, batches are only roughly in order
+
+    Args:
+        time_col: column of the interactions to order by
+    """
+
+    def __init__(self, time_col: str):
+        super().__init__(shuffle=False)
+        self.time_col = time_col
+        self.order = None
+
+    def setup(self, pos_xn_coo, interactions_df):
+        self.order = np.argsort(interactions_df[self.time_col].values,
+                                kind='stable')
+        self.epoch_len = len(self.order)
+
+    def epoch_inds(self, rand):
+        return self.order
+
+
+class CurriculumScheduler(BatchScheduler):
+    """Hard negative curriculum: mixes uniform ("easy") and adaptive ("hard")
+    negatives, ramping the hard fraction of each batch linearly from
+    `start_fraction` to `end_fraction` over `n_ramp_steps` batches
+
+    Only for the `adaptive` and `adaptive_ordinal` sampling methods
+
+    Args:
+        base: scheduler ordering the epochs
+        start_fraction: fraction of hard negatives at the first batch
+        end_fraction: fraction of hard negatives at the end of the ramp
+        n_ramp_steps: number of batches to ramp over
+    """
+
+    def __init__(self,
+                 base: Optional[BatchScheduler] = None,
+                 start_fraction: float = 0.,
+                 end_fraction: float = 1.,
+                 n_ramp_steps: int = 10000,
+                 ):
+        self.base = base or InteractionScheduler()
+        super().__init__(shuffle=self.base.shuffle)
+        self.by_user = self.base.by_user
+        self.start_fraction = start_fraction
+        self.end_fraction = end_fraction
+        self.n_ramp_steps = n_ramp_steps
+
+    def setup(self, pos_xn_coo, interactions_df):
+        self.base.setup(pos_xn_coo, interactions_df)
+        self.epoch_len = self.base.epoch_len
+
+    def epoch_inds(self, rand):
+        return self.base.epoch_inds(rand)
+
+    def hard_fraction(self, step):
+        progress = min(step / max(self.n_ramp_steps, 1), 1.)
+        return self.start_fraction + \
+            progress * (self.end_fraction - self.start_fraction)
@@ -0,0 +1,116 @@
+"""
+Implements candidate scoring for adaptive sampling without a session
+round-trip per batch
+"""
+import numpy as np
+import tensorflow as tf
+from typing import Dict, Sequence, Optional
+
+from tophat.constants import FGroup
+from tophat.nets.bilinear import BilinearNet, BilinearNetWithNumFC
+
+
+class SnapshotScorer(object):
+    """Scores user-item pairs of a `BilinearNet` with a periodically refreshed
+    NumPy snapshot of its embeddings
+
+    With `inter` interactions between users and items only, the score is
+    bilinear: the summed (weighted) embeddings of a user's features dotted
+    with the summed embeddings of an item's features, plus all biases. So a
+    refresh pre-aggregates one embedding and one bias per user and item, and
+    scoring candidates is a single (row-wise) matmul.
+
+    Args:
+        net: Network to snapshot
+        feats_codes_arrs: Encoded categorical features array by group
+            [n_entities x n_categorical_features]
+        code_df_cols: Names of the columns of `feats_codes_arrs` by group
+        refresh_every: Number of batches to reuse a snapshot for
+
+    """
+
+    def __init__(self,
+                 net: BilinearNet,
+                 feats_codes_arrs: Dict[FGroup, np.array],
+                 code_df_cols: Dict[FGroup, Sequence[str]],
+                 refresh_every: int = 100,
+                 ):
+        if isinstance(net, BilinearNetWithNumFC) or net.num_meta or \
+                net.interaction_type != 'inter' or \
+                net.cat_cols.get(FGroup.CONTEXT):
+            raise ValueError(
+                'Snapshot scoring requires a `BilinearNet` with `inter` '
+                'interactions and no numerical or context features')
+
+        self.refresh_every = refresh_every
+        self.n_batches = 0
+
+        emb_map = net.embedding_map
+        self.codes_arrs = {}
+        self.weights = {}
+        self.fetches = {}
+        for fg in [FGroup.USER, FGroup.ITEM]:
+            cols = list(code_df_cols[fg])
+            self.codes_arrs[fg] = feats_codes_arrs[fg]
+            self.weights[fg] = [
+                emb_map.feature_weights_d[col]
+                if col in emb_map.feature_weights_d else 1.
+                for col in cols]
+            self.fetches[fg] = (
+                [emb_map.table(col) for col in cols],
+                [tf.convert_to_tensor(emb_map.biases_d[col])
+                 for col in cols],
+            )
+
+        self.embs: Dict[FGroup, np.array] = {}
+        self.biases: Dict[FGroup, np.array] = {}
+
+    def refresh(self, sess: tf.Session):
+        """Takes a new snapshot of the embeddings
+
+        Args:
+            sess: Session holding the current variable values
+        """
+        tables = sess.run(self.fetches)
+        for fg, (emb_tables, bias_tables) in tables.items():
+            codes = self.codes_arrs[fg]
+            embs = 0.
+            biases = 0.
+            for j, (emb, bias, w) in enumerate(zip(
+                    emb_tables, bias_tables, self.weights[fg])):
+                embs = embs + w * emb[codes[:, j]]
+                biases = biases + w * bias[codes[:, j], 0]
+            self.embs[fg] = np.asarray(embs, dtype=np.float32)
+            self.biases[fg] = np.asarray(biases, dtype=np.float32)
+
+    def step(self, sess: Optional[tf.Session]):
+        """Book-keeping per batch -- refreshes the snapshot when it is due
+
+        Args:
+            sess: Session holding the current variable values
+        """
+        if self.n_batches % self.refresh_every == 0:
+            self.refresh(sess)
+        self.n_batches += 1
+
+    def score(self,
+              user_inds: Sequence[int],
+              item_inds: Sequence[int],
+              ) -> np.array:
+        """Scores user-item pairs (same signature as
+        :meth:`tophat.sampling.pair_sampler.PairSampler.score_via_inds_fn`)
+
+        Args:
+            user_inds: User index of each pair
+            item_inds: Item index of each pair
+
+        Returns:
+            Array of scores
+        """
+        user_inds = np.asarray(user_inds)
+        item_inds = np.asarray(item_inds)
+        return (np.einsum('ij,ij->i',
+                          self.embs[FGroup.USER][user_inds],
+                          self.embs[FGroup.ITEM][item_inds]) +
+                self.biases[FGroup.USER][user_inds] +
+                self.biases[FGroup.ITEM][item_inds])
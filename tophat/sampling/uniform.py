@@ -1,8 +1,8 @@
 import numpy as np
 import scipy.sparse as sp
-from tophat.utils.sparse_utils import get_row_nz
-from tophat.sampling.utils import neg_samp_bsearch
-from typing import Sequence
+from tophat.utils.sparse_utils import get_rows_nz_pos
+from tophat.sampling.utils import neg_samp_bsearch_batch, rows_nz_at_or_above
+from typing import Sequence, Optional, Tuple
 
 
 def sample_uniform(n_items: int, batch_size: int = 1, n_neg: int = 1):
@@ -27,10 +27,12 @@ def sample_uniform_verified(
         xn_csr: sp.csr_matrix,
         user_inds_batch: Sequence[int],
         n_neg: int = 1,
+        rows_nz: Optional[Tuple[np.array, np.array]] = None,
 ):
     """Sample negatives uniformly over entire catalog of items
     Ensures that the neg samples are not known positives
-    Note: This can be much slower than `sample_uniform` 
+    Note: This can be slower than `sample_uniform`, but the whole batch is
+    verified at once via a ragged binary search over the CSR arrays
 
     Args:
         n_items: number of items in catalog to sample from
@@ -39,20 +41,20 @@ def sample_uniform_verified(
             (used to lookup positives for verification)
             `batch_size` is assumed to be the number of users provided here
         n_neg: number of negatives to sample per positive
+        rows_nz: Optional output of `get_rows_nz_pos` for `user_inds_batch`
+            (if already computed)
 
     Returns:
         Array with shape [batch_size] of random items as negatives
 
     """
 
-    batch_size = len(user_inds_batch)
-    neg_item_inds_batch = np.empty([batch_size, n_neg], dtype=np.uint32)
-    for i, user_ind in enumerate(user_inds_batch):
-        user_pos_item_inds = get_row_nz(xn_csr, user_ind)
-        neg_inds = neg_samp_bsearch(user_pos_item_inds, n_items, n_neg)
-        neg_item_inds_batch[i] = neg_inds
+    pos, lens = rows_nz if rows_nz is not None \
+        else get_rows_nz_pos(xn_csr, user_inds_batch)
+    neg_item_inds_batch = neg_samp_bsearch_batch(
+        xn_csr.indices[pos], lens, n_items, n_neg)
 
-    return neg_item_inds_batch
+    return neg_item_inds_batch.astype(np.uint32)
 
 
 def sample_uniform_ordinal(
@@ -61,6 +63,7 @@ def sample_uniform_ordinal(
         user_inds_batch: Sequence[int],
         pos_item_inds_batch: Sequence[int],
         n_neg: int = 1,
+        rows_nz: Optional[Tuple[np.array, np.array]] = None,
 ):
     """With ordinal tier verification
 
@@ -74,14 +77,16 @@ def sample_uniform_ordinal(
             user_inds_batch: The users of the batch
             pos_item_inds_batch: The positive items of the batch
             n_neg: number of negatives to sample per positive
+            rows_nz: Optional output of `get_rows_nz_pos` for
+                `user_inds_batch` (if already computed)
+
+        Returns:
+            Array with shape [batch_size, n_neg] of random items as negatives
     """
 
-    batch_size = len(user_inds_batch)
-    neg_item_inds_batch = np.empty([batch_size, n_neg], dtype=np.uint32)
-    for i, (user_ind, pos_item_ind) in enumerate(zip(user_inds_batch, pos_item_inds_batch)):
-        pos_item_val = float(xn_csr[user_ind, pos_item_ind])
-        user_pos_item_inds = get_row_nz(xn_csr[user_ind] >= pos_item_val, 0)
-        neg_inds = neg_samp_bsearch(user_pos_item_inds, n_items, n_neg)
-        neg_item_inds_batch[i] = neg_inds
+    pos_inds, lens = rows_nz_at_or_above(
+        xn_csr, user_inds_batch, pos_item_inds_batch, rows_nz)
+    neg_item_inds_batch = neg_samp_bsearch_batch(
+        pos_inds, lens, n_items, n_neg)
 
-    return neg_item_inds_batch
+    return neg_item_inds_batch.astype(np.uint32)
@@ -1,4 +1,7 @@
 import numpy as np
+import scipy.sparse as sp
+from typing import Sequence, Optional, Tuple
+from tophat.utils.sparse_utils import get_rows_nz_pos, find_in_rows
 
 
 def neg_samp_bsearch(pos_inds: np.array, n_items: int, n_samp: int = 32):
@@ -14,3 +17,74 @@ def neg_samp_bsearch(pos_inds: np.array, n_items: int, n_samp: int = 32):
     neg_inds = raw_samp + np.searchsorted(pos_inds_adj, raw_samp, side='right')
     return neg_inds
 
+
+def neg_samp_bsearch_batch(pos_inds: np.array, lens: np.array,
+                           n_items: int, n_samp: int = 32):
+    """Batched `neg_samp_bsearch` over ragged rows of positives
+
+    Every row is offset into its own range of `n_items` so that a single
+    `searchsorted` over the concatenated positives serves the whole batch
+
+    Args:
+        pos_inds: Concatenated positives of all rows
+            (each row segment is assumed to be ordered)
+        lens: Number of positives in each row segment
+        n_items: number of items in catalog to sample from
+        n_samp: number of negatives to sample per row
+
+    Returns:
+        Array with shape [n_rows, n_samp] of verified negatives
+
+    """
+    n_rows = len(lens)
+    lens = np.asarray(lens, dtype=np.int64)
+    seg_ids = np.repeat(np.arange(n_rows, dtype=np.int64), lens)
+    seg_starts = np.cumsum(lens) - lens
+    offsets = np.arange(n_rows, dtype=np.int64) * n_items
+
+    pos_inds_adj = (np.asarray(pos_inds, dtype=np.int64)
+                    - (np.arange(len(seg_ids)) - seg_starts[seg_ids])
+                    + offsets[seg_ids])
+    raw_samp = np.random.randint(0, n_items - lens[:, None],
+                                 size=[n_rows, n_samp])
+    neg_inds = raw_samp - seg_starts[:, None] + np.searchsorted(
+        pos_inds_adj, raw_samp + offsets[:, None], side='right')
+    return neg_inds
+
+
+def rows_nz_at_or_above(xn_csr: sp.csr_matrix,
+                        user_inds: Sequence[int],
+                        pos_item_inds: Sequence[int],
+                        rows_nz: Optional[Tuple[np.array, np.array]] = None,
+                        ):
+    """Gathers the items of each user's row that are of the same or higher
+    tier than that row's positive item
+    (ie. the items that may never be paired with it as a negative)
+
+    Tier values are read straight from `xn_csr.data` -- a positive that is not
+    stored in `xn_csr` is treated as the lowest tier (0)
+
+    Args:
+        xn_csr: sparse matrix of interaction tiers
+        user_inds: The users of the batch
+        pos_item_inds: The positive items of the batch
+        rows_nz: Optional output of `get_rows_nz_pos` for `user_inds`
+            (if already computed)
+
+    Returns:
+        Tuple of the concatenated (ordered) item indices of every row,
+        and the length of each row segment
+    """
+    n_rows = len(user_inds)
+    if rows_nz is None:
+        rows_nz = get_rows_nz_pos(xn_csr, user_inds)
+    pos, lens = rows_nz
+    seg_ids = np.repeat(np.arange(n_rows, dtype=np.int64), lens)
+
+    pos_item_pos = find_in_rows(xn_csr, user_inds, pos_item_inds, rows_nz)
+    pos_item_vals = np.where(pos_item_pos >= 0,
+                             xn_csr.data[pos_item_pos], 0)
+
+    keep = xn_csr.data[pos] >= pos_item_vals[seg_ids]
+    return xn_csr.indices[pos][keep], np.bincount(seg_ids[keep],
+                                                  minlength=n_rows)
@@ -14,7 +14,10 @@ class FactorizationTask(BaseTask):
         optimizer: Training optimizer object
         seed: Seed for random state
         item_col: name of item column -- used to get the number of items
-            which is used for k-OS loss
+            which is used for k-OS loss (if `n_items` is not given)
+        n_items: number of items in the catalog (for k-OS loss). Pass it
+            when the item ids have a vocab policy -- the categories of the
+            embedding map are then embedding rows, not items
         name: name of the model (to be used for the scope)
     """
 
@@ -27,6 +30,7 @@ class FactorizationTask(BaseTask):
                  input_pair_d: Optional[Dict[str, tf.Tensor]] = None,
                  seed=SEED,
                  item_col: Optional[str] = None,
+                 n_items: Optional[int] = None,
                  name: Optional[str] = None,
                  ):
 
@@ -45,7 +49,9 @@ class FactorizationTask(BaseTask):
                 self.batch_size)
 
         # for k-OS loss
-        if item_col:
+        if n_items is not None:
+            self.n_items = n_items
+        elif item_col:
             self.n_items = len(self.net.embedding_map.cats_d[item_col])
 
     def get_fwd_dict(self, batch_size: int = None):
@@ -1,3 +1,4 @@
+import numpy as np
 import tensorflow as tf
 from tophat.constants import *
 from tophat.data import (InteractionsSource, InteractionsDerived,
@@ -8,7 +9,11 @@ from tophat.embedding import EmbeddingMap
 from tophat.nets.bilinear import BilinearNet
 from tophat.tasks.factorization import FactorizationTask
 from tophat.losses import PairLossFn, NAMED_LOSSES
+from tophat.optimizers import get_optimizer
+from tophat.vocab import VocabPolicy
 from tophat.sampling.pair_sampler import PairSampler
+from tophat.sampling.native import uniform_pair_dataset
+from tophat.sampling.schedulers import BatchScheduler
 from typing import Dict, List, Optional, Union
 
 # TODO: having trouble doing proper inheritance with the shady property
@@ -31,11 +36,20 @@ class FactorizationTaskWrapper(object):
             batch_size: Optional[int] = None,
             sample_uniform_users: bool = False,
             sample_prefetch: Optional[int] = 10,
-            optimizer: Optional[tf.train.Optimizer] =
-            tf.train.AdamOptimizer(learning_rate=0.001),
+            sample_workers: int = 0,
+            sample_backend: str = 'generator',
+            sample_pop_alpha: float = 0.75,
+            sample_scorer: str = 'session',
+            sample_scorer_refresh: int = 100,
+            sample_max_sampled: int = 32,
+            sample_progressive: bool = False,
+            sample_scheduler: Optional[BatchScheduler] = None,
+            optimizer: Union[str, tf.train.Optimizer] = 'adam',
+            learning_rate: float = 0.001,
             build_on_init: Optional[bool] = True,
             existing_cats: Optional[Dict[str, List[Any]]] = None,
             add_new_cats: Optional[bool] = False,
+            vocab_policies: Optional[Dict[str, VocabPolicy]] = None,
             seed: Optional[int] = 322,
             name: Optional[str] = None,
     ):
@@ -59,13 +73,53 @@ class FactorizationTaskWrapper(object):
             sample_uniform_users: If `True` sample by user
             sample_prefetch: number of samples to prefetch in the
                 `tf.data.Dataset.prefetch` transformation
-            optimizer: graph optimizer to use
+            sample_workers: number of background processes producing samples
+                (0 to sample in the training process)
+            sample_backend: One of {'generator', 'tf'}
+
+                - generator: sample in python via `PairSampler.__iter__`
+                - tf: sample with native `tf.data` ops
+                  (only for the `uniform` and `uniform_verified` sample
+                  methods)
+            sample_pop_alpha: exponent on item counts for the `popularity`
+                sample methods
+            sample_scorer: One of {'session', 'snapshot'}
+
+                - session: score adaptive candidates with a forward pass of
+                  the model for every batch
+                - snapshot: score adaptive candidates with a NumPy snapshot
+                  of the embeddings (`BilinearNet` without context only)
+            sample_scorer_refresh: number of batches between snapshots
+            sample_max_sampled: max number of negative candidates to score
+                per positive for adaptive sample methods
+            sample_progressive: If `True`, `adaptive_warp` scores candidates
+                in growing chunks and stops once every positive of the batch
+                has found a violator
+            sample_scheduler: orders the positives of each epoch
+                (see :mod:`tophat.sampling.schedulers`).
+                Overrides `sample_uniform_users`
+            optimizer: graph optimizer to use, or the name of one
+                (see :mod:`tophat.optimizers`)
+
+                - adam: dense moments (every row of every embedding table is
+                  updated each step)
+                - lazy_adam: moments of the looked up rows only
+                - adagrad: accumulators of the looked up rows only
+                - rowwise_adagrad: one accumulator per row of the looked up
+                  rows only
+                - sgd: plain gradient descent
+            learning_rate: learning rate of a named `optimizer`
             build_on_init: flag to build the graph on object init
             existing_cats: existing categories to re-use.
                 The categories from `parent_task_wrapper` take precedence over
                 this argument.
             add_new_cats: flag to append newly seen categories
                 (if existing categories are already provided)
+            vocab_policies: vocab policies keyed by categorical column --
+                how categories map to embedding rows
+                (see :mod:`tophat.vocab`).
+                The policies of `parent_task_wrapper` take precedence over
+                this argument.
             seed: random seed
             name: name of task wrapper
         """
@@ -74,16 +128,25 @@ class FactorizationTaskWrapper(object):
         self.seed = seed
         self.sample_method = sample_method
         self.sample_prefetch = sample_prefetch
+        self.sample_workers = sample_workers
+        self.sample_backend = sample_backend
+        self.sample_pop_alpha = sample_pop_alpha
+        self.sample_scorer = sample_scorer
+        self.sample_scorer_refresh = sample_scorer_refresh
+        self.sample_max_sampled = sample_max_sampled
+        self.sample_progressive = sample_progressive
+        self.sample_scheduler = sample_scheduler
         self.loss_fn = NAMED_LOSSES[loss_fn] if isinstance(loss_fn, str) \
             else loss_fn
         self.sample_uniform_users = sample_uniform_users
         self.batch_size = batch_size
-        self.optimizer = optimizer
+        self.optimizer = get_optimizer(optimizer, learning_rate)
 
         self.parent_task_wrapper = parent_task_wrapper
 
         if parent_task_wrapper:
             existing_cats_d = parent_task_wrapper.data_loader.cats_d
+            vocab_policies = parent_task_wrapper.data_loader.vocabs
         elif existing_cats:
             existing_cats_d = existing_cats
         else:
@@ -97,6 +160,7 @@ class FactorizationTaskWrapper(object):
             batch_size=batch_size,
             existing_cats_d=existing_cats_d,
             add_new_cats=add_new_cats,
+            vocab_policies=vocab_policies,
         )
 
         # Attributes used when building the graph
@@ -107,6 +171,9 @@ class FactorizationTaskWrapper(object):
         self.nonnegs: Optional[XN_SRC] = nonnegs
         self.sampler: PairSampler = None
         self.dataset: tf.data.Dataset = None
+        self.dataset_iter: tf.data.Iterator = None
+        # Arrays fed when initializing the dataset iterator
+        self.dataset_feed_dict: Dict[tf.Tensor, np.array] = {}
         self.input_pair_d_via_iter: Iterator = None
         self.loss: tf.Tensor = None
         self.train_op: tf.Operation = None
@@ -129,7 +196,11 @@ class FactorizationTaskWrapper(object):
         self.embedding_map = (
                 existing_embedding_map or
                 EmbeddingMap(
-                    cats_d=self.data_loader.cats_d,
+                    cats_d=self.data_loader.emb_cats_d,
+                    labelers={
+                        col: labeler
+                        for col, labeler in self.data_loader.labelers.items()
+                        if col not in self.data_loader.vocabs},
                     **self.embedding_map_kwargs,
                 )
         )
@@ -145,7 +216,8 @@ class FactorizationTaskWrapper(object):
             net=self.net,
             batch_size=self.batch_size,
             loss_fn=self.loss_fn,
-            item_col=self.data_loader.item_col,  # only needed for k-OS
+            # only needed for k-OS (the items, not their embedding rows)
+            n_items=len(self.data_loader.cats_d[self.data_loader.item_col]),
             optimizer=self.optimizer,
             name=self.data_loader.name or self.name,
         )
@@ -160,6 +232,13 @@ class FactorizationTaskWrapper(object):
                 model=self.task,
                 seed=self.seed,
                 non_negs_df=non_neg_df,
+                n_workers=self.sample_workers,
+                pop_alpha=self.sample_pop_alpha,
+                scorer=self.sample_scorer,
+                scorer_refresh=self.sample_scorer_refresh,
+                max_sampled=self.sample_max_sampled,
+                progressive=self.sample_progressive,
+                scheduler=self.sample_scheduler,
             )
         # TODO: manually adding misc first violation (maybe find a cleaner way)
         if self.sample_method == 'adaptive_warp':  # or kos loss
@@ -174,14 +253,25 @@ class FactorizationTaskWrapper(object):
                     self.task.input_pair_d[k] = tf.tile(
                         tf.expand_dims(v, 0), [self.sampler.n_neg, 1])
 
-        self.dataset = tf.data.Dataset.from_generator(
-            self.sampler.__iter__,
-            {k: v.dtype for k, v in self.task.input_pair_d.items()},
-            {k: v.shape for k, v in self.task.input_pair_d.items()},) \
-            .prefetch(self.sample_prefetch)
+        if self.sample_backend == 'tf':
+            self.dataset, self.dataset_feed_dict = uniform_pair_dataset(
+                self.sampler)
+        elif self.sample_backend == 'generator':
+            # The sampler yields fixed tuples, keyed back into a dict in-graph
+            feed_keys = self.sampler.feed_keys
+            self.dataset = tf.data.Dataset.from_generator(
+                self.sampler.iter_feed_tuples,
+                tuple(self.task.input_pair_d[k].dtype for k in feed_keys),
+                tuple(self.task.input_pair_d[k].shape for k in feed_keys),
+            ).map(lambda *feed: dict(zip(feed_keys, feed)))
+        else:
+            raise ValueError(f'Unknown sample backend {self.sample_backend}')
+        self.dataset = self.dataset.prefetch(self.sample_prefetch)
 
-        self.input_pair_d_via_iter = self.dataset.make_one_shot_iterator() \
-            .get_next()
+        # (initializable, so that native sampler arrays are fed rather than
+        #   embedded in the graph, see `init_dataset`)
+        self.dataset_iter = self.dataset.make_initializable_iterator()
+        self.input_pair_d_via_iter = self.dataset_iter.get_next()
 
         # Change out our legacy placeholders with this dataset iter
         self.task.input_pair_d = self.input_pair_d_via_iter
@@ -192,15 +282,21 @@ class FactorizationTaskWrapper(object):
 
         self.built = True
 
+    def init_dataset(self, sess: tf.Session):
+        """Initializes (or restarts) the iterator of the sampled batches
+
+        Args:
+            sess: Session to initialize in
+        """
+        sess.run(self.dataset_iter.initializer,
+                 feed_dict=self.dataset_feed_dict)
+
     def __len__(self):
         return len(self.data_loader.interactions_df)
 
     @property
     def steps_per_epoch(self):
-        if self.sampler.uniform_users:
-            return self.data_loader.n_users / self.batch_size
-        else:
-            return len(self) / self.batch_size
+        return self.sampler.scheduler.epoch_len / self.batch_size
 
 
 
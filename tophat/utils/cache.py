@@ -0,0 +1,229 @@
+"""
+On-disk cache of encoded training data -- a directory of `.npy` arrays
+(memory-mapped on load) plus a manifest, keyed by a fingerprint of the
+sources and options that produced them
+"""
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from tophat.utils.log import logger
+
+CACHE_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+OBJECTS_NAME = 'objects.pkl'
+
+# Attributes of sources that hold loaded data (or where to write it) rather
+# than options
+STATE_ATTRS = {'data', 'memo', '_memo_key', 'arrs', 'vocabs', 'load_secs',
+               'labelers', 'codes_dir', 'memo_dir'}
+
+
+def describe(obj: Any) -> Any:
+    """Canonical, hashable-by-repr description of sources and options
+
+    Files are described by their path, size and modification time; frames
+    by a hash of their contents; functions by their qualified name, code,
+    and captured values; other objects by their class and (non-data)
+    attributes
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        return ('frame', hashlib.sha1(pd.util.hash_pandas_object(
+            obj, index=True).values.tobytes()).hexdigest(),
+                tuple(map(str, getattr(obj, 'columns', []))))
+    elif isinstance(obj, (str, Path)) and os.path.exists(obj):
+        paths = sorted(Path(obj).rglob('*')) if os.path.isdir(obj) \
+            else [Path(obj)]
+        return ('path', str(obj), tuple(
+            (str(p), p.stat().st_size, p.stat().st_mtime_ns)
+            for p in paths if p.is_file()))
+    elif isinstance(obj, Enum):
+        return repr(obj)
+    elif isinstance(obj, dict):
+        return ('dict', tuple(sorted(
+            ((repr(k), describe(v)) for k, v in obj.items()),
+            key=lambda kv: kv[0])))
+    elif isinstance(obj, (list, tuple)):
+        return tuple(describe(v) for v in obj)
+    elif isinstance(obj, (set, frozenset)):
+        return ('set', tuple(sorted(map(repr, obj))))
+    elif isinstance(obj, functools.partial):
+        return ('partial', describe(obj.func), describe(obj.args),
+                describe(obj.keywords))
+    elif callable(obj) and hasattr(obj, '__qualname__'):
+        code = getattr(obj, '__code__', None)
+        if code is None:
+            return ('fn', getattr(obj, '__module__', None), obj.__qualname__)
+        # (lambdas share a name, so their code and closure tell them apart)
+        closure = getattr(obj, '__closure__', None) or ()
+        return ('fn', getattr(obj, '__module__', None), obj.__qualname__,
+                describe_code(code),
+                describe([cell.cell_contents for cell in closure
+                          if cell.cell_contents is not obj]),
+                describe(getattr(obj, '__defaults__', None)))
+    elif hasattr(obj, '__dict__'):
+        return (obj.__class__.__name__, describe(
+            {k: v for k, v in vars(obj).items() if k not in STATE_ATTRS}))
+    else:
+        return repr(obj)
+
+
+def describe_code(code) -> Tuple:
+    """Description of a code object (without memory addresses)"""
+    return (hashlib.sha1(code.co_code).hexdigest(), code.co_names,
+            tuple(describe_code(c) if hasattr(c, 'co_code') else repr(c)
+                  for c in code.co_consts))
+
+
+def fingerprint(*objs: Any) -> str:
+    """Hex digest identifying sources and options
+
+    Args:
+        *objs: Sources and options (see `describe`)
+
+    Returns:
+        Fingerprint string
+    """
+    return hashlib.sha1(
+        repr((CACHE_VERSION, describe(objs))).encode()).hexdigest()
+
+
+def frame_to_arrays(df: pd.DataFrame, prefix: str,
+                    ) -> Tuple[Dict[str, np.array], Dict[str, Any]]:
+    """Splits a dataframe into arrays and the metadata to rebuild it
+    Categorical columns are stored as codes (their categories are metadata)
+
+    Args:
+        df: Dataframe to split
+        prefix: Prefix of the array names
+
+    Returns:
+        Tuple of arrays keyed by name, and metadata
+    """
+    arrays = {}
+    meta = {'columns': list(df.columns), 'categories': {}, 'objects': {}}
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            arrays[f'{prefix}.{i}'] = s.cat.codes.values
+            meta['categories'][i] = s.cat.categories
+        elif s.dtype == object or \
+                isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+            meta['objects'][i] = s.values
+        else:
+            arrays[f'{prefix}.{i}'] = s.values
+    if df.index.dtype == object or isinstance(df.index, pd.MultiIndex):
+        meta['index'] = df.index
+    else:
+        arrays[f'{prefix}.index'] = df.index.values
+        meta['index_name'] = df.index.name
+    return arrays, meta
+
+
+def categorical_from_codes(codes: np.array, categories: pd.Index,
+                           ) -> pd.Categorical:
+    """Categorical over `codes` without copying (or reading) them"""
+    dtype = pd.CategoricalDtype(categories)
+    try:
+        return pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+    except TypeError:  # pandas < 2.1
+        return pd.Categorical(codes, dtype=dtype, fastpath=True)
+
+
+def frame_from_arrays(arrays: Dict[str, np.array], meta: Dict[str, Any],
+                      prefix: str) -> pd.DataFrame:
+    """Rebuilds a dataframe split by `frame_to_arrays`
+    The columns are views of the (memory-mapped) arrays, not copies"""
+    if 'index' in meta:
+        index = meta['index']
+    else:
+        index = pd.Index(arrays[f'{prefix}.index'], name=meta['index_name'])
+    data = {}
+    for i, col in enumerate(meta['columns']):
+        if i in meta['categories']:
+            data[col] = categorical_from_codes(
+                arrays[f'{prefix}.{i}'], meta['categories'][i])
+        elif i in meta['objects']:
+            data[col] = meta['objects'][i]
+        else:
+            data[col] = arrays[f'{prefix}.{i}']
+    # (without `copy=False`, the columns would be copied into blocks)
+    return pd.DataFrame(data, index=index, columns=meta['columns'],
+                        copy=False)
+
+
+def save_cache(cache_dir: Union[str, Path], key: str,
+               arrays: Dict[str, np.array],
+               objects: Dict[str, Any],
+               ):
+    """Writes arrays and (pickled) objects under `cache_dir/key`
+    The entry is written to a temporary directory and moved into place, so
+    concurrent or interrupted writes never leave a partial entry
+
+    Args:
+        cache_dir: Root directory of the cache
+        key: Fingerprint of the entry
+        arrays: Arrays keyed by name
+        objects: Picklable objects keyed by name
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=cache_dir, prefix=f'.{key}.'))
+    try:
+        files = {}
+        for i, (name, arr) in enumerate(arrays.items()):
+            files[name] = f'{i}.npy'
+            np.save(tmp_dir / files[name], np.asarray(arr),
+                    allow_pickle=False)
+        with open(tmp_dir / OBJECTS_NAME, 'wb') as f:
+            pickle.dump(objects, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(tmp_dir / MANIFEST_NAME, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'key': key,
+                       'arrays': files}, f, indent=2)
+        try:
+            os.rename(tmp_dir, cache_dir / key)
+        except OSError:  # someone else wrote the entry first
+            shutil.rmtree(tmp_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    logger.info(f'Cached {len(arrays)} arrays to {cache_dir / key}')
+
+
+def load_cache(cache_dir: Union[str, Path], key: str,
+               ) -> Optional[Tuple[Dict[str, np.array], Dict[str, Any]]]:
+    """Reads an entry written by `save_cache` (arrays are memory-mapped)
+
+    Args:
+        cache_dir: Root directory of the cache
+        key: Fingerprint of the entry
+
+    Returns:
+        Tuple of arrays and objects, or `None` if there is no such entry
+    """
+    entry_dir = Path(cache_dir) / key
+    manifest_path = entry_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != CACHE_VERSION:
+        return None
+    # (copy-on-write, so frames viewing the arrays can still be modified
+    #   in place without touching the entry)
+    arrays = {name: np.load(entry_dir / fname, mmap_mode='c')
+              for name, fname in manifest['arrays'].items()}
+    with open(entry_dir / OBJECTS_NAME, 'rb') as f:
+        objects = pickle.load(f)
+    logger.info(f'Loaded {len(arrays)} cached arrays from {entry_dir}')
+    return arrays, objects
@@ -0,0 +1,230 @@
+"""
+Out-of-core loading of interactions: read in chunks, encode categorical
+columns against growing vocabularies, and spill compact code arrays to disk
+(as `.npy` files that are memory-mapped back, rather than concatenated in
+memory)
+"""
+import tempfile
+from pathlib import Path
+from typing import Optional, Iterable, Iterator, Dict, Sequence, Union, \
+    Callable, Any
+
+import numpy as np
+import pandas as pd
+
+from tophat.utils.cache import categorical_from_codes
+from tophat.utils.columnar import is_parquet, iter_batches
+from tophat.utils.log import logger
+
+
+class GrowingVocab(object):
+    """Vocabulary of a categorical column that grows as values are encoded
+    Codes are assigned in order of first appearance (after any initial
+    categories), so earlier codes never change
+
+    Args:
+        categories: Optional initial categories
+    """
+
+    def __init__(self, categories: Optional[Iterable[Any]] = None):
+        self.index = pd.Index(
+            list(categories) if categories is not None else [])
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def categories(self) -> pd.Index:
+        return self.index
+
+    def encode(self, values: Union[np.array, pd.Series]) -> np.array:
+        """Encodes values, adding unseen ones to the vocabulary
+
+        Args:
+            values: Values to encode (no nulls). Categoricals are encoded
+                by their (observed) categories only
+
+        Returns:
+            int32 array of codes
+        """
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            values = pd.Categorical(values)
+            # (observed categories, in order of first appearance)
+            observed = pd.unique(values.codes)
+            lookup = np.zeros(len(values.categories), dtype=np.int32)
+            lookup[observed] = self.encode(
+                values.categories.values[observed])
+            return lookup[values.codes]
+        values = np.asarray(values)
+        codes = self.index.get_indexer(values)
+        missing = codes < 0
+        if missing.any():
+            new_cats = pd.unique(values[missing])
+            if len(self.index):
+                self.index = self.index.append(pd.Index(new_cats))
+            else:
+                self.index = pd.Index(new_cats)
+            codes[missing] = self.index.get_indexer(values[missing])
+        return codes.astype(np.int32)
+
+
+def iter_chunks(path: Union[str, Path],
+                chunksize: int,
+                columns: Optional[Sequence[str]] = None,
+                filters: Optional[Dict[str, Iterable[Any]]] = None,
+                categorical_cols: Optional[Sequence[str]] = None,
+                **read_kwargs,
+                ) -> Iterator[pd.DataFrame]:
+    """Reads a CSV or Parquet file in chunks of rows
+
+    Args:
+        path: Path of a CSV file, or a Parquet file (or directory of files)
+        chunksize: Number of rows per chunk
+        columns: Optional subset of columns to read
+        filters: Optional allowed values keyed by column, pushed down into
+            the Parquet reader (ignored for CSV)
+        categorical_cols: String columns to read as categoricals
+            (Parquet, see `tophat.utils.columnar`), or as strings (CSV --
+            dtypes are otherwise guessed per chunk, so the same id could be
+            read as an int in one chunk and a string in another)
+        **read_kwargs: kwargs for `pd.read_csv`
+            (ignored for Parquet)
+
+    Yields:
+        Dataframe chunks
+    """
+    if is_parquet(path):
+        yield from iter_batches(path, chunksize, columns=columns,
+                                filters=filters,
+                                categorical_cols=categorical_cols)
+    else:
+        read_kwargs.setdefault(
+            'dtype', {col: str for col in categorical_cols or []})
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns,
+                               **read_kwargs)
+
+
+def write_npy_header(f, dtype, n_rows: int):
+    """Writes the `.npy` header of a 1-d array at the start of `f`
+
+    The header is padded to the same length whatever `n_rows`, so that it
+    can be written before the rows and rewritten once their number is known
+    """
+    f.seek(0)
+    np.lib.format.write_array_header_1_0(f, {
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': (n_rows,),
+    })
+
+
+def codes_dtype(categories: pd.Index) -> np.dtype:
+    """Dtype of the codes of a categorical over `categories`
+    (the smallest int that fits them, as chosen by pandas)"""
+    return pd.Categorical([], dtype=pd.CategoricalDtype(categories)
+                          ).codes.dtype
+
+
+def narrow_codes(path: Path, dtype, block_size: int = 2 ** 20):
+    """Rewrites the int32 codes at `path` as `dtype`, block by block"""
+    src = np.load(path, mmap_mode='r')
+    tmp_path = path.with_suffix('.tmp.npy')
+    dst = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype,
+                                    shape=src.shape)
+    for start in range(0, len(src), block_size):
+        dst[start:start + block_size] = src[start:start + block_size]
+    dst.flush()
+    del src, dst
+    tmp_path.replace(path)
+
+
+def encode_chunks(chunks: Iterable[pd.DataFrame],
+                  cat_cols: Sequence[str],
+                  num_cols: Sequence[str] = (),
+                  codes_dir: Optional[Union[str, Path]] = None,
+                  vocabs: Optional[Dict[str, GrowingVocab]] = None,
+                  chunk_fn: Optional[
+                      Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                  ) -> Dict[str, np.array]:
+    """Encodes chunks of rows and writes the columns to disk
+
+    Only the current chunk and the vocabularies are held in memory.
+    Categorical columns are written as int32 codes (`{col}.codes.npy`),
+    narrowed on disk at the end to the dtype pandas uses for codes over the
+    final vocabulary (so that categoricals can view them without a copy),
+    and numerical columns as float32 (`{col}.num.npy`)
+
+    Args:
+        chunks: Dataframe chunks
+        cat_cols: Columns to encode against a vocabulary
+        num_cols: Columns to keep as numbers
+        codes_dir: Directory to write the arrays to
+            (a temporary directory if `None`)
+        vocabs: Vocabularies of (some of) `cat_cols` to grow (mutated
+            in-place). Missing vocabularies are added.
+        chunk_fn: Optional function applied to each chunk before encoding
+            (ex. filtering)
+
+    Returns:
+        Memory-mapped (read-only) arrays keyed by column
+    """
+    codes_dir = Path(codes_dir or tempfile.mkdtemp(prefix='tophat_codes_'))
+    codes_dir.mkdir(parents=True, exist_ok=True)
+    if vocabs is None:
+        vocabs = {}
+    for col in cat_cols:
+        vocabs.setdefault(col, GrowingVocab())
+
+    paths = {col: codes_dir / f'{col}.codes.npy' for col in cat_cols}
+    paths.update({col: codes_dir / f'{col}.num.npy' for col in num_cols})
+    dtypes = {col: np.int32 for col in cat_cols}
+    dtypes.update({col: np.float32 for col in num_cols})
+
+    files = {col: open(path, 'wb') for col, path in paths.items()}
+    n_rows = 0
+    try:
+        for col, f in files.items():
+            write_npy_header(f, dtypes[col], n_rows)
+        for chunk in chunks:
+            if chunk_fn is not None:
+                chunk = chunk_fn(chunk)
+            chunk = chunk.dropna(subset=list(cat_cols))
+            for col in cat_cols:
+                vocabs[col].encode(chunk[col].values).tofile(files[col])
+            for col in num_cols:
+                chunk[col].values.astype(np.float32).tofile(files[col])
+            n_rows += len(chunk)
+        for col, f in files.items():
+            write_npy_header(f, dtypes[col], n_rows)
+    finally:
+        for f in files.values():
+            f.close()
+    for col in cat_cols:
+        dtype = codes_dtype(vocabs[col].categories)
+        if dtype != np.int32:
+            narrow_codes(paths[col], dtype)
+
+    logger.info(f'Encoded {n_rows} rows to {codes_dir} ' +
+                ' '.join(f'{col}:{len(vocabs[col])}' for col in cat_cols))
+
+    return {col: np.load(path, mmap_mode='r') for col, path in paths.items()}
+
+
+def codes_frame(arrs: Dict[str, np.array],
+                vocabs: Dict[str, GrowingVocab],
+                ) -> pd.DataFrame:
+    """Dataframe of categorical (from codes) and numerical columns
+    The columns are views of the (memory-mapped) arrays, not copies
+
+    Args:
+        arrs: Arrays keyed by column (as output by `encode_chunks`)
+        vocabs: Vocabularies of the categorical columns
+
+    Returns:
+        Dataframe with a categorical column per vocabulary
+    """
+    return pd.DataFrame({
+        col: categorical_from_codes(arr, vocabs[col].categories)
+        if col in vocabs else arr
+        for col, arr in arrs.items()
+    }, copy=False)
@@ -0,0 +1,134 @@
+"""
+Columnar (Parquet) reading via Arrow -- column selection and row filters
+are pushed down into the reader, so only the needed columns (and row groups
+whose statistics can match) are read, and dictionary-encoded columns become
+categoricals without decoding to Python objects
+"""
+from pathlib import Path
+from typing import Optional, Iterable, Iterator, Dict, Sequence, Union, \
+    List, Any
+
+import pandas as pd
+
+PARQUET_SUFFIXES = {'.parquet', '.pq'}
+
+
+def is_parquet(path: Union[str, Path]) -> bool:
+    path = Path(path)
+    return path.suffix in PARQUET_SUFFIXES or (
+        path.is_dir() and any(
+            p.suffix in PARQUET_SUFFIXES for p in path.iterdir()))
+
+
+def parquet_files(path: Union[str, Path]) -> List[Path]:
+    """Parquet file, or the Parquet files of a directory (sorted)"""
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir()
+                      if p.suffix in PARQUET_SUFFIXES)
+    return [path]
+
+
+def dataset(path: Union[str, Path],
+            categorical_cols: Optional[Sequence[str]] = None):
+    """Arrow dataset of a Parquet file (or directory of files)
+
+    Args:
+        path: Path of a Parquet file, or a directory of Parquet files
+        categorical_cols: String columns to read as dictionaries
+            (as categoricals once converted to pandas)
+
+    Returns:
+        `pyarrow.dataset.Dataset`
+    """
+    import pyarrow.dataset as ds  # optional dependency
+    fmt = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(
+        dictionary_columns=list(categorical_cols or [])))
+    return ds.dataset([str(p) for p in parquet_files(path)], format=fmt)
+
+
+def column_names(path: Union[str, Path]) -> List[str]:
+    """Column names of a Parquet file (only reads the footer)"""
+    return dataset(path).schema.names
+
+
+def filter_expression(filters: Optional[Dict[str, Iterable[Any]]]):
+    """Arrow expression keeping rows whose columns are in the given sets
+
+    Args:
+        filters: Allowed values keyed by column
+
+    Returns:
+        `pyarrow.dataset.Expression` (`None` if there is nothing to filter)
+    """
+    import pyarrow.dataset as ds  # optional dependency
+    expr = None
+    for col, values in (filters or {}).items():
+        col_expr = ds.field(col).isin(list(values))
+        expr = col_expr if expr is None else expr & col_expr
+    return expr
+
+
+def to_pandas(table) -> pd.DataFrame:
+    """Converts a (filtered) Arrow table or record batch
+    Categoricals keep only their observed categories
+    """
+    df = table.to_pandas(split_blocks=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def read_parquet(path: Union[str, Path],
+                 columns: Optional[Sequence[str]] = None,
+                 filters: Optional[Dict[str, Iterable[Any]]] = None,
+                 categorical_cols: Optional[Sequence[str]] = None,
+                 use_threads: bool = True,
+                 ) -> pd.DataFrame:
+    """Reads a Parquet file (or directory of files)
+
+    Args:
+        path: Path of a Parquet file, or a directory of Parquet files
+        columns: Optional subset of columns to read
+        filters: Optional allowed values keyed by column -- row groups that
+            can't match are skipped
+        categorical_cols: String columns to read as categoricals
+        use_threads: If `True`, read files, row groups and columns in
+            parallel
+
+    Returns:
+        Dataframe
+    """
+    table = dataset(path, categorical_cols).to_table(
+        columns=None if columns is None else list(columns),
+        filter=filter_expression(filters),
+        use_threads=use_threads)
+    return to_pandas(table)
+
+
+def iter_batches(path: Union[str, Path],
+                 batch_size: int,
+                 columns: Optional[Sequence[str]] = None,
+                 filters: Optional[Dict[str, Iterable[Any]]] = None,
+                 categorical_cols: Optional[Sequence[str]] = None,
+                 ) -> Iterator[pd.DataFrame]:
+    """Reads a Parquet file (or directory of files) in batches of rows
+    (in order; batches may be smaller than `batch_size`)
+
+    Args:
+        path: Path of a Parquet file, or a directory of Parquet files
+        batch_size: Maximum number of rows per batch
+        columns: Optional subset of columns to read
+        filters: Optional allowed values keyed by column
+        categorical_cols: String columns to read as categoricals
+
+    Yields:
+        Dataframe batches
+    """
+    for batch in dataset(path, categorical_cols).to_batches(
+            columns=None if columns is None else list(columns),
+            filter=filter_expression(filters),
+            batch_size=batch_size):
+        if batch.num_rows:
+            yield to_pandas(batch)
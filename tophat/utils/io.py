@@ -4,14 +4,20 @@ from typing import Dict, Union, List, Any, Optional
 
 def write_vocab(vocab_dir: Union[str, Path],
                 cats_d: Dict[str, List[Any]],
+                labelers: Optional[Dict[str, Any]] = None,
                 ):
     """Writes a dictionary of categories to vocab files
     Each line of the file will contain 1 word of the vocabulary
+
+    Combined columns with a labeler (see `tophat.data.combine_cols`) are
+    written as their labels
     """
     vocab_dir = Path(vocab_dir)
     if not vocab_dir.exists():
         vocab_dir.mkdir()
     for k, v in cats_d.items():
+        if labelers and k in labelers:
+            v = labelers[k].labels(v)
         with open(vocab_dir / f'{k}.vocab', 'w') as f:
             f.write('\n'.join(map(str, v)) + '\n')
 
@@ -7,6 +7,7 @@ def write_metadata_emb(cats_d: Dict[str, List[Any]],
                        log_dir: str,
                        names_d: Optional[
                            Dict[str, Union[str, pd.DataFrame]]] = None,
+                       labelers: Optional[Dict[str, Any]] = None,
                        ) -> Dict[str, str]:
     """Book-keeping and writing of human-readable metadata for embeddings 
     
@@ -21,6 +22,8 @@ def write_metadata_emb(cats_d: Dict[str, List[Any]],
             for multiple labels).
             If `None`, the embedding projector will just use the raw id of the 
             vocab
+        labelers: Optional labelers of combined columns
+            (see `tophat.data.combine_cols`) to label their raw ids with
 
     Returns:
         Dictionary of written metadata paths 
@@ -43,6 +46,10 @@ def write_metadata_emb(cats_d: Dict[str, List[Any]],
             lbls_embs.index.name = 'index'
             lbls_embs.to_csv(path_out, sep='\t')
 
+        elif labelers and feat_name in labelers:
+            lbls_embs = pd.Series(labelers[feat_name].labels(cats))
+            lbls_embs.to_csv(path_out, index=False)
+
         else:
             # Write single column with just the raw vocab id
             lbls_embs = pd.Series(cats)
@@ -0,0 +1,247 @@
+"""
+Profiling reports of loaded training data -- memory footprint of each
+structure held by `TrainDataLoader` and `PairSampler`, degree distributions,
+sparsity, feature cardinalities, and the expected cost of verified negative
+sampling. Everything is computed from the already-encoded arrays, and
+reports are plain (JSON-serializable) dictionaries
+"""
+import json
+from typing import Dict, Any
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from tophat.utils.log import logger
+
+VERIFIED_METHODS = {'uniform_verified', 'uniform_ordinal',
+                    'popularity_verified', 'adaptive', 'adaptive_ordinal',
+                    'adaptive_warp'}
+
+
+def nbytes(obj: Any) -> int:
+    """Bytes held by arrays, sparse matrices, and pandas objects
+    (and containers of them). Object arrays only count their pointers
+
+    Args:
+        obj: Structure to measure
+
+    Returns:
+        Number of bytes
+    """
+    if obj is None:
+        return 0
+    elif isinstance(obj, np.ndarray):
+        return obj.nbytes
+    elif sp.issparse(obj):
+        return sum(nbytes(getattr(obj, attr, None))
+                   for attr in ['data', 'indices', 'indptr', 'row', 'col'])
+    elif isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=False))
+    elif isinstance(obj, dict):
+        return sum(nbytes(v) for v in obj.values())
+    elif isinstance(obj, (list, tuple)):
+        return sum(nbytes(v) for v in obj)
+    else:
+        return sum(nbytes(v) for v in vars(obj).values()
+                   if isinstance(v, np.ndarray)) \
+            if hasattr(obj, '__dict__') else 0
+
+
+def degree_report(degrees: np.array) -> Dict[str, Any]:
+    """Summary and log2-binned histogram of degrees
+
+    Args:
+        degrees: Degree of each user (or item)
+
+    Returns:
+        Dictionary of stats, plus `hist_edges` and `hist_counts` (the
+        number of degrees in `[edges[i], edges[i + 1])`)
+    """
+    degrees = np.asarray(degrees)
+    n_bins = int(np.log2(max(degrees.max(initial=0), 1))) + 2
+    edges = np.concatenate([[0], 2 ** np.arange(n_bins)])
+    counts = np.bincount(np.searchsorted(edges, degrees, side='right') - 1,
+                         minlength=len(edges))[:len(edges) - 1]
+    return {
+        'n': len(degrees),
+        'n_zero': int((degrees == 0).sum()),
+        'mean': float(degrees.mean()) if len(degrees) else 0.,
+        'median': float(np.median(degrees)) if len(degrees) else 0.,
+        'p99': float(np.percentile(degrees, 99)) if len(degrees) else 0.,
+        'max': int(degrees.max(initial=0)),
+        'hist_edges': edges.tolist(),
+        'hist_counts': counts.tolist(),
+    }
+
+
+def verified_sampling_cost(non_neg_degrees: np.array,
+                           user_weights: np.array,
+                           batch_size: int,
+                           n_neg: int = 1,
+                           ) -> Dict[str, float]:
+    """Expected cost of a batch of verified negative sampling
+    (see `tophat.sampling.utils.neg_samp_bsearch_batch`): the non-negative
+    rows of the users of the batch are gathered, then every negative is a
+    binary search over them
+
+    Args:
+        non_neg_degrees: Number of non-negatives of each user
+        user_weights: Number of times each user is sampled per epoch
+        batch_size: Batch size
+        n_neg: Number of negatives per positive
+
+    Returns:
+        Dictionary of expected costs per batch
+    """
+    weights = np.asarray(user_weights, dtype=np.float64)
+    row_len = float((weights * non_neg_degrees).sum() / weights.sum()) \
+        if weights.sum() else 0.
+    gathered = batch_size * row_len
+    search_steps = float(np.log2(gathered + 1))
+    return {
+        'expected_row_len': row_len,
+        'gathered_per_batch': gathered,
+        'search_steps_per_neg': search_steps,
+        'search_steps_per_batch': batch_size * n_neg * search_steps,
+    }
+
+
+def profile_data_loader(data_loader) -> Dict[str, Any]:
+    """Profiles the encoded data of a `TrainDataLoader`
+
+    Args:
+        data_loader: Loaded training data
+
+    Returns:
+        Report dictionary
+    """
+    xn_df = data_loader.interactions_df
+    user_col, item_col = data_loader.user_col, data_loader.item_col
+    n_users = len(data_loader.cats_d[user_col])
+    n_items = len(data_loader.cats_d[item_col])
+    user_codes = xn_df[user_col].cat.codes.values
+    item_codes = xn_df[item_col].cat.codes.values
+    # (distinct pairs -- repeated interactions count once)
+    pairs = np.unique(user_codes.astype(np.int64) * n_items + item_codes)
+
+    emb_cats_d = data_loader.emb_cats_d
+    features = {}
+    for fgroup, codes_df in data_loader.feats_codes_df.items():
+        if codes_df is None:
+            continue
+        for col in codes_df.columns:
+            codes = codes_df[col].values
+            features[col] = {
+                'group': fgroup.value,
+                'cardinality': len(data_loader.cats_d.get(col, [])),
+                # (embedding rows, see `vocab_policies`)
+                'n_rows': len(emb_cats_d.get(col, [])),
+                'n_observed': int(np.count_nonzero(np.bincount(
+                    codes[codes >= 0]))) if len(codes) else 0,
+            }
+    for fgroup, num_df in data_loader.num_feats_df.items():
+        if num_df is not None:
+            for col in num_df.columns:
+                features[col] = {'group': fgroup.value, 'numerical': True}
+
+    return {
+        'n_interactions': len(xn_df),
+        'n_users': n_users,
+        'n_items': n_items,
+        'n_pairs': len(pairs),
+        'density': len(pairs) / max(n_users * n_items, 1),
+        'user_degrees': degree_report(
+            np.bincount(user_codes, minlength=n_users)),
+        'item_degrees': degree_report(
+            np.bincount(item_codes, minlength=n_items)),
+        'features': features,
+        'bytes': {
+            'interactions_df': nbytes(xn_df),
+            'feats_codes_df': {fg.value: nbytes(df) for fg, df in
+                               data_loader.feats_codes_df.items()},
+            'num_feats_df': {fg.value: nbytes(df) for fg, df in
+                             data_loader.num_feats_df.items()},
+            'cats_d': nbytes(data_loader.cats_d),
+        },
+    }
+
+
+def profile_sampler(sampler) -> Dict[str, Any]:
+    """Profiles the structures and expected sampling cost of a
+    `PairSampler`
+
+    Args:
+        sampler: Pair sampler
+
+    Returns:
+        Report dictionary
+    """
+    pos_degrees = np.bincount(sampler.pos_xn_coo.row,
+                              minlength=sampler.n_users)
+    # (distinct items -- as would be verified against)
+    non_neg_xn_csr = sampler.non_neg_xn_csr \
+        if sampler.non_neg_xn_csr is not None else sampler.pos_xn_coo.tocsr()
+    non_neg_degrees = np.diff(non_neg_xn_csr.indptr)
+
+    if sampler.scheduler.by_user:
+        user_weights = np.ones_like(pos_degrees)
+    elif hasattr(sampler.scheduler, 'k'):  # capped by user
+        user_weights = np.minimum(pos_degrees, sampler.scheduler.k)
+    else:
+        user_weights = pos_degrees
+
+    sampling = {
+        'method': sampler.method,
+        'batch_size': int(sampler.batch_size),
+        'n_neg': int(sampler.n_neg),
+        'epoch_len': int(sampler.scheduler.epoch_len),
+        'batches_per_epoch': int(np.ceil(
+            sampler.scheduler.epoch_len / max(sampler.batch_size, 1))),
+        'verified': sampler.method in VERIFIED_METHODS,
+    }
+    sampling.update(verified_sampling_cost(
+        non_neg_degrees, user_weights, sampler.batch_size, sampler.n_neg))
+    if 'adaptive' in sampler.method:
+        sampling['scored_per_batch'] = \
+            int(sampler.batch_size * sampler.max_sampled)
+
+    return {
+        'n_users': int(sampler.n_users),
+        'n_items': int(sampler.n_items),
+        'sampling': sampling,
+        'bytes': {
+            'pos_xn_coo': nbytes(sampler.pos_xn_coo),
+            'pos_xn_csr': nbytes(sampler.pos_xn_csr),
+            'non_neg_xn_csr': nbytes(sampler.non_neg_xn_csr),
+            'feats_codes_arrs': {fg.value: nbytes(arr) for fg, arr in
+                                 sampler.feats_codes_arrs.items()},
+            'user_num_feats_arr': nbytes(sampler.user_num_feats_arr),
+            'item_num_feats_arr': nbytes(sampler.item_num_feats_arr),
+            'alias_table': nbytes(sampler.alias_table),
+        },
+    }
+
+
+def profile(data_loader=None, sampler=None,
+            log: bool = True) -> Dict[str, Any]:
+    """Profiling report of a `TrainDataLoader` and/or a `PairSampler`
+
+    Args:
+        data_loader: Optional loaded training data
+        sampler: Optional pair sampler
+        log: If `True`, log the report
+
+    Returns:
+        Report dictionary (JSON-serializable)
+    """
+    report = {}
+    if data_loader is not None:
+        report['data_loader'] = profile_data_loader(data_loader)
+    if sampler is not None:
+        report['sampler'] = profile_sampler(sampler)
+    if log:
+        logger.info(f'Profile:\n{json.dumps(report, indent=2)}')
+    return report
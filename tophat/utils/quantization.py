@@ -0,0 +1,108 @@
+"""
+Reduced-precision storage of embedding tables -- float16, or int8 codes
+with a float32 scale per row (symmetric, so that the largest magnitude of a
+row maps to 127) -- and reading/writing exported tables for serving
+"""
+from pathlib import Path
+from typing import Dict, NamedTuple, Tuple, Union, Any
+
+import numpy as np
+
+STORAGES = ('float32', 'float16', 'int8')
+INT8_MAX = 127
+
+
+class QuantizedTable(NamedTuple):
+    """int8 codes `[n_rows, dim]` and float32 scales `[n_rows, 1]` of a
+    table (arrays or tensors)"""
+    codes: Any
+    scales: Any
+
+
+def check_storage(storage: str):
+    if storage not in STORAGES:
+        raise ValueError(f'Unknown storage {storage}. One of {STORAGES}')
+
+
+def quantize_rows(table: np.array) -> QuantizedTable:
+    """Quantizes each row of a table to int8 with its own scale
+
+    Args:
+        table: Float table `[n_rows, dim]`
+
+    Returns:
+        Quantized table (all-zero rows get a scale of 1)
+    """
+    table = np.asarray(table, dtype=np.float32)
+    scales = np.abs(table).max(axis=1, keepdims=True) / INT8_MAX
+    scales[scales == 0.] = 1.
+    codes = np.clip(np.rint(table / scales), -INT8_MAX, INT8_MAX)
+    return QuantizedTable(codes.astype(np.int8), scales.astype(np.float32))
+
+
+def dequantize_rows(quantized: QuantizedTable) -> np.array:
+    """Float32 table of a table quantized by `quantize_rows`"""
+    return quantized.codes.astype(np.float32) * quantized.scales
+
+
+def table_nbytes(n_rows: int, dim: int, storage: str) -> int:
+    """Bytes held by a table `[n_rows, dim]` in the given storage"""
+    check_storage(storage)
+    if storage == 'int8':
+        return n_rows * dim + n_rows * 4
+    return n_rows * dim * np.dtype(storage).itemsize
+
+
+def to_storage(table: np.array, storage: str,
+               ) -> Union[np.array, QuantizedTable]:
+    """Converts a float table to the given storage"""
+    check_storage(storage)
+    if storage == 'int8':
+        return quantize_rows(table)
+    return np.asarray(table, dtype=storage)
+
+
+def write_tables(export_dir: Union[str, Path],
+                 tables: Dict[str, Union[np.array, QuantizedTable]],
+                 biases: Dict[str, np.array],
+                 ):
+    """Writes a `{feat_name}.npz` file per table (with its biases)
+
+    Args:
+        export_dir: Directory to write to
+        tables: Embedding tables (arrays or quantized tables) by feature
+        biases: Bias vectors by feature
+    """
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    for feat_name, table in tables.items():
+        if isinstance(table, QuantizedTable):
+            arrs = table._asdict()
+        else:
+            arrs = {'table': table}
+        np.savez(export_dir / f'{feat_name}.npz',
+                 biases=biases[feat_name], **arrs)
+
+
+def read_tables(export_dir: Union[str, Path],
+                ) -> Tuple[Dict[str, Union[np.array, QuantizedTable]],
+                           Dict[str, np.array]]:
+    """Reads tables written by `write_tables`
+
+    Args:
+        export_dir: Directory of `.npz` tables
+
+    Returns:
+        Tuple of embedding tables and biases keyed by feature (usable as
+        `init_emb_d` of an `EmbeddingMap`)
+    """
+    tables, biases = {}, {}
+    for path in sorted(Path(export_dir).glob('*.npz')):
+        with np.load(path) as arrs:
+            if 'codes' in arrs:
+                tables[path.stem] = QuantizedTable(arrs['codes'],
+                                                   arrs['scales'])
+            else:
+                tables[path.stem] = arrs['table']
+            biases[path.stem] = arrs['biases']
+    return tables, biases
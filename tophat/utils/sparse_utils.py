@@ -1,5 +1,6 @@
 import numpy as np
 import scipy.sparse as sp
+from typing import Sequence, Optional, Tuple
 
 
 def dropcols_coo(csr_mat: sp.csr_matrix, idx_to_drop):
@@ -35,3 +36,56 @@ def get_row_nz_data(csr_mat: sp.csr_matrix, row_ind: int):
     nz = csr_mat.indices[start_idx:stop_idx]
     data = csr_mat.data[start_idx:stop_idx]
     return nz, data
+
+
+def get_rows_nz_pos(csr_mat: sp.csr_matrix, row_inds: Sequence[int]):
+    """Ragged version of `get_row_nz` for many rows at once
+
+    Returns:
+        Tuple of positions into `csr_mat.indices` (and `csr_mat.data`)
+        for the concatenated rows, and the length of each row segment
+    """
+    row_inds = np.asarray(row_inds)
+    starts = csr_mat.indptr[row_inds]
+    lens = csr_mat.indptr[row_inds + 1] - starts
+    seg_starts = np.cumsum(lens) - lens
+    pos = np.arange(lens.sum()) + np.repeat(starts - seg_starts, lens)
+    return pos, lens
+
+
+def find_in_rows(csr_mat: sp.csr_matrix,
+                 row_inds: Sequence[int],
+                 col_inds: np.array,
+                 rows_nz: Optional[Tuple[np.array, np.array]] = None,
+                 ) -> np.array:
+    """Vectorized lookup of many (row, col) entries of a csr matrix
+    (indices of each row are assumed to be ordered)
+
+    Args:
+        csr_mat: matrix to look in
+        row_inds: row of each lookup [n_rows]
+        col_inds: columns to look up for each row [n_rows] or [n_rows, k]
+        rows_nz: Optional output of `get_rows_nz_pos` for `row_inds`
+            (if already computed)
+
+    Returns:
+        Positions into `csr_mat.indices` (and `csr_mat.data`) of the entries
+        (-1 where the entry is not stored) with the same shape as `col_inds`
+    """
+    n_rows = len(row_inds)
+    n_cols = csr_mat.shape[1]
+    pos, lens = rows_nz if rows_nz is not None else \
+        get_rows_nz_pos(csr_mat, row_inds)
+    seg_ids = np.repeat(np.arange(n_rows, dtype=np.int64), lens)
+
+    # Offset each row into its own range so one search covers every row
+    keys = seg_ids * n_cols + csr_mat.indices[pos]
+    col_inds = np.asarray(col_inds, dtype=np.int64)
+    queries = col_inds + (np.arange(n_rows, dtype=np.int64) * n_cols)\
+        .reshape([-1] + [1] * (col_inds.ndim - 1))
+    found_at = np.searchsorted(keys, queries)
+    found = found_at < len(keys)
+    found[found] = keys[found_at[found]] == queries[found]
+    entry_pos = np.full(queries.shape, -1, dtype=np.int64)
+    entry_pos[found] = pos[found_at[found]]
+    return entry_pos
@@ -0,0 +1,156 @@
+"""
+Vocabulary policies -- how the categories of a feature map to the rows of
+its embedding table, so that the size of the table does not grow with the
+number of distinct ids in the logs
+
+- `FrequencyVocab(min_count=5)`: categories seen fewer than 5 times share a
+  single OOV row
+- `FrequencyVocab(top_k=100000, n_tail_buckets=1000)`: the 100000 most
+  frequent categories get their own rows, the rest are hashed into 1000
+- `HashVocab(n_buckets=1000)`: all categories are hashed into 1000 rows
+
+Policies are passed to `TrainDataLoader` (`vocab_policies`), which fits
+them on the counts of the training interactions and applies them when
+building `feats_codes_df`. Categories unseen when fitting (ex. cold items)
+map to the OOV/hashed rows
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+OOV_LABEL = '<OOV>'
+
+
+def hash_buckets(categories: pd.Index, n_buckets: int) -> np.array:
+    """Bucket of each category of a stable (across loads) hash of its
+    value"""
+    h = pd.util.hash_array(np.asarray(categories, dtype=object),
+                           categorize=False)
+    return (h % np.uint64(n_buckets)).astype(np.int64)
+
+
+class VocabPolicy(object):
+    """Maps the categories of a feature to embedding rows"""
+
+    @property
+    def n_rows(self) -> int:
+        """Number of embedding rows"""
+        raise NotImplementedError
+
+    @property
+    def fitted(self) -> bool:
+        return True
+
+    def fit(self, categories: pd.Index, counts: np.array) -> 'VocabPolicy':
+        """Fits the policy to the training categories
+
+        Args:
+            categories: Categories of the feature
+            counts: Number of training interactions of each category
+
+        Returns:
+            self
+        """
+        return self
+
+    def rows(self, categories: pd.Index) -> np.array:
+        """Embedding row of each category"""
+        raise NotImplementedError
+
+    def labels(self) -> List[str]:
+        """Label of each embedding row (for vocab files and metadata)"""
+        raise NotImplementedError
+
+    def encode(self, s: pd.Series) -> np.array:
+        """Embedding rows of a categorical series (missing values stay -1)
+
+        Args:
+            s: Categorical series
+
+        Returns:
+            Array of rows
+        """
+        rows = self.rows(s.cat.categories).astype(np.int32)
+        codes = s.cat.codes.values
+        return np.where(codes >= 0, rows[np.maximum(codes, 0)], -1)\
+            .astype(np.int32)
+
+
+class HashVocab(VocabPolicy):
+    """Hashing trick -- categories are hashed into a fixed number of rows
+    (colliding categories share a row)
+
+    Args:
+        n_buckets: Number of rows
+    """
+
+    def __init__(self, n_buckets: int):
+        if n_buckets < 1:
+            raise ValueError('`n_buckets` must be positive')
+        self.n_buckets = n_buckets
+
+    @property
+    def n_rows(self) -> int:
+        return self.n_buckets
+
+    def rows(self, categories: pd.Index) -> np.array:
+        return hash_buckets(categories, self.n_buckets)
+
+    def labels(self) -> List[str]:
+        return [f'<hash_{i}>' for i in range(self.n_buckets)]
+
+
+class FrequencyVocab(VocabPolicy):
+    """Frequent categories get their own rows (most frequent first), and
+    the tail is hashed into `n_tail_buckets` rows (a single shared OOV row
+    by default)
+
+    Args:
+        min_count: Minimum number of training interactions of a category
+            to get its own row
+        top_k: Optional maximum number of categories with their own rows
+        n_tail_buckets: Number of rows shared by the other categories
+    """
+
+    def __init__(self,
+                 min_count: int = 1,
+                 top_k: Optional[int] = None,
+                 n_tail_buckets: int = 1,
+                 ):
+        if n_tail_buckets < 1:
+            raise ValueError('`n_tail_buckets` must be positive')
+        self.min_count = min_count
+        self.top_k = top_k
+        self.n_tail_buckets = n_tail_buckets
+        self.kept: Optional[pd.Index] = None
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.kept) + self.n_tail_buckets
+
+    @property
+    def fitted(self) -> bool:
+        return self.kept is not None
+
+    def fit(self, categories: pd.Index, counts: np.array) -> 'VocabPolicy':
+        counts = np.asarray(counts)
+        order = np.argsort(-counts, kind='stable')
+        order = order[counts[order] >= self.min_count]
+        if self.top_k is not None:
+            order = order[:self.top_k]
+        self.kept = pd.Index(categories).take(order)
+        return self
+
+    def rows(self, categories: pd.Index) -> np.array:
+        rows = self.kept.get_indexer(categories).astype(np.int64)
+        tail = rows < 0
+        if tail.any():
+            rows[tail] = len(self.kept) + hash_buckets(
+                pd.Index(categories)[tail], self.n_tail_buckets)
+        return rows
+
+    def labels(self) -> List[str]:
+        tail = [OOV_LABEL] if self.n_tail_buckets == 1 else \
+            [f'<OOV_{i}>' for i in range(self.n_tail_buckets)]
+        return list(map(str, self.kept)) + tail